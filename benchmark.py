@@ -0,0 +1,1148 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SAMPLE_FILES = {
+    'hospital': 'hospital.txt',
+    'ambulatory': 'ambulatory.txt',
+    'nurses': 'nurses.txt',
+    'doctors': 'doctors.txt',
+}
+
+RSS_CHILD = '''
+import resource
+import sys
+from main import Load
+
+kind, filename, mode = sys.argv[1:]
+if mode == 'iter':
+    for record in getattr(Load, 'iter_' + kind)(filename):
+        pass
+else:
+    getattr(Load, 'load_' + kind)(filename)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+'''
+
+
+def make_file(kind, rows, directory):
+    """
+    Function of making a file of rows records by repeating sample file lines
+    :param kind: key of SAMPLE_FILES
+    :param rows:
+    :param directory:
+    :return: name of created file
+    """
+
+    with open(SAMPLE_FILES[kind], 'r', encoding='utf8') as f_sample:
+        lines = [line.rstrip('\n') + '\n' for line in f_sample if line.strip()]
+
+    filename = os.path.join(directory, f'{kind}_{rows}.txt')
+    with open(filename, 'w', encoding='utf8') as f_out:
+        for i in range(rows):
+            f_out.write(lines[i % len(lines)])
+    return filename
+
+
+def peak_rss(kind, filename, mode):
+    """
+    Function of measuring peak RSS of a fresh process loading filename
+    :param kind:
+    :param filename:
+    :param mode: 'iter' for Load.iter_*, 'load' for Load.load_*
+    :return: peak RSS in kilobytes
+    """
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, '-c', RSS_CHILD, kind, filename,
+                             mode], cwd=here, capture_output=True, text=True,
+                            check=True)
+    return int(result.stdout.split()[-1])
+
+
+def bench_rss(kind='hospital_patients',
+              sizes=(10 ** 4, 10 ** 5, 4 * 10 ** 5)):
+    """
+    Function of comparing peak RSS of iterating and loading files of growing size
+    :param kind:
+    :param sizes:
+    :return:
+    """
+
+    sample = kind.split('_')[0]
+    print(f'Peak RSS, {kind} (KB)')
+    print(f'{"rows":>10} {"iter":>10} {"load":>10}')
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            filename = make_file(sample, rows, directory)
+            print(f'{rows:>10} {peak_rss(kind, filename, "iter"):>10} '
+                  f'{peak_rss(kind, filename, "load"):>10}')
+
+
+def bench_validation(repeat=5000):
+    """
+    Function of measuring constructor validation throughput on sample rows
+    :param repeat: how many times every sample row is constructed
+    :return:
+    """
+
+    from main import HospitalPatient, AmbulatoryPatient, Nurse, Doctor
+
+    print('Constructor validation (rows/sec)')
+    for kind, record_class in (('hospital', HospitalPatient),
+                               ('ambulatory', AmbulatoryPatient),
+                               ('nurses', Nurse), ('doctors', Doctor)):
+        with open(SAMPLE_FILES[kind], 'r', encoding='utf8') as f_sample:
+            rows = [line.split(';')[:-1] for line in f_sample]
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for row in rows:
+                record_class(1, *row)
+        elapsed = time.perf_counter() - start
+        print(f'{record_class.__name__:>18} '
+              f'{repeat * len(rows) / elapsed:>10.0f}')
+
+
+def record_size(record):
+    """
+    Function of measuring memory of a record itself, without field values
+    :param record:
+    :return: size in bytes
+    """
+
+    size = sys.getsizeof(record)
+    if hasattr(record, '__dict__'):
+        size += sys.getsizeof(record.__dict__)
+    if hasattr(record, '_codes'):
+        size += sys.getsizeof(record._codes)
+    return size
+
+
+def bench_record_size(rows=20000):
+    """
+    Function of measuring memory held per loaded record
+    :param rows:
+    :return:
+    """
+
+    from main import Load
+
+    print('Memory per record (bytes)')
+    print(f'{"":>20} {"total":>8} {"record":>8}')
+    with tempfile.TemporaryDirectory() as directory:
+        for kind, sample in (('hospital_patients', 'hospital'),
+                             ('ambulatory_patients', 'ambulatory'),
+                             ('nurses', 'nurses'), ('doctors', 'doctors')):
+            filename = make_file(sample, rows, directory)
+            tracemalloc.start()
+            records = list(getattr(Load, 'iter_' + kind)(filename))
+            total = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            print(f'{kind:>20} {total // rows:>8} '
+                  f'{record_size(records[0]):>8}')
+
+
+def bench_table(rows=10 ** 6, repeat=5):
+    """
+    Function of comparing queries over a column table with loops over records
+    :param rows:
+    :param repeat:
+    :return:
+    """
+
+    from main import Load
+    from table import ColumnTable
+
+    sample = list(Load.iter_hospital_patients(SAMPLE_FILES['hospital']))
+    patients = [sample[i % len(sample)] for i in range(rows)]
+    start = time.perf_counter()
+    table = ColumnTable.from_records(patients)
+    print(f'Column table of {rows} hospital patients built in '
+          f'{time.perf_counter() - start:.2f} s')
+
+    queries = {
+        'count department & blood type': (
+            lambda: table.count(table.where(
+                medical_department='терапевтическое', blood_type=1,
+                rhesus_affiliation='+')),
+            lambda: sum(1 for p in patients
+                        if p.medical_department == 'терапевтическое'
+                        and p.blood_type == 1
+                        and p.rhesus_affiliation == '+')),
+        'group count by department': (
+            lambda: table.group_count('medical_department'),
+            lambda: _group_count(p.medical_department for p in patients)),
+        'mean room number': (
+            lambda: table.mean('room_number'),
+            lambda: _mean(p.room_number for p in patients)),
+    }
+    print(f'{"query (ms)":>30} {"table":>10} {"loop":>10}')
+    for name, (vectorized, loop) in queries.items():
+        assert vectorized() == loop()
+        print(f'{name:>30} {_best(vectorized, repeat) * 1000:>10.2f} '
+              f'{_best(loop, 1) * 1000:>10.2f}')
+
+
+def bench_lookup(rows=2 * 10 ** 5, lookups=10 ** 5):
+    """
+    Function of comparing index lookups with scans of loaded records
+    :param rows:
+    :param lookups:
+    :return:
+    """
+
+    from main import HospitalPatient
+    from index import Indexes
+
+    with open(SAMPLE_FILES['hospital'], 'r', encoding='utf8') as f_sample:
+        sample = [line.split(';')[:-1] for line in f_sample]
+    patients = []
+    for i in range(rows):
+        row = sample[i % len(sample)]
+        row[9] = str(5400000000000000 + i)
+        patients.append(HospitalPatient(i + 1, *row))
+
+    indexes = Indexes()
+    start = time.perf_counter()
+    for patient in patients:
+        indexes.add(patient)
+    indexes.range('birthday')
+    indexes.range('room_number')
+    print(f'Indexes of {rows} hospital patients built in '
+          f'{time.perf_counter() - start:.2f} s')
+
+    policies = [patients[i * 7919 % rows].medical_policy
+                for i in range(lookups)]
+    start = time.perf_counter()
+    for policy in policies:
+        indexes.get('medical_policy', policy)
+    index_time = (time.perf_counter() - start) / lookups
+    policy = patients[rows // 2].medical_policy
+    scan_time = _best(lambda: next(p for p in patients
+                                   if p.medical_policy == policy), 1)
+    range_time = _best(lambda: indexes.range('birthday', '01.01.1980',
+                                             '31.01.1980'), 5)
+    print(f'policy lookup: index {index_time * 10 ** 6:.2f} us, '
+          f'scan {scan_time * 10 ** 6:.0f} us; '
+          f'birthday range of January 1980: {range_time * 1000:.2f} ms')
+
+
+def bench_parallel(rows=2 * 10 ** 5, workers=(1, 2, 4, 8)):
+    """
+    Function of comparing sequential and multi-process loading
+    :param rows:
+    :param workers:
+    :return:
+    """
+
+    from main import Load
+
+    print(f'Loading {rows} hospital patients on {os.cpu_count()} CPUs (s)')
+    with tempfile.TemporaryDirectory() as directory:
+        filename = make_file('hospital', rows, directory)
+        elapsed = _best(lambda: list(Load.iter_hospital_patients(filename)),
+                        1)
+        print(f'{"sequential":>12} {elapsed:>8.2f}')
+        for count in workers:
+            elapsed = _best(lambda: list(Load.iter_hospital_patients(
+                filename, workers=count)), 1)
+            print(f'{count:>4} workers {elapsed:>8.2f}')
+
+
+def bench_snapshot(rows=2 * 10 ** 5):
+    """
+    Function of comparing startup by parsing a file and by its snapshot
+    :param rows:
+    :return:
+    """
+
+    from main import Load, HospitalPatient
+    import snapshot
+
+    print(f'Startup with {rows} hospital patients (ms)')
+    with tempfile.TemporaryDirectory() as directory:
+        filename = make_file('hospital', rows, directory)
+        parse = _best(lambda: list(Load.iter_hospital_patients(filename)), 1)
+        start = time.perf_counter()
+        snapshot.load(HospitalPatient, filename).close()
+        write = time.perf_counter() - start
+
+        def warm():
+            records = snapshot.load(HospitalPatient, filename)
+            records[rows // 2].full_name
+            records.close()
+
+        print(f'parse {parse * 1000:.0f}, first start with snapshot write '
+              f'{write * 1000:.0f}, warm start {_best(warm, 5) * 1000:.2f}')
+
+
+def bench_render(rows=10 ** 5):
+    """
+    Function of comparing printing records one by one with Load.render_all
+    :param rows:
+    :return:
+    """
+
+    import io
+    from main import Load
+
+    print(f'Rendering {rows} records (records/sec)')
+    print(f'{"":>20} {"print":>10} {"render_all":>10}')
+    for kind, sample in (('hospital_patients', 'hospital'),
+                         ('ambulatory_patients', 'ambulatory'),
+                         ('nurses', 'nurses'), ('doctors', 'doctors')):
+        records = list(getattr(Load, 'iter_' + kind)(SAMPLE_FILES[sample]))
+        records = [records[i % len(records)] for i in range(rows)]
+
+        def printed():
+            sink = io.StringIO()
+            for record in records:
+                print(record, file=sink)
+            return sink.getvalue()
+
+        def rendered():
+            sink = io.StringIO()
+            Load.render_all(records, sink)
+            return sink.getvalue()
+
+        assert printed() == rendered()
+        print(f'{kind:>20} {rows / _best(printed, 3):>10.0f} '
+              f'{rows / _best(rendered, 3):>10.0f}')
+
+
+def bench_pipeline(rows=10 ** 5, workers=(None, 2, 4)):
+    """
+    Function of comparing Load.load_hospital_patients with the async
+    pipeline
+    :param rows:
+    :param workers: numbers of validating processes, None for a thread
+    :return:
+    """
+
+    from main import Load, HospitalPatient
+    import pipeline
+
+    print(f'Ingesting {rows} hospital patients on {os.cpu_count()} CPUs')
+    with tempfile.TemporaryDirectory() as directory:
+        filename = make_file('hospital', rows, directory)
+        _reset_load()
+        elapsed = _best(lambda: Load.load_hospital_patients(filename), 1)
+        print(f'{"load":>12} {rows / elapsed:>10.0f} rows/s')
+        for count in workers:
+            _reset_load()
+            feed = pipeline.ingest_file(HospitalPatient, filename, count)
+            report = feed.report()
+            label = 'thread' if count is None else f'{count} workers'
+            print(f'{label:>12} '
+                  f'{report["insert"]["per_second"]:>10.0f} rows/s, '
+                  f'max queue depths {report["read"]["max_queue_depth"]}, '
+                  f'{report["validate"]["max_queue_depth"]}')
+        _reset_load()
+
+
+def bench_intern(rows=10 ** 5):
+    """
+    Function of reporting memory saved by intern pools on generated files
+    :param rows:
+    :return:
+    """
+
+    from main import Load
+    import generator
+
+    print(f'Memory saved by intern pools, {rows} rows of every file (KB)')
+    print(f'{"field":>20} {"values":>8} {"evicted":>8} {"used":>8} '
+          f'{"saved":>8}')
+    _reset_load()
+    Load.pools.clear()
+    with tempfile.TemporaryDirectory() as directory:
+        for kind in KINDS:
+            filename = os.path.join(directory, kind + '.txt')
+            generator.write_file(kind, rows, filename)
+            getattr(Load, 'load_' + kind)(filename)
+    report = Load.pools.report(Load.hospital_patients,
+                               Load.ambulatory_patients, Load.nurses,
+                               Load.doctors)
+    for name, counters in report.items():
+        print(f'{name:>20} {counters["values"]:>8} {counters["evicted"]:>8} '
+              f'{counters["bytes"] // 1024:>8} '
+              f'{counters["saved_bytes"] // 1024:>8}')
+    _reset_load()
+
+
+def bench_ward(rows=10 ** 5, operations=10 ** 5):
+    """
+    Function of timing free bed lookups, admissions and discharges with
+    rows hospital patients loaded
+    :param rows:
+    :param operations:
+    :return:
+    """
+
+    from main import Load, HospitalPatient
+    from ward import Wards
+    import generator
+
+    capacities = {department: {room: 4 for room in range(1, 2 * rows // 4)}
+                  for department in generator.DEPARTMENTS}
+    _reset_load()
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'hospital_patients.txt')
+        generator.write_file('hospital_patients', rows, filename, invalid=0)
+        start = time.perf_counter()
+        Load.wards = Wards(capacities)
+        Load.load_hospital_patients(filename)
+        print(f'{rows} hospital patients loaded with wards in '
+              f'{time.perf_counter() - start:.2f} s')
+
+    department = generator.DEPARTMENTS[0]
+    elapsed = _best(lambda: [Load.wards.find_free_bed(department)
+                             for _ in range(operations)], 3)
+    print(f'find free bed {elapsed / operations * 10 ** 6:.2f} us')
+
+    patients = [patient for patient in Load.hospital_patients
+                if patient.medical_department == department][:operations]
+    start = time.perf_counter()
+    patients = [Load.discharge_hospital_patient(patient)
+                for patient in patients]
+    discharge = (time.perf_counter() - start) / len(patients)
+    start = time.perf_counter()
+    for patient in patients:
+        Load.wards.remove(patient)
+        Load.wards.assign(patient)
+        Load.wards.add(patient)
+    admission = (time.perf_counter() - start) / len(patients)
+    print(f'{len(patients)} patients: discharge {discharge * 10 ** 6:.2f} us, '
+          f'bed assignment {admission * 10 ** 6:.2f} us per patient')
+    print(Load.wards.occupancy(department))
+    _reset_load()
+
+
+def bench_schedule(scales=((10 ** 3, 10 ** 2), (10 ** 4, 10 ** 3),
+                          (5 * 10 ** 4, 5 * 10 ** 3)), capacity=12):
+    """
+    Function of timing greedy and exact assignment of patients to doctors
+    :param scales: pairs of numbers of patients and doctors
+    :param capacity: most patients of one doctor
+    :return:
+    """
+
+    from main import Load, HospitalPatient, Doctor
+    from schedule import Scheduler
+    import generator
+
+    print(f'Assigning patients to doctors with at most {capacity} patients')
+    print(f'{"patients":>9} {"doctors":>8} {"mode":>7} {"s":>6} '
+          f'{"cost":>9} {"max load":>9} {"unassigned":>11}')
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'rows.txt')
+        for patients, doctors in scales:
+            generator.write_file('hospital_patients', patients, filename)
+            patients = list(Load.iter_records(HospitalPatient, filename))
+            generator.write_file('doctors', doctors, filename, seed=1)
+            doctors = list(Load.iter_records(Doctor, filename))
+            scheduler = Scheduler.for_doctors(doctors, capacity)
+            for exact in (False, True):
+                start = time.perf_counter()
+                schedule = scheduler.assign(patients, exact)
+                elapsed = time.perf_counter() - start
+                print(f'{len(patients):>9} {len(doctors):>8} '
+                      f'{"exact" if exact else "greedy":>7} {elapsed:>6.2f} '
+                      f'{schedule.cost():>9} '
+                      f'{max(schedule.loads().values()):>9} '
+                      f'{len(schedule.unassigned):>11}')
+
+
+def bench_names(rows=10 ** 6, queries=200, k=10):
+    """
+    Function of timing fuzzy search of misspelled uppercase full names, a
+    query is found if the misspelled person is among the results
+    :param rows: number of full names, surnames are made of random
+    syllables so that most names are distinct
+    :param queries:
+    :param k: most records found by a query
+    :return:
+    """
+
+    from types import SimpleNamespace
+    from names import NameIndex
+    import generator
+
+    rng = random.Random(0)
+    syllables = ['ба', 'ва', 'го', 'да', 'ер', 'жи', 'за', 'ки', 'ло', 'ми',
+                 'не', 'ор', 'пу', 'ра', 'се', 'ти', 'ух', 'фе', 'ха', 'цо',
+                 'че', 'ша', 'юк', 'ян', 'ов', 'ин', 'ёв']
+    people = []
+    for _ in range(rows):
+        surname = ''.join(rng.choice(syllables)
+                          for _ in range(rng.randint(2, 4)))
+        surname += rng.choice(['ов', 'ев', 'ин', 'ский', 'енко'])
+        people.append(SimpleNamespace(full_name=(
+            f'{surname.capitalize()} {rng.choice(generator.NAMES)} '
+            f'{rng.choice(generator.PATRONYMICS)}'[:25])))
+
+    index = NameIndex('full_name', 25)
+    start = time.perf_counter()
+    for person in people:
+        index.add(person)
+    print(f'Name index of {rows} full names ({len(index.records)} distinct) '
+          f'built in {time.perf_counter() - start:.2f} s')
+
+    sought = rng.sample(people, queries)
+    misspelled = []
+    for person in sought:
+        letters = list(person.full_name.replace('е', 'ё'))
+        letters[rng.randrange(len(letters))] = rng.choice('абвгдежз')
+        misspelled.append(''.join(letters).upper())
+    times = []
+    found = 0
+    for person, query in zip(sought, misspelled):
+        start = time.perf_counter()
+        results = index.search(query, k)
+        times.append(time.perf_counter() - start)
+        found += any(record is person for score, record in results)
+    times.sort()
+    print(f'top-{k} search: mean {_mean(times) * 1000:.2f} ms, '
+          f'95% {times[len(times) * 95 // 100] * 1000:.2f} ms, '
+          f'found {found} of {queries}')
+
+
+def bench_dedup(rows=2 * 10 ** 5):
+    """
+    Function of timing finding duplicates of rows hospital patients among
+    rows ambulatory patients, generated rows of the same number have equal
+    passports, phone numbers and policies
+    :param rows: number of rows of every file, records are streamed and
+    only their ids are kept
+    :return:
+    """
+
+    from main import Load, HospitalPatient, AmbulatoryPatient
+    from dedup import Duplicates
+    import generator
+
+    duplicates = Duplicates(keep=False)
+    with tempfile.TemporaryDirectory() as directory:
+        elapsed = 0.0
+        for kind, record_class in (('hospital_patients', HospitalPatient),
+                                   ('ambulatory_patients',
+                                    AmbulatoryPatient)):
+            filename = os.path.join(directory, kind + '.txt')
+            generator.write_file(kind, rows, filename)
+            for chunk in Load.iter_records(record_class, filename, 10000):
+                start = time.perf_counter()
+                duplicates.add_all(chunk)
+                elapsed += time.perf_counter() - start
+    start = time.perf_counter()
+    report = duplicates.report()
+    elapsed_clusters = time.perf_counter() - start
+    print(f'Duplicates of {rows} x {rows} patients: blocking '
+          f'{elapsed:.2f} s ({len(duplicates.records) / elapsed:.0f} '
+          f'records/sec), clusters {elapsed_clusters:.2f} s')
+    print(report)
+
+
+def bench_metrics(rows=10 ** 5, repeat=3):
+    """
+    Function of measuring overhead of instrumentation of loading, with it
+    turned off loading should take as long as reading records directly
+    :param rows:
+    :param repeat:
+    :return:
+    """
+
+    from main import Load, HospitalPatient
+    from metrics import Metrics
+    import generator
+
+    def load(metrics):
+        _reset_load()
+        Load.metrics = metrics
+        try:
+            Load.load_hospital_patients(filename)
+        finally:
+            Load.metrics = None
+
+    def direct():
+        _reset_load()
+        for record in Load.registry._read_records(HospitalPatient, filename):
+            Load.registry._add(record, 'hospital_patients')
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'hospital_patients.txt')
+        generator.write_file('hospital_patients', rows, filename, invalid=0)
+        baseline = _best(direct, repeat)
+        disabled = _best(lambda: load(None), repeat)
+        metrics = Metrics()
+        enabled = _best(lambda: load(metrics), repeat)
+    _reset_load()
+    print(f'Loading {rows} hospital patients (s): direct {baseline:.2f}, '
+          f'instrumentation off {disabled:.2f} '
+          f'({(disabled / baseline - 1) * 100:+.1f}%), on {enabled:.2f} '
+          f'({(enabled / baseline - 1) * 100:+.1f}%)')
+
+
+def bench_lazy(rows=10 ** 5, repeat=3):
+    """
+    Function of comparing eager and lazy records in queries reading one and
+    two fields of every record
+    :param rows:
+    :param repeat:
+    :return:
+    """
+
+    from main import Load, HospitalPatient
+    import generator
+
+    def by_department(lazy):
+        departments = {}
+        for patient in Load.iter_records(HospitalPatient, filename,
+                                         lazy=lazy):
+            department = patient.medical_department
+            departments[department] = departments.get(department, 0) + 1
+        return departments
+
+    def in_rooms(lazy):
+        departments = {}
+        for patient in Load.iter_records(HospitalPatient, filename,
+                                         lazy=lazy):
+            if patient.room_number is not None:
+                department = patient.medical_department
+                departments[department] = departments.get(department, 0) + 1
+        return departments
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'hospital_patients.txt')
+        generator.write_file('hospital_patients', rows, filename)
+        print(f'{rows} hospital patients (s) {"eager":>8} {"lazy":>8}')
+        for name, query in (('patients by department', by_department),
+                            ('patients in rooms', in_rooms)):
+            assert query(False) == query(True)
+            eager = _best(lambda: query(False), repeat)
+            lazy = _best(lambda: query(True), repeat)
+            print(f'{name:>28} {eager:>8.2f} {lazy:>8.2f} '
+                  f'({eager / lazy:.1f}x)')
+    _reset_load()
+
+
+def bench_columnar(rows=2 * 10 ** 5):
+    """
+    Function of comparing parsing a file with reading its columnar export:
+    all records and one column
+    :param rows:
+    :return:
+    """
+
+    from main import Load, HospitalPatient
+    import columnar
+    import generator
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'hospital_patients.txt')
+        path = os.path.join(directory, 'hospital_patients.npz')
+        generator.write_file('hospital_patients', rows, filename)
+        start = time.perf_counter()
+        columnar.write(path, HospitalPatient,
+                       Load.iter_hospital_patients(filename))
+        write = time.perf_counter() - start
+        size = os.path.getsize(path) / os.path.getsize(filename)
+
+        parse = _best(lambda: sum(1 for _ in
+                                  Load.iter_hospital_patients(filename)), 1)
+        with columnar.ColumnFile(path, HospitalPatient) as columns:
+            records = _best(lambda: sum(1 for _ in
+                                        columns.records(HospitalPatient)), 1)
+            column = _best(lambda: columns.column('medical_department'), 3)
+
+    print(f'{rows} hospital patients (s): parse {parse:.2f}, '
+          f'export {write:.2f} ({size:.0%} of text size), '
+          f'import {records:.2f}, one column {column:.3f}')
+    _reset_load()
+
+
+def bench_publisher(rows=2 * 10 ** 4, batch_size=2000, readers=4):
+    """
+    Function of comparing readers of a registry changed by a writer in
+    batches: readers of published snapshots against readers taking a lock
+    the writer holds for a batch
+    :param rows:
+    :param batch_size:
+    :param readers:
+    :return:
+    """
+
+    import threading
+    from main import Load, Registry, HospitalPatient
+    from publisher import Publisher
+    import generator
+
+    def run(read, write):
+        done = threading.Event()
+        counts = [0] * readers
+        waits = [0.0] * readers
+
+        def reader(number):
+            timer = time.perf_counter
+            while not done.is_set():
+                start = timer()
+                read()
+                waits[number] = max(waits[number], timer() - start)
+                counts[number] += 1
+
+        threads = [threading.Thread(target=reader, args=(number,))
+                   for number in range(readers)]
+        for thread in threads:
+            thread.start()
+        start = time.perf_counter()
+        for chunk in Load._chunked(records, batch_size):
+            write(chunk)
+        elapsed = time.perf_counter() - start
+        done.set()
+        for thread in threads:
+            thread.join()
+        return elapsed, sum(counts) / elapsed, max(waits)
+
+    def read_registry(registry):
+        patients = registry.hospital_patients
+        if patients:
+            registry.indexes.get('id', patients[-1].id)
+            registry.wards.departments()
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'hospital_patients.txt')
+        generator.write_file('hospital_patients', rows, filename)
+        records = list(Registry().iter_records(HospitalPatient, filename))
+
+    published = Publisher()
+
+    def write_published(chunk):
+        with published.write() as registry:
+            registry._insert(chunk, 'hospital_patients')
+
+    locked = Registry()
+    lock = threading.Lock()
+
+    def read_locked():
+        with lock:
+            read_registry(locked)
+
+    def write_locked(chunk):
+        with lock:
+            locked._insert(chunk, 'hospital_patients')
+
+    print(f'{rows} hospital patients added in batches of {batch_size}, '
+          f'{readers} readers')
+    print(f'{"":>10} {"write (s)":>10} {"reads/s":>10} {"max wait (ms)":>14}')
+    for name, read, write in (
+            ('published', lambda: read_registry(published.read()),
+             write_published),
+            ('locked', read_locked, write_locked)):
+        elapsed, throughput, wait = run(read, write)
+        print(f'{name:>10} {elapsed:>10.2f} {throughput:>10.0f} '
+              f'{wait * 1000:>14.1f}')
+
+
+def bench_small_write(rows=(2 * 10 ** 4, 2 * 10 ** 5), repeat=20):
+    """
+    Function of timing a write of one hospital patient with its publishing
+    against the number of records of the registry: versions share unchanged
+    chunks and buckets, so the time must not grow with the registry
+    :param rows: numbers of records, from the smallest one
+    :param repeat:
+    :return:
+    """
+
+    from main import Registry, HospitalPatient
+    from publisher import Publisher
+    import generator
+
+    times = []
+    print(f'{"rows":>10} {"load (s)":>10} {"write (ms)":>11}')
+    for count in rows:
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'hospital_patients.txt')
+            generator.write_file('hospital_patients', count + repeat,
+                                 filename, invalid=0)
+            records = list(Registry().iter_records(HospitalPatient,
+                                                   filename))
+        published = Publisher()
+        start = time.perf_counter()
+        with published.write() as registry:
+            registry._insert(records[:count], 'hospital_patients')
+        loaded = time.perf_counter() - start
+        added = iter(records[count:])
+
+        def write():
+            with published.write() as registry:
+                registry._insert([next(added)], 'hospital_patients')
+
+        times.append(_best(write, repeat))
+        print(f'{count:>10} {loaded:>10.2f} {times[-1] * 1000:>11.2f}')
+    # a write copying the registry takes time proportional to its size,
+    # sharing leaves only the tables of chunks and buckets to copy
+    assert times[-1] < 5 * times[0], times
+    assert times[-1] * 100 < loaded, (times[-1], loaded)
+
+
+KINDS = {
+    'hospital_patients': 'HospitalPatient',
+    'ambulatory_patients': 'AmbulatoryPatient',
+    'nurses': 'Nurse',
+    'doctors': 'Doctor',
+}
+
+
+def bench_shards(rows=10 ** 5, lookups=10 ** 4, workers=(1, 2, 4)):
+    """
+    Function of comparing one registry with ambulatory patients sharded by
+    territorial number: loading all or one shard, lookups sent to all
+    shards and counting saved shards in worker processes
+    :param rows:
+    :param lookups:
+    :param workers:
+    :return:
+    """
+
+    from main import Registry
+    import generator
+    import shard
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'ambulatory_patients.txt')
+        generator.write_file('ambulatory_patients', rows, filename)
+
+        whole = Registry()
+        start = time.perf_counter()
+        whole.load_ambulatory_patients(filename)
+        load_whole = time.perf_counter() - start
+        shards = shard.Shards()
+        start = time.perf_counter()
+        shards.load_ambulatory_patients(filename)
+        load_shards = time.perf_counter() - start
+        start = time.perf_counter()
+        shard.Shards().load_ambulatory_patients(filename, [1])
+        load_one = time.perf_counter() - start
+
+        passports = [patient.passport for patient
+                     in random.Random(0).choices(whole.ambulatory_patients,
+                                                 k=lookups)]
+        get_whole = _best(lambda: [whole.indexes.get('passport', passport)
+                                   for passport in passports], 3)
+        get_shards = _best(lambda: [shards.get('passport', passport)
+                                    for passport in passports], 3)
+
+        path = os.path.join(directory, 'shards')
+        shards.save(path)
+        mapped = [_best(lambda: shard.map_shards(path, shard.sizes,
+                                                 workers=count), 1)
+                  for count in workers]
+
+    print(f'{rows} ambulatory patients in {len(shards.shards)} shards (s): '
+          f'load {load_whole:.2f}, sharded {load_shards:.2f}, '
+          f'one shard {load_one:.2f}')
+    print(f'passport lookup: registry {get_whole / lookups * 10 ** 6:.2f} '
+          f'us, all shards {get_shards / lookups * 10 ** 6:.2f} us')
+    print('open and count saved shards (s): ' + ', '.join(
+        f'{count} workers {elapsed:.2f}'
+        for count, elapsed in zip(workers, mapped)))
+
+
+def bench_bulk(rows=10 ** 5,
+               kinds=('hospital_patients', 'ambulatory_patients', 'doctors')):
+    """
+    Function of comparing reading files with checks run by the constructor
+    of every row and by columns of chunks of rows
+    :param rows:
+    :param kinds:
+    :return:
+    """
+
+    import main
+    import generator
+
+    print(f'Reading {rows} rows (s)')
+    print(f'{"":>20} {"rows":>8} {"columns":>8} {"check only":>10}')
+    with tempfile.TemporaryDirectory() as directory:
+        for kind in kinds:
+            filename = os.path.join(directory, f'{kind}.txt')
+            generator.write_file(kind, rows, filename)
+            record_class = getattr(main, KINDS[kind])
+            timings = [_best(lambda: sum(
+                1 for _ in main.Registry().iter_records(
+                    record_class, filename, bulk=bulk)), 3)
+                for bulk in (False, True)]
+            print(f'{kind:>20} {timings[0]:>8.2f} {timings[1]:>8.2f} '
+                  f'{_bulk_check(record_class, filename):>10.2f}')
+
+
+def bench_statistics(rows=10 ** 5, repeat=3):
+    """
+    Function of comparing reports read from statistics kept while loading
+    with reports scanning loaded records, and the cost of keeping them
+    :param rows:
+    :param repeat:
+    :return:
+    """
+
+    from main import Registry
+    from stats import Statistics, group_by, age_bucket, experience_bucket
+    import generator
+
+    with tempfile.TemporaryDirectory() as directory:
+        registry = Registry()
+        for kind in ('ambulatory_patients', 'doctors'):
+            filename = os.path.join(directory, f'{kind}.txt')
+            generator.write_file(kind, rows, filename)
+            getattr(registry, f'load_{kind}')(filename)
+    records = registry.ambulatory_patients + registry.doctors
+
+    def keep():
+        statistics = Statistics()
+        for record in records:
+            statistics.add(record)
+
+    statistics = registry.statistics
+    reports = {
+        'ages': (lambda: statistics.ages(),
+                 lambda: group_by(records, 'birthday',
+                                  birthday=age_bucket())),
+        'doctors by category': (
+            lambda: statistics.counts('category_experience'),
+            lambda: group_by(registry.doctors, 'category', 'work_experience',
+                             work_experience=experience_bucket)),
+        'blood groups': (
+            lambda: statistics.counts('blood_group'),
+            lambda: group_by(registry.ambulatory_patients, 'blood_type',
+                             'rhesus_affiliation')),
+        'health group': (
+            lambda: statistics.count('health_group', 'II'),
+            lambda: sum(patient.health_group == 'II'
+                        for patient in registry.ambulatory_patients)),
+    }
+    print(f'Reports on {rows} ambulatory patients and {rows} doctors (ms), '
+          f'keeping statistics costs '
+          f'{_best(keep, repeat) / len(records) * 10 ** 6:.2f} us a record')
+    print(f'{"":>20} {"kept":>8} {"scan":>8}')
+    for name, (kept, scan) in reports.items():
+        print(f'{name:>20} {_best(kept, repeat) * 1000:>8.3f} '
+              f'{_best(scan, repeat) * 1000:>8.1f}')
+
+
+def run_suite(sizes=(10 ** 3, 10 ** 4, 10 ** 5), kinds=tuple(KINDS),
+              invalid=0.1, seed=0, lookups=10 ** 4, validate_rows=10 ** 5):
+    """
+    Function of timing loading, constructor validation, rendering and index
+    lookups on generated files of every size, files of 10 ** 7 rows need
+    several gigabytes of memory to load
+    :param sizes: numbers of rows
+    :param kinds: keys of KINDS
+    :param invalid: share of invalid rows
+    :param seed: seed of generated rows and lookup keys
+    :param lookups: number of lookups of every kind
+    :param validate_rows: most rows constructed for validation timing
+    :return: dict with environment and list of results
+    """
+
+    import main
+    import generator
+
+    results = []
+
+    def add(kind, rows, operation, count, seconds):
+        results.append({'kind': kind, 'rows': rows, 'operation': operation,
+                        'count': count, 'seconds': seconds,
+                        'per_second': count / seconds if seconds else None})
+        print(f'{kind:>20} {rows:>9} {operation:>18} '
+              f'{count / seconds if seconds else 0:>12.0f}/s')
+
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in sizes:
+            for kind in kinds:
+                filename = os.path.join(directory, f'{kind}_{rows}.txt')
+                start = time.perf_counter()
+                generator.write_file(kind, rows, filename, invalid, seed)
+                add(kind, rows, 'generate', rows, time.perf_counter() - start)
+
+                def load():
+                    _reset_load()
+                    getattr(main.Load, 'load_' + kind)(filename)
+
+                add(kind, rows, 'load', rows,
+                    _best(load, max(1, min(5, 10 ** 5 // rows))))
+                records = getattr(main.Load, kind)
+
+                record_class = getattr(main, KINDS[kind])
+                with open(filename, 'r', encoding='utf8') as f_records:
+                    lines = [line.split(';')[:-1] for _, line in
+                             zip(range(validate_rows), f_records)]
+                add(kind, rows, 'validate', len(lines), _best(
+                    lambda: [record_class(1, *line) for line in lines], 3))
+
+                with open(os.devnull, 'w', encoding='utf8') as sink:
+                    add(kind, rows, 'render', rows, _best(
+                        lambda: main.Load.render_all(records, sink), 1))
+
+                rng = random.Random(seed)
+                picked = [records[rng.randrange(rows)] for _ in range(lookups)]
+                for name in ('id', 'passport', 'medical_policy'):
+                    if not hasattr(picked[0], name):
+                        continue
+                    keys = [getattr(record, name) for record in picked]
+                    add(kind, rows, 'get_' + name, lookups, _best(
+                        lambda: [main.Load.indexes.get(name, key)
+                                 for key in keys], 3))
+                keys = [record.birthday for record in picked
+                        if record.birthday is not None][:lookups // 10]
+                add(kind, rows, 'range_birthday', len(keys), _best(
+                    lambda: [main.Load.indexes.range('birthday', key, key)
+                             for key in keys], 3))
+                _reset_load()
+
+    return {'commit': _commit(), 'python': platform.python_version(),
+            'machine': platform.machine(), 'cpus': os.cpu_count(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'invalid': invalid, 'seed': seed, 'results': results}
+
+
+def compare(before, after, threshold=0.1):
+    """
+    Function of comparing results of two runs of the suite
+    :param before: results of run_suite
+    :param after: results of run_suite
+    :param threshold: relative fall of throughput counted as a regression
+    :return: list of (kind, rows, operation) of regressions
+    """
+
+    old = {(result['kind'], result['rows'], result['operation']):
+           result['per_second'] for result in before['results']}
+    regressions = []
+    print(f'{before["commit"]} -> {after["commit"]}')
+    for result in after['results']:
+        key = (result['kind'], result['rows'], result['operation'])
+        if not old.get(key) or not result['per_second']:
+            continue
+        ratio = result['per_second'] / old[key]
+        mark = ''
+        if ratio < 1 - threshold:
+            regressions.append(key)
+            mark = ' slower'
+        print(f'{key[0]:>20} {key[1]:>9} {key[2]:>18} {ratio:>7.2f}x{mark}')
+    return regressions
+
+
+def _reset_load():
+    from main import Load, Registry
+
+    Load.swap(Registry())
+
+
+def _bulk_check(record_class, filename):
+    from bulk import BulkSchema
+    from main import Load
+
+    checks = BulkSchema(record_class)
+    start = time.perf_counter()
+    with open(filename, 'r', encoding='utf8') as f_records:
+        while True:
+            lines = f_records.readlines(Load.bulk_bytes)
+            if not lines:
+                break
+            checks.check([ptr.split(';')[:-1] for ptr in lines])
+    return time.perf_counter() - start
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _group_count(values):
+    counts = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return counts
+
+
+def _mean(values):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values)
+
+
+def _best(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Without a command all benchmarks are printed')
+    commands = parser.add_subparsers(dest='command')
+    suite = commands.add_parser('suite', help='run suite and save results')
+    suite.add_argument('--sizes', type=int, nargs='+',
+                       default=[10 ** 3, 10 ** 4, 10 ** 5])
+    suite.add_argument('--kinds', nargs='+', choices=list(KINDS),
+                       default=list(KINDS))
+    suite.add_argument('--invalid', type=float, default=0.1)
+    suite.add_argument('--seed', type=int, default=0)
+    suite.add_argument('--output', default='benchmark.json')
+    difference = commands.add_parser('compare',
+                                     help='compare two saved results')
+    difference.add_argument('before')
+    difference.add_argument('after')
+    difference.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == 'suite':
+        results = run_suite(args.sizes, args.kinds, args.invalid, args.seed)
+        with open(args.output, 'w', encoding='utf8') as f_out:
+            json.dump(results, f_out, indent=1)
+    elif args.command == 'compare':
+        with open(args.before, 'r', encoding='utf8') as f_before, \
+                open(args.after, 'r', encoding='utf8') as f_after:
+            regressions = compare(json.load(f_before), json.load(f_after),
+                                  args.threshold)
+        sys.exit(1 if regressions else 0)
+    else:
+        bench_rss()
+        bench_validation()
+        bench_record_size()
+        bench_table()
+        bench_lookup()
+        bench_parallel()
+        bench_snapshot()
+        bench_render()
+        bench_pipeline()
+        bench_intern()
+        bench_ward()
+        bench_schedule()
+        bench_names()
+        bench_dedup()
+        bench_metrics()
+        bench_lazy()
+        bench_columnar()
+        bench_publisher()
+        bench_small_write()
+        bench_shards()
+        bench_bulk()
+        bench_statistics()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+import re
+from itertools import compress
+
+import numpy as np
+
+from main import Check, Packed
+
+# tokens of patterns of fixed length: a class or a character, possibly
+# escaped, repeated {n} times
+_TOKEN = re.compile(r'(\\d|\\.|[^\\{}()\[\]*+?|^$])(?:\{(\d+)\})?')
+
+
+def template(pattern):
+    """
+    Function of translating regular expression of strings of fixed length
+    into classes of their characters
+    :param pattern: expression of \\d, ., escaped and plain characters
+    repeated {n} times
+    :return: list of 'digit', 'any' or character for every position, None
+    if pattern is not of this kind
+    """
+
+    positions = []
+    end = 0
+    for token in _TOKEN.finditer(pattern):
+        if token.start() != end:
+            return None
+        end = token.end()
+        item = token.group(1)
+        if item == '\\d':
+            item = 'digit'
+        elif item == '.':
+            item = 'any'
+        elif item.startswith('\\'):
+            if item[1].isalnum():
+                return None
+            item = item[1]
+        positions += [item] * int(token.group(2) or 1)
+    return positions if end == len(pattern) else None
+
+
+class BulkSchema:
+    """
+    Class representing checks of the fields of a record class run on a
+    chunk of rows by columns: fields of fixed format are checked by NumPy
+    comparisons of character codes, other fields by checking every distinct
+    value of the column once, so records are made from checked columns
+    without running checks per row
+    """
+
+    def __init__(self, record_class):
+        """
+        Sets all the necessary attributes for the class BulkSchema
+        :param record_class:
+        """
+
+        self.record_class = record_class
+        self.schema = record_class._schema
+        self.fields = self.schema.fields[1:]
+        self.names = self.schema.names[1:]
+        self.templates = [
+            None if isinstance(check, Packed) or check.pattern is None
+            else template(check.pattern)
+            for name, check in self.fields]
+
+    def _matched(self, column, positions, fullmatch):
+        """
+        Method of checking column against pattern of fixed length
+        :param column: list of strings
+        :param positions: template of pattern
+        :param fullmatch: function of compiled pattern
+        :return: array, True for matching values
+        """
+
+        count, length = len(column), len(positions)
+        lengths = np.fromiter(map(len, column), dtype=np.int64, count=count)
+        codes = np.array(column, dtype=f'U{length}').view(np.uint32) \
+            .reshape(count, length)
+        matched = lengths == length
+        digits = [i for i, item in enumerate(positions) if item == 'digit']
+        anything = [i for i, item in enumerate(positions) if item == 'any']
+        chars = [i for i, item in enumerate(positions)
+                 if item not in ('digit', 'any')]
+        if digits:
+            matched &= (codes[:, digits] - np.uint32(48) <= 9).all(axis=1)
+        if anything:
+            matched &= (codes[:, anything] != 10).all(axis=1)
+        if chars:
+            matched &= (codes[:, chars] == np.array(
+                [ord(positions[i]) for i in chars], dtype=np.uint32)).all(
+                axis=1)
+        # \d also matches digits of other scripts
+        for row in np.flatnonzero(~matched & (lengths == length)).tolist():
+            matched[row] = fullmatch(column[row]) is not None
+        return matched
+
+    @staticmethod
+    def _distinct(column, check):
+        """
+        Method of checking every distinct value of column once
+        :param column: list of strings
+        :param check: function of value
+        :return: list of results of check for distinct values, array of
+        numbers of distinct values of rows and array of distinct values
+        check raised on
+        """
+
+        distinct = dict.fromkeys(column)
+        numbers = dict(zip(distinct, range(len(distinct))))
+        inverse = np.fromiter(map(numbers.__getitem__, column),
+                              dtype=np.int64, count=len(column))
+        results = []
+        raised = np.zeros(len(distinct), dtype=bool)
+        for i, value in enumerate(distinct):
+            try:
+                results.append(check(value))
+            except (TypeError, ValueError):
+                results.append(None)
+                raised[i] = True
+        return results, inverse, raised
+
+    def columns(self, rows):
+        """
+        Method of checking chunk of rows by columns
+        :param rows: lists of constructor arguments after id, e.g. split
+        lines of file
+        :return: array of rows the constructor accepts, array of rows and
+        fields whose values are rejected and stored as None, values of fields
+        that are not packed by column and _codes of rows
+        """
+
+        count = len(rows)
+        valid = np.fromiter(map(len, rows), dtype=np.int64,
+                            count=count) == len(self.fields)
+        if not valid.all():
+            blank = [''] * len(self.fields)
+            rows = [row if ok else blank
+                    for row, ok in zip(rows, valid.tolist())]
+        null = np.zeros((count, len(self.fields)), dtype=bool)
+        values = []
+        codes = np.zeros(count, dtype=np.uint64)
+        if not count:
+            return valid, null, values, codes
+
+        for i, ((name, check), positions, column) in enumerate(
+                zip(self.fields, self.templates, zip(*rows))):
+            if isinstance(check, Packed):
+                results, inverse, raised = BulkSchema._distinct(
+                    column, check.check.function)
+                distinct = np.array([check.codes.get(result, 0)
+                                     for result in results], dtype=np.uint64)
+                codes |= distinct[inverse] << np.uint64(check.shift)
+                null[:, i] = distinct[inverse] == 0
+                valid &= ~raised[inverse]
+            elif positions is not None:
+                matched = self._matched(column, positions,
+                                        check.namespace['fullmatch'])
+                null[:, i] = ~matched
+                column = list(column)
+                for row in np.flatnonzero(~matched).tolist():
+                    column[row] = None
+                values.append(column)
+            elif check is Check.is_str:
+                values.append(column)
+            elif check.type is str:
+                # strings are checked once, so pooled ones are looked up once
+                function = check.function
+                results = {value: function(value)
+                           for value in dict.fromkeys(column)}
+                column = list(map(results.__getitem__, column))
+                if None in results.values():
+                    null[:, i] = [value is None for value in column]
+                values.append(column)
+            else:
+                results, inverse, raised = BulkSchema._distinct(
+                    column, check.function)
+                is_none = np.array([result is None for result in results],
+                                   dtype=bool)
+                null[:, i] = is_none[inverse]
+                valid &= ~raised[inverse]
+                values.append(np.array(results, dtype=object)[
+                    inverse].tolist())
+        return valid, null, values, codes
+
+    def check(self, rows):
+        """
+        Method of checking chunk of rows by columns before records are made
+        :param rows: lists of constructor arguments after id
+        :return: pair of array, True for rows the constructor accepts, and
+        array of rows and fields, True for values stored as None
+        """
+
+        valid, null, values, codes = self.columns(rows)
+        return valid, null
+
+    def records(self, rows, first_id):
+        """
+        Method of making records of accepted rows of chunk from checked
+        columns, they are equal to records made by the constructor
+        :param rows: lists of constructor arguments after id
+        :param first_id: id of the record of the first accepted row
+        :return: list of records of accepted rows with consecutive ids,
+        array of accepted rows and array of rejected values
+        """
+
+        valid, null, values, codes = self.columns(rows)
+        accepted = valid.tolist()
+        ids = range(first_id, first_id + int(valid.sum()))
+        restore = self.schema.restore
+        record_class = self.record_class
+        records = [restore(record_class, state) for state in zip(
+            ids, *(compress(column, accepted) for column in values),
+            compress(codes.tolist(), accepted))]
+        return records, valid, null
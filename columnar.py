@@ -0,0 +1,317 @@
+import json
+import os
+import zipfile
+from operator import attrgetter
+
+import numpy as np
+
+from main import Load, Packed, Schema
+
+MAGIC = 'registry-columns'
+VERSION = 1
+
+# rows written at once, so that memory does not grow with the file
+CHUNK_SIZE = 1 << 16
+
+
+def columns_of(record_class):
+    """
+    Function of getting typed columns of records of record_class in the
+    order of its schema
+    :param record_class:
+    :return: list of dicts with name, kind, int, str or category, and the
+    values of a category, their codes start from 1 and 0 is None
+    """
+
+    columns = []
+    for name, check in record_class._schema.fields:
+        column = {'name': Schema.public_name(name)}
+        if isinstance(check, Packed):
+            column['kind'] = 'category'
+            column['values'] = list(check.values[1:])
+        elif check.type in (int, str):
+            column['kind'] = check.type.__name__
+        else:
+            raise TypeError(f'{column["name"]} of {record_class.__name__} '
+                            f'has no column type')
+        columns.append(column)
+    return columns
+
+
+def _encode(column, records, codes):
+    """
+    Function of making arrays of values of column of chunk of records
+    :param column: dict of columns_of
+    :param records: list of records
+    :param codes: array of _codes of records
+    :return: dict of suffix of array name and array
+    """
+
+    name = column['name']
+    if column['kind'] == 'category':
+        packed = getattr(type(records[0]), name)
+        return {'': (codes >> packed.shift & packed.mask).astype(np.uint8)}
+
+    values = list(map(attrgetter(name), records))
+    if column['kind'] == 'int':
+        return {'': np.fromiter((0 if value is None else value
+                                 for value in values),
+                                dtype=np.int64, count=len(values)),
+                '.null': np.fromiter((value is None for value in values),
+                                     dtype=bool, count=len(values))}
+
+    # strings are numbered in order of first appearance in the chunk and
+    # kept once as UTF-8 bytes with offsets, -1 is None
+    words = dict.fromkeys(values)
+    words.pop(None, None)
+    numbers = dict(zip(words, range(len(words))))
+    numbers[None] = -1
+    numbers = np.fromiter(map(numbers.__getitem__, values), dtype=np.int32,
+                          count=len(values))
+    encoded = [word.encode('utf8') for word in words]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(word) for word in encoded], out=offsets[1:])
+    return {'': numbers, '.offsets': offsets,
+            '.data': np.frombuffer(b''.join(encoded), dtype=np.uint8)}
+
+
+def write(path, record_class, records, columns=None, chunk_size=CHUNK_SIZE,
+          compress=False):
+    """
+    Function of writing records to a .npz file by columns, every chunk of
+    chunk_size records is encoded and written before the next one is read
+    :param path: name of .npz file
+    :param record_class:
+    :param records: iterable of records of record_class, e.g. a generator of
+    Load.iter_records
+    :param columns: names of written columns, by default all columns; only
+    a file with all columns can be read back as records
+    :param chunk_size:
+    :param compress: if True, arrays are deflated
+    :return: number of written records
+    """
+
+    written = columns_of(record_class)
+    if columns is not None:
+        by_name = {column['name']: column for column in written}
+        unknown = [name for name in columns if name not in by_name]
+        if unknown:
+            raise ValueError(f'{record_class.__name__} has no columns '
+                             f'{", ".join(unknown)}')
+        written = [by_name[name] for name in columns]
+
+    sizes = []
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(path + '.tmp', 'w', compression=compression,
+                         allowZip64=True) as f_columns:
+        def add(name, array):
+            with f_columns.open(name + '.npy', 'w',
+                                force_zip64=True) as f_array:
+                np.lib.format.write_array(f_array, array, allow_pickle=False)
+
+        for chunk in Load._chunked(records, chunk_size):
+            codes = np.fromiter(map(attrgetter('_codes'), chunk),
+                                dtype=np.uint64, count=len(chunk))
+            for column in written:
+                for suffix, array in _encode(column, chunk, codes).items():
+                    add(f'{len(sizes)}/{column["name"]}{suffix}', array)
+            sizes.append(len(chunk))
+
+        add('meta', np.array(json.dumps({
+            'format': MAGIC, 'version': VERSION,
+            'record_class': record_class.__name__,
+            'columns': written, 'chunks': sizes}, ensure_ascii=False)))
+    os.replace(path + '.tmp', path)
+    return sum(sizes)
+
+
+class ColumnFile:
+    """
+    Class representing records of one class written by columns to a .npz
+    file, arrays of a column are read only when they are needed
+    """
+
+    def __init__(self, path, record_class=None):
+        """
+        Sets all the necessary attributes for the class ColumnFile
+        :param path: name of .npz file
+        :param record_class: if given, the file must be written from its
+        records
+        """
+
+        self.path = path
+        self.arrays = np.load(path, allow_pickle=False)
+        try:
+            meta = json.loads(str(self.arrays['meta']))
+        except (KeyError, ValueError):
+            meta = {}
+        if meta.get('format') != MAGIC or meta.get('version') != VERSION:
+            self.arrays.close()
+            raise ValueError(f'{path} is not a column file of version '
+                             f'{VERSION}')
+        self.class_name = meta['record_class']
+        if record_class is not None and \
+                self.class_name != record_class.__name__:
+            self.arrays.close()
+            raise ValueError(f'{path} is not a column file of '
+                             f'{record_class.__name__}')
+        self.columns = {column['name']: column for column in meta['columns']}
+        self.sizes = meta['chunks']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return sum(self.sizes)
+
+    def _codes(self, chunk, name):
+        """
+        Method of reading codes of category column of chunk
+        :param chunk: number of chunk
+        :param name: name of column
+        :return: array of codes, 0 is None
+        """
+
+        codes = self.arrays[f'{chunk}/{name}']
+        if len(codes) and codes.max() > len(self.columns[name]['values']):
+            raise ValueError(f'{self.path}: code of {name} in chunk {chunk} '
+                             f'is out of range')
+        return codes
+
+    def _recode(self, chunk, name, packed):
+        """
+        Method of reading codes of category column of chunk as codes of
+        packed field, codes of the file are numbers of its stored values,
+        so that a file written before values of the field were added or
+        reordered is read with the right values
+        :param chunk: number of chunk
+        :param name: name of column
+        :param packed: main.Packed of the field
+        :return: array of codes of packed
+        """
+
+        values = self.columns[name]['values']
+        unknown = [value for value in values if value not in packed.codes]
+        if unknown:
+            raise ValueError(f'{self.path}: values {unknown} of {name} are '
+                             f'not allowed')
+        codes = np.array([0] + [packed.codes[value] for value in values],
+                         dtype=np.uint64)
+        return codes[self._codes(chunk, name)]
+
+    def _decode(self, chunk, name, check=None):
+        """
+        Method of reading values of column of chunk
+        :param chunk: number of chunk
+        :param name: name of column
+        :param check: if given, every distinct string is passed to it and
+        must stay the same
+        :return: list of values with None for absent values
+        """
+
+        column = self.columns[name]
+        key = f'{chunk}/{name}'
+        if column['kind'] == 'int':
+            values = self.arrays[key].tolist()
+            for row in np.flatnonzero(self.arrays[key + '.null']).tolist():
+                values[row] = None
+            return values
+
+        if column['kind'] == 'category':
+            values = [None] + column['values']
+            return [values[code]
+                    for code in self._codes(chunk, name).tolist()]
+
+        data = self.arrays[key + '.data'].tobytes()
+        offsets = self.arrays[key + '.offsets'].tolist()
+        words = [data[start:end].decode('utf8')
+                 for start, end in zip(offsets, offsets[1:])]
+        if check is not None:
+            checked = [check(word) for word in words]
+            for word, value in zip(words, checked):
+                if value != word:
+                    raise ValueError(f'{self.path}: {word!r} of {name} is '
+                                     f'rejected by its check')
+            words = checked
+        # None is the last, so that -1 gives it
+        words.append(None)
+        return [words[number] for number in self.arrays[key].tolist()]
+
+    def chunks(self, columns=None):
+        """
+        Method of reading the file chunk by chunk
+        :param columns: names of read columns, by default all columns of
+        the file
+        :return: generator of dicts of column name and list of its values
+        """
+
+        columns = list(self.columns) if columns is None else list(columns)
+        unknown = [name for name in columns if name not in self.columns]
+        if unknown:
+            raise ValueError(f'{self.path} has no columns '
+                             f'{", ".join(unknown)}')
+        for chunk in range(len(self.sizes)):
+            yield {name: self._decode(chunk, name) for name in columns}
+
+    def column(self, name):
+        """
+        Method of getting all values of column
+        :param name:
+        :return: list of values with None for absent values
+        """
+
+        values = []
+        for chunk in self.chunks([name]):
+            values.extend(chunk[name])
+        return values
+
+    def records(self, record_class, first_id=None):
+        """
+        Method of reading records, distinct strings of a chunk pass the
+        checks of their fields again, so that they are validated and
+        interned like by the constructor
+        :param record_class: class the file was written from
+        :param first_id: id of the first record, by default records keep
+        the ids they had when the file was written
+        :return: generator of records
+        """
+
+        if self.class_name != record_class.__name__:
+            raise ValueError(f'{self.path} is not a column file of '
+                             f'{record_class.__name__}')
+        schema = record_class._schema
+        fields = [(Schema.public_name(name), check)
+                  for name, check in schema.fields]
+        missing = [name for name, check in fields if name not in self.columns]
+        if missing:
+            raise ValueError(f'{self.path} has no columns '
+                             f'{", ".join(missing)}')
+
+        for chunk in range(len(self.sizes)):
+            stored = []
+            codes = np.zeros(self.sizes[chunk], dtype=np.uint64)
+            for name, check in fields:
+                if isinstance(check, Packed):
+                    codes |= (self._recode(chunk, name, check)
+                              << np.uint64(check.shift))
+                elif self.columns[name]['kind'] == 'str':
+                    stored.append(self._decode(chunk, name, check))
+                else:
+                    stored.append(self._decode(chunk, name))
+            if first_id is not None:
+                stored[0] = range(first_id, first_id + self.sizes[chunk])
+                first_id += self.sizes[chunk]
+            stored.append(codes.tolist())
+            for state in zip(*stored):
+                yield schema.restore(record_class, state)
+
+    def close(self):
+        """
+        Method of closing the file
+        :return:
+        """
+
+        self.arrays.close()
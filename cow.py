@@ -0,0 +1,337 @@
+from collections.abc import Sequence
+from itertools import chain
+
+import numpy as np
+
+
+class Chunks(Sequence):
+    """
+    Class representing a list of records split into chunks of the same size,
+    so that it is copied in time of the number of chunks: copies share
+    chunks until one of them changes a chunk and copies it first
+    """
+
+    def __init__(self, items=(), size=1024):
+        """
+        Sets all the necessary attributes for the class Chunks
+        :param items: iterable of first items
+        :param size: number of items of a chunk, only the last one is shorter
+        """
+
+        self.size = size
+        self.chunks = []
+        self.owned = []
+        self.length = 0
+        for item in items:
+            self.append(item)
+
+    def _chunk(self, i):
+        """
+        Method of getting chunk number i to be changed, a shared chunk is
+        copied first
+        :param i:
+        :return: list of items
+        """
+
+        if not self.owned[i]:
+            self.chunks[i] = list(self.chunks[i])
+            self.owned[i] = True
+        return self.chunks[i]
+
+    def append(self, item):
+        """
+        Method of adding item to the end
+        :param item:
+        :return:
+        """
+
+        if self.length % self.size:
+            self._chunk(len(self.chunks) - 1).append(item)
+        else:
+            self.chunks.append([item])
+            self.owned.append(True)
+        self.length += 1
+
+    def extend(self, items):
+        """
+        Method of adding items to the end
+        :param items: iterable of items
+        :return:
+        """
+
+        for item in items:
+            self.append(item)
+
+    def copy(self):
+        """
+        Method of copying the list, both lists share their chunks
+        :return: Chunks
+        """
+
+        chunks = Chunks.__new__(Chunks)
+        chunks.size = self.size
+        chunks.chunks = list(self.chunks)
+        chunks.owned = [False] * len(self.chunks)
+        chunks.length = self.length
+        self.owned = [False] * len(self.chunks)
+        return chunks
+
+    def _index(self, i):
+        if i < 0:
+            i += self.length
+        if not 0 <= i < self.length:
+            raise IndexError('list index out of range')
+        return divmod(i, self.size)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self.length)
+            if step != 1:
+                return list(self)[i]
+            items = []
+            for chunk in range(start // self.size,
+                               (stop - 1) // self.size + 1):
+                first = chunk * self.size
+                items += self.chunks[chunk][max(start - first, 0):
+                                            stop - first]
+            return items
+        if 0 <= i < self.length:
+            return self.chunks[i // self.size][i % self.size]
+        chunk, i = self._index(i)
+        return self.chunks[chunk][i]
+
+    def __setitem__(self, i, item):
+        chunk, i = self._index(i)
+        self._chunk(chunk)[i] = item
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return chain.from_iterable(self.chunks)
+
+    def __eq__(self, other):
+        if not isinstance(other, (list, Chunks)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            item == other_item for item, other_item in zip(self, other))
+
+    __hash__ = None
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class Buckets:
+    """
+    Class representing a dict split into buckets by hashes of keys, so that
+    it is copied in time of the number of buckets: copies share buckets until
+    one of them changes a bucket and copies it first
+    """
+
+    def __init__(self, bits=8, copy=dict):
+        """
+        Sets all the necessary attributes for the class Buckets
+        :param bits: the dict has 2 ** bits buckets
+        :param copy: function copying a shared bucket before it is changed,
+        values changed in place must be copied by it too
+        """
+
+        self.mask = (1 << bits) - 1
+        self.copy_bucket = copy
+        self.buckets = [{} for _ in range(self.mask + 1)]
+        self.owned = [True] * (self.mask + 1)
+
+    def bucket(self, key):
+        """
+        Method of getting bucket of key to be changed, a shared bucket is
+        copied first
+        :param key:
+        :return: dict
+        """
+
+        # _slot inlined, values of indexes are added through this
+        i = hash(key)
+        i = (i ^ i >> 4) & self.mask
+        if not self.owned[i]:
+            self.buckets[i] = self.copy_bucket(self.buckets[i])
+            self.owned[i] = True
+        return self.buckets[i]
+
+    def _slot(self, key):
+        # objects are aligned to 16 bytes, so their ids have no low bits
+        key = hash(key)
+        return (key ^ key >> 4) & self.mask
+
+    def get(self, key, default=None):
+        return self.buckets[self._slot(key)].get(key, default)
+
+    def __getitem__(self, key):
+        return self.buckets[self._slot(key)][key]
+
+    def __setitem__(self, key, value):
+        self.bucket(key)[key] = value
+
+    def __delitem__(self, key):
+        del self.bucket(key)[key]
+
+    def __contains__(self, key):
+        return key in self.buckets[self._slot(key)]
+
+    def pop(self, key, default=None):
+        """
+        Method of removing key
+        :param key:
+        :param default:
+        :return: value of key or default if it is not in the dict
+        """
+
+        if key not in self:
+            return default
+        return self.bucket(key).pop(key)
+
+    def copy(self):
+        """
+        Method of copying the dict, both dicts share their buckets
+        :return: Buckets
+        """
+
+        buckets = Buckets.__new__(Buckets)
+        buckets.mask = self.mask
+        buckets.copy_bucket = self.copy_bucket
+        buckets.buckets = list(self.buckets)
+        buckets.owned = [False] * (self.mask + 1)
+        self.owned = [False] * (self.mask + 1)
+        return buckets
+
+    def values(self):
+        return chain.from_iterable(bucket.values()
+                                   for bucket in self.buckets)
+
+    def items(self):
+        return chain.from_iterable(bucket.items() for bucket in self.buckets)
+
+    def __iter__(self):
+        return chain.from_iterable(self.buckets)
+
+    def __len__(self):
+        return sum(map(len, self.buckets))
+
+
+class Column:
+    """
+    Class representing a numpy array values are appended to: they are kept
+    in a list until flush writes them to the array, whose capacity is
+    doubled when it is full; arrays given by view are not changed by later
+    appends, so they are shared with readers and with columns made by share
+    """
+
+    def __init__(self, dtype, fill=0):
+        """
+        Sets all the necessary attributes for the class Column
+        :param dtype: numpy type of values
+        :param fill: value of places not appended yet
+        """
+
+        self.fill = fill
+        self.data = np.full(16, fill, dtype=dtype)
+        self.length = 0
+        self.pending = []
+        # number of values written to the array by any column sharing it
+        self.end = [0]
+
+    def append(self, value):
+        """
+        Method of adding value to the end, it is written to the array by the
+        next flush
+        :param value:
+        :return:
+        """
+
+        self.pending.append(value)
+
+    def flush(self):
+        """
+        Method of writing appended values to the array
+        :return:
+        """
+
+        if not self.pending:
+            return
+        length = self.length + len(self.pending)
+        # a column sharing the array may have written past the end of this one
+        if self.end[0] != self.length or length > len(self.data):
+            data = np.full(max(2 * len(self.data), length), self.fill,
+                           dtype=self.data.dtype)
+            data[:self.length] = self.data[:self.length]
+            self.data = data
+            self.end = [self.length]
+        self.data[self.length:length] = self.pending
+        self.length = length
+        self.pending = []
+        self.end[0] = length
+
+    def view(self, length=None):
+        """
+        Method of getting first values, they are flushed if they are not in
+        the array yet
+        :param length: number of values, by default all of them
+        :return: numpy array
+        """
+
+        if length is None or length > self.length:
+            self.flush()
+        return self.data[:self.length if length is None else length]
+
+    def copy(self, length=None):
+        """
+        Method of copying first values to a new column
+        :param length: number of values, by default all of them
+        :return: Column
+        """
+
+        data = self.view(length)
+        column = Column(self.data.dtype, self.fill)
+        column.data = np.full(max(len(data), 16), self.fill,
+                              dtype=self.data.dtype)
+        column.data[:len(data)] = data
+        column.length = len(data)
+        column.end = [column.length]
+        return column
+
+    def share(self):
+        """
+        Method of making a column sharing the array with this one, the
+        first of them to flush appended values writes them past the end of
+        the other one, which copies the array when it flushes its own
+        :return: Column
+        """
+
+        self.flush()
+        column = Column.__new__(Column)
+        column.fill = self.fill
+        column.data = self.data
+        column.length = self.length
+        column.pending = []
+        column.end = self.end
+        return column
+
+    def __getitem__(self, i):
+        if i >= self.length:
+            return self.pending[i - self.length]
+        return self.data[i]
+
+    def __setitem__(self, i, value):
+        if i >= self.length:
+            self.pending[i - self.length] = value
+        else:
+            self.data[i] = value
+
+    def __len__(self):
+        return self.length + len(self.pending)
@@ -0,0 +1,186 @@
+from array import array
+from functools import lru_cache
+
+from names import normalize
+
+# keys linking records of one person, a tuple of fields links records with
+# equal values of all of them
+KEYS = ('passport', 'medical_policy', 'phone_number',
+        ('full_name', 'birthday'))
+
+
+def key_name(key):
+    """
+    Function of getting name of key
+    :param key: field or tuple of fields
+    :return: name of field or names of fields joined by +
+    """
+
+    return key if isinstance(key, str) else '+'.join(key)
+
+
+class Duplicates:
+    """
+    Class representing clusters of records of one person: every key is a
+    block of records by its value, a record is linked to the first record of
+    its block, so records are compared in one pass instead of in pairs and
+    linked records are merged into clusters by union-find
+    """
+
+    def __init__(self, keys=KEYS, keep=True):
+        """
+        Sets all the necessary attributes for the class Duplicates
+        :param keys: fields or tuples of fields, full names are compared
+        normalized
+        :param keep: if False, only ids of records are kept and clusters are
+        lists of ids, so that files of millions of records can be streamed
+        from Load.iter_records
+        """
+
+        self.keys = keys
+        self.keep = keep
+        self.names = [key_name(key) for key in keys]
+        self.getters = [Duplicates.getter(key) for key in keys]
+        self.records = []
+        self.parents = array('q')
+        self.blocks = {name: {} for name in self.names}
+        self.links = dict.fromkeys(self.blocks, 0)
+
+    def _find(self, position):
+        """
+        Method of finding the first record of cluster of record, the path
+        to it is halved on the way
+        :param position: position of record
+        :return: position of the first record of cluster
+        """
+
+        parents = self.parents
+        while parents[position] != position:
+            parents[position] = parents[parents[position]]
+            position = parents[position]
+        return position
+
+    def _union(self, first, second):
+        first, second = self._find(first), self._find(second)
+        if first != second:
+            # the record added first stays the root
+            if second < first:
+                first, second = second, first
+            self.parents[second] = first
+
+    @staticmethod
+    def getter(key):
+        """
+        Method of making function getting value of key of record
+        :param key: field or tuple of fields
+        :return: function of record giving value, tuple of values or None if
+        a value is absent
+        """
+
+        if isinstance(key, str):
+            return lambda record: getattr(record, key, None)
+        # names repeat, so normalized ones are cached
+        names = lru_cache(1 << 16)(normalize)
+
+        def get(record):
+            values = []
+            for field in key:
+                value = getattr(record, field, None)
+                if value is None:
+                    return None
+                values.append(names(value) if field == 'full_name'
+                              else value)
+            return tuple(values)
+
+        return get
+
+    def add(self, record):
+        """
+        Method of adding record and linking it to the records with equal
+        values of keys
+        :param record:
+        :return: position of record
+        """
+
+        position = len(self.records)
+        self.records.append(record if self.keep else record.id)
+        self.parents.append(position)
+        for get, name in zip(self.getters, self.names):
+            value = get(record)
+            if value is None:
+                continue
+            first = self.blocks[name].setdefault(value, position)
+            if first != position:
+                self._union(first, position)
+                self.links[name] += 1
+        return position
+
+    def add_all(self, records):
+        """
+        Method of adding records, e.g. loaded ones or ones read by
+        Load.iter_records
+        :param records: iterable of records
+        :return: number of added records
+        """
+
+        count = 0
+        for record in records:
+            self.add(record)
+            count += 1
+        return count
+
+    def clusters(self):
+        """
+        Method of getting clusters of more than one record
+        :return: list of lists of records or of their ids in order they were
+        added, ordered by their first records
+        """
+
+        groups = {}
+        for position in range(len(self.records)):
+            groups.setdefault(self._find(position), []).append(position)
+        return [[self.records[position] for position in positions]
+                for positions in groups.values() if len(positions) > 1]
+
+    def report(self):
+        """
+        Method of getting counters of duplicates
+        :return: dict with numbers of records, clusters, records in them and
+        links made by every key
+        """
+
+        clusters = self.clusters()
+        return {'records': len(self.records), 'clusters': len(clusters),
+                'duplicates': sum(len(cluster) for cluster in clusters),
+                'links': dict(self.links)}
+
+    def write(self, filename):
+        """
+        Method of writing clusters to file, a line of ids of records of a
+        cluster separated by ; for every cluster
+        :param filename:
+        :return: number of clusters
+        """
+
+        clusters = self.clusters()
+        with open(filename, 'w', encoding='utf8') as f_out:
+            for cluster in clusters:
+                if self.keep:
+                    cluster = [record.id for record in cluster]
+                f_out.write(''.join(f'{id};' for id in cluster) + '\n')
+        return len(clusters)
+
+
+def find_duplicates(*groups, keys=KEYS):
+    """
+    Function of finding clusters of records of one person in groups of
+    records, e.g. Load.hospital_patients and Load.ambulatory_patients
+    :param groups: iterables of records
+    :param keys:
+    :return: list of clusters, lists of records
+    """
+
+    duplicates = Duplicates(keys)
+    for records in groups:
+        duplicates.add_all(records)
+    return duplicates.clusters()
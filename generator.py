@@ -0,0 +1,174 @@
+import random
+
+SURNAMES = ['Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров',
+            'Соколов', 'Михайлов', 'Новиков', 'Фёдоров', 'Морозов', 'Волков']
+NAMES = ['Александр', 'Сергей', 'Дмитрий', 'Андрей', 'Алексей', 'Максим',
+         'Евгений', 'Иван', 'Михаил', 'Артём', 'Никита', 'Семён']
+PATRONYMICS = ['Александрович', 'Сергеевич', 'Дмитриевич', 'Андреевич',
+               'Алексеевич', 'Иванович', 'Михайлович', 'Петрович']
+PLACES = ['Новосибирская обл. г. Новосибирск',
+          'Новосибирская обл. Искитимский р-н г. Искитим',
+          'Новосибирская обл. Карасукский р-н г. Карасук',
+          'Новосибирская обл. Мошковский р-н пгт Мошково']
+STREETS = ['Кочковская', 'Мартена', 'Нарвская', 'Гоголя', 'Науки', 'Дружбы']
+COMPANIES = ['ЗАО Монтаж', 'ООО Монолит', 'ОАО Инфо', 'ЧП ОптАгро', 'НГУ']
+ALLERGIES = ['Не выявлено', 'Пенициллины', 'Сульфанил', 'Местные анестетики',
+             'Пыль и клещи домашней пыли']
+DIAGNOSES = ['Не выявлено', 'Сердечная аритмия', 'Ишемическая болезнь сердца',
+             'Гипертоническая болезнь', 'Бронхиальная астма']
+DEPARTMENTS = ['терапевтическое', 'кардиологическое', 'хирургическое',
+               'неврологическое']
+SPECIALTIES = ['терапевт', 'кардиолог', 'хирург', 'невролог']
+
+
+def _date(rng, first_year, last_year):
+    return (f'{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.'
+            f'{rng.randint(first_year, last_year)}')
+
+
+def _bool(rng):
+    return rng.choice(['True', 'False'])
+
+
+# every column is a pair of function making a valid value from random
+# generator and list of values that fail the check of the column, an empty
+# list for columns whose check accepts any string
+PERSON = [
+    (lambda rng: f'{rng.choice(SURNAMES)} {rng.choice(NAMES)} '
+                 f'{rng.choice(PATRONYMICS)}', []),
+    (lambda rng: rng.choice(['муж.', 'жен.']), ['м', 'ж', 'мужской']),
+    (lambda rng: _date(rng, 1940, 2005), ['1.2.1990', '12.07.91']),
+    (lambda rng: rng.choice(PLACES), []),
+    (_bool, ['да', 'нет']),
+    (lambda rng: f'5004 {rng.randint(0, 999999):06d} '
+                 f'{_date(rng, 2000, 2022)}', ['500б 252044 11.02.2007']),
+    (lambda rng: f'г. Новосибирск ул. {rng.choice(STREETS)} '
+                 f'д. {rng.randint(1, 99)} кв. {rng.randint(1, 300)}', []),
+    (lambda rng: rng.choice(['высшее', 'ср.спец', 'среднее']),
+     ['среднее специальное', 'начальное']),
+    (lambda rng: f'+7(9{rng.randint(0, 99):02d}){rng.randint(0, 999):03d}-'
+                 f'{rng.randint(0, 99):02d}-{rng.randint(0, 99):02d}',
+     ['+7(962)297-41-1', '89132974111']),
+]
+
+# work experience is only given as a number, the constructor raises
+# ValueError for other strings
+EMPLOYEE = PERSON + [
+    (_bool, ['да', 'нет']),
+    (lambda rng: f'{rng.randint(100000, 999999)} '
+                 f'{rng.randint(1000000, 9999999)}', []),
+    (lambda rng: str(rng.randint(1970, 2022)), ['1799', '2099']),
+    (lambda rng: rng.choice(['врач', 'медицинская сестра']), []),
+    (lambda rng: rng.choice(SPECIALTIES), []),
+    (lambda rng: rng.choice(['врач', 'медицинская сестра']),
+     ['врач кардиолог', 'медбрат']),
+    (lambda rng: str(rng.randint(0, 40)), ['121', '-1']),
+]
+
+DOCTOR = EMPLOYEE + [
+    (_bool, ['да', 'нет']),
+    (_bool, ['да', 'нет']),
+    (lambda rng: rng.choice(['высшая', 'первая', 'вторая']), ['выссшая']),
+    (_bool, ['да', 'нет']),
+    (lambda rng: rng.choice(['нет', 'одна', 'две']), []),
+    (_bool, ['да', 'нет']),
+    (_bool, ['да', 'нет']),
+    (_bool, ['да', 'нет']),
+]
+
+NURSE = EMPLOYEE + [
+    (_bool, ['да', 'нет']),
+    (_bool, ['да', 'нет']),
+    (_bool, ['да', 'нет']),
+]
+
+PATIENT = PERSON + [
+    (lambda rng: str(rng.randint(5400000000000000, 5400099999999999)), []),
+    (lambda rng: rng.choice(['рабочий', 'служащий', 'обучающийся']),
+     ['пенсионер']),
+    (lambda rng: rng.choice(COMPANIES), []),
+    (lambda rng: str(rng.randint(1, 4)), ['первая', '5']),
+    (lambda rng: rng.choice(['+', '-']), ['п.', 'положительный']),
+    (lambda rng: rng.choice(ALLERGIES), []),
+]
+
+AMBULATORY_PATIENT = PATIENT + [
+    (lambda rng: str(rng.randint(1, 20)), ['25', '0']),
+    (lambda rng: str(rng.randint(0, 3)), ['II', '4']),
+    (lambda rng: rng.choice(['I', 'II', 'III']), ['IV', '1']),
+    (lambda rng: rng.choice(DIAGNOSES), []),
+]
+
+HOSPITAL_PATIENT = PATIENT + [
+    (lambda rng: rng.choice(DEPARTMENTS), []),
+    (lambda rng: str(rng.randint(1, 60)), ['22/1', 'двенадцать']),
+    (lambda rng: rng.choice(DIAGNOSES[1:]), []),
+]
+
+COLUMNS = {
+    'hospital_patients': HOSPITAL_PATIENT,
+    'ambulatory_patients': AMBULATORY_PATIENT,
+    'nurses': NURSE,
+    'doctors': DOCTOR,
+}
+
+# columns of unique values made from row number, so that index lookups find
+# one record
+PASSPORT, PHONE_NUMBER, MEDICAL_POLICY = 5, 8, 9
+
+
+def generate_rows(kind, rows, invalid=0.1, seed=0, templates=1000):
+    """
+    Function of generating rows of file of records, rows are made from a
+    pool of random templates with unique passport, phone number and medical
+    policy, in invalid rows from one to three columns fail their checks
+    :param kind: 'hospital_patients', 'ambulatory_patients', 'nurses' or
+    'doctors'
+    :param rows: number of rows
+    :param invalid: share of invalid rows
+    :param seed: seed of random generator, the same seed gives the same rows
+    :param templates: number of random templates
+    :return: generator of lines in the format of the files of kind
+    """
+
+    columns = COLUMNS[kind]
+    rng = random.Random(seed)
+    pool = [[valid(rng) for valid, wrong in columns]
+            for _ in range(templates)]
+    wrong_columns = [i for i, (valid, wrong) in enumerate(columns) if wrong]
+    patient = kind.endswith('patients')
+
+    for i in range(rows):
+        row = list(pool[rng.randrange(templates)])
+        digits = f'{i % 10 ** 10:010d}'
+        row[PASSPORT] = f'{digits[:4]} {digits[4:]}{row[PASSPORT][11:]}'
+        row[PHONE_NUMBER] = (f'+7({digits[:3]}){digits[3:6]}-{digits[6:8]}-'
+                             f'{digits[8:]}')
+        if patient:
+            row[MEDICAL_POLICY] = str(5400000000000000 + i)
+        if rng.random() < invalid:
+            for column in rng.sample(wrong_columns, rng.randint(1, 3)):
+                row[column] = rng.choice(columns[column][1])
+        yield ';'.join(row) + ';\n'
+
+
+def write_file(kind, rows, filename, invalid=0.1, seed=0):
+    """
+    Function of writing file of generated rows
+    :param kind:
+    :param rows:
+    :param filename:
+    :param invalid: share of invalid rows
+    :param seed:
+    :return: filename
+    """
+
+    with open(filename, 'w', encoding='utf8') as f_out:
+        batch = []
+        for line in generate_rows(kind, rows, invalid, seed):
+            batch.append(line)
+            if len(batch) == 10000:
+                f_out.write(''.join(batch))
+                batch = []
+        f_out.write(''.join(batch))
+    return filename
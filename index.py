@@ -0,0 +1,436 @@
+from bisect import bisect_left, bisect_right
+
+from cow import Buckets
+from names import NameIndex
+
+
+def _copy_bucket(bucket):
+    """
+    Function of copying bucket of HashIndex with its lists of records
+    :param bucket: dict of values and records
+    :return: dict
+    """
+
+    return {value: list(records) if type(records) is list else records
+            for value, records in bucket.items()}
+
+
+class HashIndex:
+    """
+    Class representing an index of records by value of one field, a value
+    of one record maps to the record and a value of several records to
+    their list, so that a unique field costs no list per record; values are
+    kept in cow.Buckets, so that copies of the index share buckets until
+    they change them
+    """
+
+    def __init__(self, name, bits=8):
+        """
+        Sets all the necessary attributes for the class HashIndex
+        :param name: name of indexed field
+        :param bits: the index has 2 ** bits buckets
+        """
+
+        self.name = name
+        self.values = Buckets(bits, _copy_bucket)
+
+    def add(self, record):
+        """
+        Method of adding record to the index
+        :param record:
+        :return:
+        """
+
+        value = getattr(record, self.name, None)
+        if value is None:
+            return
+        bucket = self.values.bucket(value)
+        records = bucket.get(value)
+        if records is None:
+            bucket[value] = record
+        elif type(records) is list:
+            records.append(record)
+        else:
+            bucket[value] = [records, record]
+
+    def remove(self, record):
+        """
+        Method of removing record from the index
+        :param record:
+        :return:
+        """
+
+        value = getattr(record, self.name, None)
+        records = self.values.get(value)
+        if records is record:
+            del self.values[value]
+        elif type(records) is list and record in records:
+            bucket = self.values.bucket(value)
+            records = bucket[value]
+            records.remove(record)
+            if len(records) == 1:
+                bucket[value] = records[0]
+
+    def find(self, value):
+        """
+        Method of finding records with the value of field
+        :param value:
+        :return: list of records
+        """
+
+        records = self.values.get(value)
+        if records is None:
+            return []
+        return list(records) if type(records) is list else [records]
+
+    def get(self, value):
+        """
+        Method of finding the first record with the value of field
+        :param value:
+        :return: record or None
+        """
+
+        records = self.values.get(value)
+        return records[0] if type(records) is list else records
+
+    def copy(self):
+        """
+        Method of copying the index, records are not copied and buckets are
+        shared until one of the indexes changes them
+        :return: index
+        """
+
+        index = HashIndex.__new__(HashIndex)
+        index.name = self.name
+        index.values = self.values.copy()
+        return index
+
+    def __len__(self):
+        return sum(len(records) if type(records) is list else 1
+                   for records in self.values.values())
+
+
+class SortedIndex:
+    """
+    Class representing an index of records ordered by value of one field,
+    keys and records are kept in sorted chunks, so that a record is sorted
+    into place by changing one chunk and copies of the index share chunks
+    until they change them
+    """
+
+    def __init__(self, name, key=None, load=512):
+        """
+        Sets all the necessary attributes for the class SortedIndex
+        :param name: name of indexed field
+        :param key: function making comparable key from value of field
+        :param load: number of records of a chunk, a chunk of twice as many
+        records is split
+        """
+
+        self.name = name
+        self.key = key or (lambda value: value)
+        self.load = load
+        # chunks of keys and of their records, the greatest key of every
+        # chunk and whether the chunk is not shared with a copy
+        self.keys = []
+        self.records = []
+        self.maxes = []
+        self.owned = []
+        self.count = 0
+        self.pending = []
+
+    def add(self, record):
+        """
+        Method of adding record to the index, it is sorted into place by the
+        next lookup, so that loading many records costs one sort
+        :param record:
+        :return:
+        """
+
+        value = getattr(record, self.name, None)
+        if value is not None:
+            self.pending.append((self.key(value), record))
+
+    def _chunk(self, i):
+        """
+        Method of getting chunk number i to be changed, a shared chunk is
+        copied first
+        :param i:
+        :return: pair of lists of keys and records
+        """
+
+        if not self.owned[i]:
+            self.keys[i] = list(self.keys[i])
+            self.records[i] = list(self.records[i])
+            self.owned[i] = True
+        return self.keys[i], self.records[i]
+
+    def remove(self, record):
+        """
+        Method of removing record from the index
+        :param record:
+        :return:
+        """
+
+        value = getattr(record, self.name, None)
+        if value is None:
+            return
+        self.sort()
+        key = self.key(value)
+        for i in range(bisect_left(self.maxes, key), len(self.maxes)):
+            keys = self.keys[i]
+            for j in range(bisect_left(keys, key), bisect_right(keys, key)):
+                if self.records[i][j] is record:
+                    keys, records = self._chunk(i)
+                    del keys[j]
+                    del records[j]
+                    self.count -= 1
+                    if keys:
+                        self.maxes[i] = keys[-1]
+                    else:
+                        del self.keys[i], self.records[i], self.maxes[i], \
+                            self.owned[i]
+                    return
+            if keys[-1] != key:
+                return
+
+    def sort(self):
+        """
+        Method of sorting pending records into the index: a few are inserted
+        into their chunks, many are sorted with the index at once; records
+        with equal keys stay in the order they were added
+        :return:
+        """
+
+        if not self.pending:
+            return
+        if len(self.pending) * 4 > self.count:
+            pairs = [pair for keys, records in zip(self.keys, self.records)
+                     for pair in zip(keys, records)] + self.pending
+            pairs.sort(key=lambda pair: pair[0])
+            self.keys, self.records, self.maxes, self.owned = [], [], [], []
+            for i in range(0, len(pairs), self.load):
+                chunk = pairs[i:i + self.load]
+                self.keys.append([key for key, record in chunk])
+                self.records.append([record for key, record in chunk])
+                self.maxes.append(chunk[-1][0])
+                self.owned.append(True)
+            self.count = len(pairs)
+        else:
+            for key, record in self.pending:
+                self._insert(key, record)
+        self.pending = []
+
+    def _insert(self, key, record):
+        """
+        Method of inserting record into its chunk after records with equal
+        keys
+        :param key:
+        :param record:
+        :return:
+        """
+
+        i = min(bisect_right(self.maxes, key), len(self.maxes) - 1)
+        keys, records = self._chunk(i)
+        j = bisect_right(keys, key)
+        keys.insert(j, key)
+        records.insert(j, record)
+        self.maxes[i] = keys[-1]
+        self.count += 1
+        if len(keys) > 2 * self.load:
+            self.keys[i:i + 1] = keys[:self.load], keys[self.load:]
+            self.records[i:i + 1] = records[:self.load], records[self.load:]
+            self.maxes[i:i + 1] = keys[self.load - 1], keys[-1]
+            self.owned[i:i + 1] = True, True
+
+    def find(self, value):
+        """
+        Method of finding records with the value of field
+        :param value:
+        :return: list of records
+        """
+
+        return self.range(value, value)
+
+    def get(self, value):
+        """
+        Method of finding the first record with the value of field
+        :param value:
+        :return: record or None
+        """
+
+        self.sort()
+        key = self.key(value)
+        i = bisect_left(self.maxes, key)
+        if i < len(self.maxes):
+            j = bisect_left(self.keys[i], key)
+            if self.keys[i][j] == key:
+                return self.records[i][j]
+        return None
+
+    def range(self, low=None, high=None):
+        """
+        Method of finding records with value of field between low and high
+        :param low: least value, None for no lower bound
+        :param high: greatest value, None for no upper bound
+        :return: list of records ordered by value of field
+        """
+
+        self.sort()
+        low = None if low is None else self.key(low)
+        high = None if high is None else self.key(high)
+        found = []
+        for i in range(0 if low is None else bisect_left(self.maxes, low),
+                       len(self.maxes)):
+            keys = self.keys[i]
+            start = 0 if low is None else bisect_left(keys, low)
+            stop = len(keys) if high is None else bisect_right(keys, high)
+            found += self.records[i][start:stop]
+            if stop < len(keys):
+                break
+        return found
+
+    def copy(self):
+        """
+        Method of copying the index, records are not copied and chunks are
+        shared until one of the indexes changes them
+        :return: index
+        """
+
+        index = SortedIndex(self.name, self.key, self.load)
+        index.keys = list(self.keys)
+        index.records = list(self.records)
+        index.maxes = list(self.maxes)
+        index.owned = [False] * len(self.owned)
+        self.owned = [False] * len(self.owned)
+        index.count = self.count
+        index.pending = list(self.pending)
+        return index
+
+    def __len__(self):
+        return self.count + len(self.pending)
+
+
+def date_key(date):
+    """
+    Function of making sortable key from date in dd.mm.yyyy format
+    :param date:
+    :return: date in yyyymmdd format
+    """
+
+    return date[6:] + date[3:5] + date[:2]
+
+
+class Indexes:
+    """
+    Class representing all indexes of loaded records
+    """
+
+    def __init__(self):
+        """
+        Sets all the necessary attributes for the class Indexes
+        """
+
+        self.indexes = {
+            'id': HashIndex('id'),
+            'passport': HashIndex('passport'),
+            'phone_number': HashIndex('phone_number'),
+            'medical_policy': HashIndex('medical_policy'),
+            'birthday': SortedIndex('birthday', date_key),
+            'room_number': SortedIndex('room_number'),
+            # full names are truncated to 25 characters by Person
+            'full_name': NameIndex('full_name', 25),
+        }
+
+    def __getitem__(self, name):
+        return self.indexes[name]
+
+    def add(self, record):
+        """
+        Method of adding record to all indexes
+        :param record:
+        :return:
+        """
+
+        for index in self.indexes.values():
+            index.add(record)
+
+    def remove(self, record):
+        """
+        Method of removing record from all indexes
+        :param record:
+        :return:
+        """
+
+        for index in self.indexes.values():
+            index.remove(record)
+
+    def copy(self):
+        """
+        Method of copying all indexes, records are not copied
+        :return: indexes
+        """
+
+        indexes = Indexes()
+        indexes.indexes = {name: index.copy()
+                           for name, index in self.indexes.items()}
+        return indexes
+
+    def sort(self):
+        """
+        Method of sorting pending records into all sorted indexes and
+        flushing names added to name indexes, so that lookups do not change
+        them
+        :return:
+        """
+
+        for index in self.indexes.values():
+            if isinstance(index, SortedIndex):
+                index.sort()
+            elif isinstance(index, NameIndex):
+                index.flush()
+
+    def find(self, name, value):
+        """
+        Method of finding records with the value of field name
+        :param name:
+        :param value:
+        :return: list of records
+        """
+
+        return self.indexes[name].find(value)
+
+    def get(self, name, value):
+        """
+        Method of finding the first record with the value of field name
+        :param name:
+        :param value:
+        :return: record or None
+        """
+
+        return self.indexes[name].get(value)
+
+    def range(self, name, low=None, high=None):
+        """
+        Method of finding records with value of field name between low and
+        high, only for sorted indexes
+        :param name:
+        :param low:
+        :param high:
+        :return: list of records ordered by value of field
+        """
+
+        return self.indexes[name].range(low, high)
+
+    def search(self, name, query, k=10):
+        """
+        Method of finding records with value of field name most similar to
+        query, only for name indexes
+        :param name:
+        :param query:
+        :param k: most records found
+        :return: list of pairs of similarity and record, the most similar
+        first
+        """
+
+        return self.indexes[name].search(query, k)
@@ -1,121 +1,1784 @@
+import io
+import marshal
+import os
 import re
+import time
+import zlib
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+from operator import attrgetter
 
+from cow import Chunks
+from index import Indexes
+from pool import InternPools
+from stats import Statistics
+from ward import Wards
 
-class Load:
+
+def _registered(name):
+    """
+    Function of making property of attribute of the default registry, for
+    the class Load and for its instances
+    :param name: attribute of Registry
+    :return: property
+    """
+
+    return property(lambda owner: getattr(owner.registry, name),
+                    lambda owner, value: setattr(owner.registry, name, value))
+
+
+def _delegated(name):
+    """
+    Function of making static method calling method of the default registry
+    :param name: method of Registry
+    :return: static method
+    """
+
+    method = getattr(Registry, name)
+
+    def call(*args, **kwargs):
+        return method(Load.registry, *args, **kwargs)
+
+    call.__name__ = call.__qualname__ = name
+    call.__doc__ = method.__doc__
+    return staticmethod(call)
+
+
+class Registry:
+    """
+    Class representing loaded records of all classes with their ids,
+    indexes, wards and statistics; registries share no state, so one may be
+    loaded while another one serves readers
+    """
+
+    def __init__(self, first_id=1):
+        """
+        Sets all the necessary attributes for the class Registry
+        :param first_id: id of the first loaded record
+        """
+
+        self.hospital_patients = Chunks()
+        self.ambulatory_patients = Chunks()
+        self.nurses = Chunks()
+        self.doctors = Chunks()
+        # lines of loaded hospital patients, see HospitalPatient
+        self.patient_names = Chunks()
+        self.current_id = first_id
+        self.indexes = Indexes()
+        self.wards = Wards()
+        self.statistics = Statistics()
+        self.positions = {}
+        self.shared = False
+        # number of the version published by publisher.Publisher
+        self.epoch = 0
+
+    def snapshot(self):
+        """
+        Method of making copy-on-write snapshot of the registry: both share
+        lists, indexes and wards until one of them changes and copies them
+        first, so the snapshot is made at once and does not change; records
+        themselves are shared and are not changed, a discharged patient is
+        replaced by its copy
+        :return: registry
+        """
+
+        snapshot = object.__new__(Registry)
+        snapshot.__dict__.update(self.__dict__)
+        self.shared = snapshot.shared = True
+        return snapshot
+
+    def _unshare(self):
+        """
+        Method of copying lists, indexes, wards and statistics shared with a
+        snapshot before they change; the copies share their chunks and
+        buckets with the snapshot, so that a small change copies only the
+        parts it changes
+        :return:
+        """
+
+        for name in tuple(RECORDS.values()) + ('patient_names',):
+            setattr(self, name, getattr(self, name).copy())
+        self.indexes = self.indexes.copy()
+        self.wards = self.wards.copy()
+        self.statistics = self.statistics.copy()
+        self.positions = {path: dict(position,
+                                     records=position['records'].copy())
+                          for path, position in self.positions.items()}
+        self.shared = False
+
+    def iter_records(self, record_class, filename, chunk_size=None,
+                     workers=None, quarantine=None, lazy=False,
+                     bulk=False):
+        """
+        Method of lazy reading records of record_class from file
+        :param record_class:
+        :param filename:
+        :param chunk_size: if given, lists of at most chunk_size records
+        are yielded instead of single records
+        :param workers: if given, the file is parsed by that many processes
+        :param quarantine: if given, rows the constructor raises on are
+        passed to this Quarantine and skipped instead of stopping reading,
+        ids are only given to accepted rows
+        :param lazy: if True, records keep values of their rows and check a
+        field when it is first read, which makes reading a few fields of
+        many records faster; only for sequential reading without quarantine
+        :param bulk: if True, chunks of rows are checked by columns before
+        records are made from them, see bulk.BulkSchema; only for
+        sequential reading
+        :return: generator of records
+        """
+
+        # with Load.metrics every reader counts bytes, rows and rejected
+        # values, only plain sequential reading times its stages; fields of
+        # lazy records are checked when they are read, after counting
+
+        if lazy:
+            if workers is not None or quarantine is not None:
+                raise ValueError('lazy records are only read sequentially '
+                                 'without quarantine')
+            records = self._read_records_lazy(record_class, filename)
+        elif bulk:
+            if workers is not None:
+                raise ValueError('bulk checks are only run sequentially')
+            records = self._read_records_bulk(record_class, filename,
+                                              quarantine)
+        elif quarantine is not None and workers is None:
+            records = self._read_records_checked(record_class, filename,
+                                                 quarantine)
+        elif workers is None and Load.metrics is not None:
+            records = self._read_records_measured(record_class, filename,
+                                                  Load.metrics)
+        elif workers is None:
+            records = self._read_records(record_class, filename)
+        else:
+            records = self._read_records_parallel(record_class, filename,
+                                                  workers, quarantine)
+        if chunk_size is None:
+            return records
+        return Load._chunked(records, chunk_size)
+
+    def _read_records(self, record_class, filename):
+        """
+        Method of reading file line by line and creating one record per line
+        :param record_class:
+        :param filename:
+        :return: generator of records
+        """
+
+        with open(filename, 'r', encoding='utf8') as f_records:
+            for ptr in f_records:
+                record = record_class(self.current_id, *ptr.split(';')[:-1])
+                self.current_id += 1
+                yield record
+
+    def _read_records_lazy(self, record_class, filename):
+        """
+        Method of reading file line by line and creating one lazy record per
+        line
+        :param record_class:
+        :param filename:
+        :return: generator of records
+        """
+
+        make = record_class._schema.lazy(record_class)
+        metrics = Load.metrics
+        size = accepted = 0
+        try:
+            with open(filename, 'r', encoding='utf8') as f_records:
+                for ptr in f_records:
+                    record = make(self.current_id, ptr.split(';')[:-1])
+                    self.current_id += 1
+                    if metrics is not None:
+                        size += len(ptr.encode('utf8'))
+                        accepted += 1
+                    yield record
+        finally:
+            if metrics is not None:
+                Load._count_read(metrics, record_class, size, accepted)
+
+    def _read_records_bulk(self, record_class, filename, quarantine=None):
+        """
+        Method of reading file in chunks of lines checked by columns, records
+        of accepted rows are made without running checks again; without
+        quarantine the first rejected row raises the error of the
+        constructor
+        :param record_class:
+        :param filename:
+        :param quarantine: if given, rejected rows are passed to it and
+        ids are only given to accepted rows
+        :return: generator of records
+        """
+
+        from bulk import BulkSchema
+
+        checks = BulkSchema(record_class)
+        explain = record_class._schema.explain
+        metrics = Load.metrics
+        line_number = 1
+        with open(filename, 'r', encoding='utf8') as f_records:
+            while True:
+                lines = f_records.readlines(Load.bulk_bytes)
+                if not lines:
+                    break
+                rows = [ptr.split(';')[:-1] for ptr in lines]
+                records, valid, null = checks.records(rows, self.current_id)
+                if quarantine is None and len(records) < len(rows):
+                    rejected = int(valid.argmin())
+                    if metrics is not None:
+                        Load._count_read(
+                            metrics, record_class,
+                            sum(len(line.encode('utf8'))
+                                for line in lines[:rejected + 1]),
+                            rejected, counts=[0] + null[:rejected].sum(
+                                axis=0).tolist())
+                        metrics.inc('load_rows_total',
+                                    loader=record_class.__name__,
+                                    result='error')
+                    yield from records[:rejected]
+                    self.current_id += rejected
+                    # the constructor raises the error of the row
+                    record_class(self.current_id, *rows[rejected])
+                    raise ValueError(f'line {line_number + rejected} is '
+                                     f'rejected by bulk checks')
+                if quarantine is not None:
+                    for row, accepted in enumerate(valid.tolist()):
+                        if not accepted:
+                            quarantine.reject(line_number + row, lines[row],
+                                              *explain(rows[row]))
+                    for i, count in enumerate(null[valid].sum(axis=0)
+                                              .tolist(), 1):
+                        quarantine.counts[i] += count
+                    quarantine.accepted += len(records)
+                if metrics is not None:
+                    Load._count_read(
+                        metrics, record_class,
+                        sum(len(line.encode('utf8')) for line in lines),
+                        len(records), len(rows) - len(records),
+                        [0] + null[valid].sum(axis=0).tolist())
+                line_number += len(lines)
+                self.current_id += len(records)
+                yield from records
+
+    def _read_records_checked(self, record_class, filename, quarantine):
+        """
+        Method of reading file line by line, rows the constructor raises on
+        are passed to quarantine
+        :param record_class:
+        :param filename:
+        :param quarantine:
+        :return: generator of records
+        """
+
+        explain = record_class._schema.explain
+        count = record_class._schema.count_rejected
+        counts = quarantine.counts
+        metrics = Load.metrics
+        size = 0
+        before = quarantine.accepted, quarantine.rejected, list(counts)
+        try:
+            with open(filename, 'r', encoding='utf8') as f_records:
+                for line_number, ptr in enumerate(f_records, 1):
+                    if metrics is not None:
+                        size += len(ptr.encode('utf8'))
+                    try:
+                        record = record_class(self.current_id,
+                                              *ptr.split(';')[:-1])
+                    except (TypeError, ValueError) as error:
+                        quarantine.reject(line_number, ptr, *explain(
+                            ptr.split(';')[:-1], error))
+                        continue
+                    count(record, counts)
+                    quarantine.accepted += 1
+                    self.current_id += 1
+                    yield record
+        finally:
+            if metrics is not None:
+                Load._count_read(
+                    metrics, record_class, size,
+                    quarantine.accepted - before[0],
+                    quarantine.rejected - before[1],
+                    [total - first for total, first
+                     in zip(counts, before[2])])
+
+    def _read_records_measured(self, record_class, filename, metrics):
+        """
+        Method of reading file in batches of lines, timing reading and
+        splitting of every batch and validation of every row; accepted rows
+        are counted after every batch and rejected values of fields when
+        reading ends
+        :param record_class:
+        :param filename:
+        :param metrics: metrics.Metrics
+        :return: generator of records
+        """
+
+        loader = record_class.__name__
+        schema = record_class._schema
+        counts = [0] * len(schema.fields)
+        read = metrics.histogram('load_read_seconds', loader=loader)
+        split = metrics.histogram('load_split_seconds', loader=loader)
+        validate = metrics.histogram('load_validate_seconds', loader=loader)
+        timer = time.perf_counter
+        accepted = 0
+        try:
+            with open(filename, 'r', encoding='utf8') as f_records:
+                while True:
+                    start = timer()
+                    lines = f_records.readlines(Load.measured_bytes)
+                    read.observe(timer() - start)
+                    if not lines:
+                        break
+                    metrics.inc('load_bytes_total',
+                                sum(len(line.encode('utf8'))
+                                    for line in lines), loader=loader)
+
+                    start = timer()
+                    rows = [ptr.split(';')[:-1] for ptr in lines]
+                    split.observe(timer() - start)
+                    for values in rows:
+                        start = timer()
+                        try:
+                            record = record_class(self.current_id, *values)
+                        except (TypeError, ValueError):
+                            metrics.inc('load_rows_total', loader=loader,
+                                        result='error')
+                            raise
+                        validate.observe(timer() - start)
+                        schema.count_rejected(record, counts)
+                        accepted += 1
+                        self.current_id += 1
+                        yield record
+                    metrics.inc('load_rows_total', accepted, loader=loader,
+                                result='accepted')
+                    accepted = 0
+        finally:
+            if accepted:
+                metrics.inc('load_rows_total', accepted, loader=loader,
+                            result='accepted')
+            for name, count in zip(schema.names, counts):
+                if count:
+                    metrics.inc('load_rejected_fields_total', count,
+                                loader=loader, field=name)
+
+    def _insert(self, records, target):
+        """
+        Method of adding records to one of the lists of loaded records, with
+        instrumentation on batches of added records are timed
+        :param records: iterable of records
+        :param target: name of one of the lists of loaded records
+        :return:
+        """
+
+        if Load.metrics is None:
+            for record in records:
+                self._add(record, target)
+            return
+
+        timer = time.perf_counter
+        histograms = {}
+        for chunk in Load._chunked(records, 1000):
+            start = timer()
+            for record in chunk:
+                self._add(record, target)
+            elapsed = timer() - start
+            loader = type(chunk[0]).__name__
+            if loader not in histograms:
+                histograms[loader] = Load.metrics.histogram(
+                    'load_insert_seconds', loader=loader)
+            histograms[loader].observe(elapsed)
+
+    def _read_records_parallel(self, record_class, filename, workers,
+                               quarantine=None):
+        """
+        Method of reading file split at line boundaries into byte ranges,
+        each range is parsed in a worker process, records come in file order
+        with the same ids as in sequential reading
+        :param record_class:
+        :param filename:
+        :param workers: number of processes
+        :param quarantine:
+        :return: generator of records
+        """
+
+        ranges = Load._split_file(filename, workers * 4)
+        starts = [start for start, end in ranges]
+        ends = [end for start, end in ranges]
+        filenames = [filename] * len(ranges)
+
+        with ProcessPoolExecutor(workers) as executor:
+            counts = list(executor.map(Load._count_lines, filenames, starts,
+                                       ends))
+            if quarantine is not None:
+                yield from self._restore_checked(
+                    record_class, quarantine, executor.map(
+                        Load._read_range_checked,
+                        [record_class] * len(ranges), filenames, starts,
+                        ends, accumulate(counts[:-1], initial=1)),
+                    [end - start for start, end in ranges])
+                return
+            first_ids = list(accumulate(counts[:-1], initial=self.current_id))
+            chunks = executor.map(Load._read_range,
+                                  [record_class] * len(ranges), filenames,
+                                  starts, ends, first_ids)
+
+            schema = record_class._schema
+            restore = schema.restore
+            metrics = Load.metrics
+            rejected = [0] * len(schema.fields)
+            for first_id, count, chunk, (start, end) in zip(
+                    first_ids, counts, chunks, ranges):
+                states = marshal.loads(chunk)
+                for state in states:
+                    record = restore(record_class, state)
+                    if metrics is not None:
+                        schema.count_rejected(record, rejected)
+                    yield record
+                self.current_id = first_id + count
+                if metrics is not None:
+                    Load._count_read(metrics, record_class, end - start,
+                                     len(states), counts=rejected)
+                    rejected = [0] * len(schema.fields)
+
+    def _restore_checked(self, record_class, quarantine, chunks,
+                         sizes=None):
+        """
+        Method of creating records from results of _read_range_checked,
+        ids are given in file order to accepted records only
+        :param record_class:
+        :param quarantine:
+        :param chunks: iterable of results of _read_range_checked
+        :param sizes: numbers of bytes of chunks, counted in Load.metrics
+        :return: generator of records
+        """
+
+        restore = record_class._schema.restore
+        metrics = Load.metrics
+        for i, chunk in enumerate(chunks):
+            states, counts, rejected = marshal.loads(chunk)
+            quarantine.merge(len(states), counts, rejected)
+            if metrics is not None:
+                Load._count_read(metrics, record_class,
+                                 sizes[i] if sizes else 0, len(states),
+                                 len(rejected), counts)
+            for state in states:
+                record = restore(record_class,
+                                 (self.current_id,) + state[1:])
+                self.current_id += 1
+                yield record
+
+    def iter_hospital_patients(self, filename, chunk_size=None, workers=None,
+                               quarantine=None, lazy=False, bulk=False):
+        """
+        Method of lazy reading data about hospital patients
+        :param filename:
+        :param chunk_size:
+        :param workers:
+        :param quarantine:
+        :param lazy:
+        :param bulk:
+        :return: generator of hospital patients
+        """
+
+        return self.iter_records(HospitalPatient, filename, chunk_size,
+                                 workers, quarantine, lazy, bulk)
+
+    def iter_ambulatory_patients(self, filename, chunk_size=None, workers=None,
+                                 quarantine=None, lazy=False, bulk=False):
+        """
+        Method of lazy reading data about ambulatory patients
+        :param filename:
+        :param chunk_size:
+        :param workers:
+        :param quarantine:
+        :param lazy:
+        :param bulk:
+        :return: generator of ambulatory patients
+        """
+
+        return self.iter_records(AmbulatoryPatient, filename, chunk_size,
+                                 workers, quarantine, lazy, bulk)
+
+    def iter_nurses(self, filename, chunk_size=None, workers=None,
+                    quarantine=None, lazy=False, bulk=False):
+        """
+        Method of lazy reading data about nurses
+        :param filename:
+        :param chunk_size:
+        :param workers:
+        :param quarantine:
+        :param lazy:
+        :param bulk:
+        :return: generator of nurses
+        """
+
+        return self.iter_records(Nurse, filename, chunk_size, workers,
+                                 quarantine, lazy, bulk)
+
+    def iter_doctors(self, filename, chunk_size=None, workers=None,
+                     quarantine=None, lazy=False, bulk=False):
+        """
+        Method of lazy reading data about doctors
+        :param filename:
+        :param chunk_size:
+        :param workers:
+        :param quarantine:
+        :param lazy:
+        :param bulk:
+        :return: generator of doctors
+        """
+
+        return self.iter_records(Doctor, filename, chunk_size, workers,
+                                 quarantine, lazy, bulk)
+
+    def load_hospital_patients(self, filename, workers=None, quarantine=None):
+        """
+        Method of loading data about hospital patients
+        :param filename:
+        :param workers: if given, the file is parsed by that many processes
+        :param quarantine: if given, Quarantine of rejected rows
+        :return:
+        """
+
+        patients = self.iter_hospital_patients(filename, workers=workers,
+                                               quarantine=quarantine)
+        self._insert(patients, 'hospital_patients')
+
+    def load_ambulatory_patients(self, filename, workers=None,
+                                 quarantine=None):
+        """
+        Method of loading data about ambulatory patients
+        :param filename:
+        :param workers: if given, the file is parsed by that many processes
+        :param quarantine: if given, Quarantine of rejected rows
+        :return:
+        """
+
+        patients = self.iter_ambulatory_patients(filename, workers=workers,
+                                                 quarantine=quarantine)
+        self._insert(patients, 'ambulatory_patients')
+
+    def load_nurses(self, filename, workers=None, quarantine=None):
+        """
+        Method of loading data about nurses
+        :param filename:
+        :param workers: if given, the file is parsed by that many processes
+        :param quarantine: if given, Quarantine of rejected rows
+        :return:
+        """
+
+        nurses = self.iter_nurses(filename, workers=workers,
+                                  quarantine=quarantine)
+        self._insert(nurses, 'nurses')
+
+    def load_doctors(self, filename, workers=None, quarantine=None):
+        """
+        Method of loading data about doctors
+        :param filename:
+        :param workers: if given, the file is parsed by that many processes
+        :param quarantine: if given, Quarantine of rejected rows
+        :return:
+        """
+
+        doctors = self.iter_doctors(filename, workers=workers,
+                                    quarantine=quarantine)
+        self._insert(doctors, 'doctors')
+
+    def _add(self, record, records):
+        """
+        Method of adding loaded record to records and indexes
+        :param record:
+        :param records: name of one of the lists of loaded records
+        :return:
+        """
+
+        if self.shared:
+            self._unshare()
+        getattr(self, records).append(record)
+        self.indexes.add(record)
+        self.statistics.add(record)
+        if isinstance(record, HospitalPatient):
+            self.patient_names.append(f'{record.id}. {record.full_name} ')
+            self.wards.add(record)
+
+    def admit_hospital_patient(self, patient):
+        """
+        Method of adding new hospital patient, a patient without a room gets
+        a free bed of its department
+        :param patient:
+        :return: room number
+        """
+
+        if self.shared:
+            self._unshare()
+        if patient.room_number is None:
+            self.wards.assign(patient)
+        self._add(patient, 'hospital_patients')
+        return patient.room_number
+
+    def discharge_hospital_patient(self, patient):
+        """
+        Method of freeing bed of hospital patient, the patient stays loaded
+        and is counted as unassigned in its department; loaded records are shared with snapshots, so the
+        patient is replaced by its copy instead of being changed
+        :param patient:
+        :return: copy of patient without a room
+        """
+
+        if self.shared:
+            self._unshare()
+        i = Registry._find(self.hospital_patients, patient)
+        if i is None:
+            raise ValueError(f'patient {patient.id} is not loaded')
+        schema = HospitalPatient._schema
+        discharged = schema.restore(HospitalPatient, schema.state(patient))
+        discharged.room_number = None
+
+        self.hospital_patients[i] = discharged
+        for position in self.positions.values():
+            j = Registry._find(position['records'], patient, True)
+            if j is not None:
+                position['records'][j] = discharged
+        self.wards.remove(patient)
+        self.wards.add(discharged)
+        self.indexes.remove(patient)
+        self.indexes.add(discharged)
+        return discharged
+
+    @staticmethod
+    def _find(records, record, ordered=False):
+        """
+        Method of finding position of record in list of loaded records, which
+        are usually ordered by id
+        :param records:
+        :param record:
+        :param ordered: if True, records are known to be ordered by id, like
+        records of a reloaded file, and are not searched one by one
+        :return: index or None if record is not in records
+        """
+
+        i = bisect_left(records, record.id, key=attrgetter('id'))
+        if i < len(records) and records[i] is record:
+            return i
+        if ordered:
+            return None
+        return next((i for i, other in enumerate(records)
+                     if other is record), None)
+
+    def _remove(self, removed, records):
+        """
+        Method of removing loaded records from records and indexes
+        :param removed: list of records
+        :param records: name of one of the lists of loaded records
+        :return:
+        """
+
+        if self.shared:
+            self._unshare()
+        removed_ids = {id(record) for record in removed}
+        kept = Chunks(record for record in getattr(self, records)
+                      if id(record) not in removed_ids)
+        setattr(self, records, kept)
+        names = {f'{record.id}. {record.full_name} ' for record in removed
+                 if isinstance(record, HospitalPatient)}
+        if names:
+            self.patient_names = Chunks(name for name in self.patient_names
+                                        if name not in names)
+        for record in removed:
+            self.indexes.remove(record)
+            self.wards.remove(record)
+            self.statistics.remove(record)
+
+    def reload(self, record_class, filename):
+        """
+        Method of loading only lines appended to file since its last reload,
+        if the file was rewritten instead, records loaded from it are
+        removed and the whole file is loaded again with new ids; a last line
+        without line end is only loaded if it has all fields, otherwise it is
+        left for the next reload as it may still be written
+        :param record_class:
+        :param filename:
+        :return: list of new records
+        """
+
+        if self.shared:
+            self._unshare()
+        records = RECORDS[record_class]
+        fields = len(record_class._schema.names) - 1
+        path = os.path.abspath(filename)
+        position = self.positions.get(path)
+
+        with open(filename, 'rb') as f_records:
+            if position is not None and not Load.is_appended(f_records,
+                                                             position):
+                self._remove(position['records'], records)
+                position = None
+            if position is None:
+                position = self.positions[path] = {
+                    'offset': 0, 'checksum': 0, 'partial': False,
+                    'carriage': False, 'records': Chunks()}
+
+            f_records.seek(position['offset'])
+            lines = f_records.read().splitlines(keepends=True)
+
+            new = []
+            offset = position['offset']
+            # the line end of a loaded last line, or the \n of a \r\n
+            # whose \r ended the last loaded line, is not a line of its own
+            if lines and (position['partial']
+                          and lines[0] in (b'\n', b'\r\n', b'\r')
+                          or position['carriage'] and lines[0] == b'\n'):
+                offset += len(lines[0])
+                position['partial'] = False
+                position['carriage'] = lines[0] == b'\r'
+                del lines[0]
+            try:
+                for line in lines:
+                    ended = line.endswith((b'\n', b'\r'))
+                    if not ended and not (line.endswith(b';') and
+                                          line.count(b';') == fields):
+                        break
+                    record = record_class(
+                        self.current_id, *line.decode('utf8').split(';')[:-1])
+                    self.current_id += 1
+                    self._add(record, records)
+                    new.append(record)
+                    offset += len(line)
+                    position['partial'] = not ended
+                    position['carriage'] = line.endswith(b'\r')
+            finally:
+                position['records'].extend(new)
+                position['offset'] = offset
+                position['checksum'] = Load._checksum(f_records, offset)
+        return new
+
+    def reload_hospital_patients(self, filename):
+        """
+        Method of loading data about hospital patients appended to file
+        since its last reload
+        :param filename:
+        :return: list of new hospital patients
+        """
+
+        return self.reload(HospitalPatient, filename)
+
+    def reload_ambulatory_patients(self, filename):
+        """
+        Method of loading data about ambulatory patients appended to file
+        since its last reload
+        :param filename:
+        :return: list of new ambulatory patients
+        """
+
+        return self.reload(AmbulatoryPatient, filename)
+
+    def reload_nurses(self, filename):
+        """
+        Method of loading data about nurses appended to file since its last
+        reload
+        :param filename:
+        :return: list of new nurses
+        """
+
+        return self.reload(Nurse, filename)
+
+    def reload_doctors(self, filename):
+        """
+        Method of loading data about doctors appended to file since its last
+        reload
+        :param filename:
+        :return: list of new doctors
+        """
+
+        return self.reload(Doctor, filename)
+
+
+class LoadType(type):
+    """
+    Class representing the type of Load, its loaded records, their ids,
+    indexes, wards and statistics are those of the default registry
+    Load.registry
+    """
+
+    hospital_patients = _registered('hospital_patients')
+    ambulatory_patients = _registered('ambulatory_patients')
+    nurses = _registered('nurses')
+    doctors = _registered('doctors')
+    current_id = _registered('current_id')
+    indexes = _registered('indexes')
+    wards = _registered('wards')
+    statistics = _registered('statistics')
+    positions = _registered('positions')
+
+
+class Load(metaclass=LoadType):
+    """
+    Class representing loading data from files into the default registry
+    """
+
+    # the default registry, Load.swap replaces it
+    registry = Registry()
+    hospital_patients = _registered('hospital_patients')
+    ambulatory_patients = _registered('ambulatory_patients')
+    nurses = _registered('nurses')
+    doctors = _registered('doctors')
+    current_id = _registered('current_id')
+    indexes = _registered('indexes')
+    wards = _registered('wards')
+    statistics = _registered('statistics')
+    positions = _registered('positions')
+    checked_bytes = 1 << 16
+    # metrics.Metrics counting rows and timing stages of loading, None
+    # turns instrumentation off
+    metrics = None
+    measured_bytes = 1 << 16
+    # lines checked by columns at once, see Registry._read_records_bulk
+    bulk_bytes = 1 << 18
+    # pools of string fields whose values repeat across records, fields
+    # with many distinct values get larger pools
+    pools = InternPools(
+        place_birth=1 << 12, residence_address=1 << 16,
+        qualification=1 << 10, specialty=1 << 10, medical_errors=1 << 10,
+        place_work_study=1 << 14, allergic_reactions=1 << 10,
+        chronic_diagnosis=1 << 12, medical_department=1 << 8,
+        clinic_diagnosis=1 << 12)
+
+    # methods of the default registry, see Registry
+    iter_records = _delegated('iter_records')
+    iter_hospital_patients = _delegated('iter_hospital_patients')
+    iter_ambulatory_patients = _delegated('iter_ambulatory_patients')
+    iter_nurses = _delegated('iter_nurses')
+    iter_doctors = _delegated('iter_doctors')
+    load_hospital_patients = _delegated('load_hospital_patients')
+    load_ambulatory_patients = _delegated('load_ambulatory_patients')
+    load_nurses = _delegated('load_nurses')
+    load_doctors = _delegated('load_doctors')
+    admit_hospital_patient = _delegated('admit_hospital_patient')
+    discharge_hospital_patient = _delegated('discharge_hospital_patient')
+    reload = _delegated('reload')
+    reload_hospital_patients = _delegated('reload_hospital_patients')
+    reload_ambulatory_patients = _delegated('reload_ambulatory_patients')
+    reload_nurses = _delegated('reload_nurses')
+    reload_doctors = _delegated('reload_doctors')
+
+    @staticmethod
+    def swap(registry):
+        """
+        Method of making registry the default one, it is one assignment, so
+        readers get either the old registry or the new one, and those that
+        got the old one keep using it
+        :param registry:
+        :return: the old default registry
+        """
+
+        old, Load.registry = Load.registry, registry
+        return old
+
+    @staticmethod
+    def is_int(obj):
+        """
+        Method that checks that the obj has int type
+        :param obj:
+        :return: integer obj if type is int and None otherwise
+        """
+
+        try:
+            return int(obj)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def is_bool(obj):
+        """
+        Method that checks that the obj has bool type
+        :param obj:
+        :return: boolean obj if type is bool and None otherwise
+        """
+
+        if obj == 'True':
+            return True
+        elif obj == 'False':
+            return False
+        return None
+
+    @staticmethod
+    def is_str(obj):
+        """
+        Method that checks that the obj has string type
+        :param obj:
+        :return:
+        """
+
+        if isinstance(obj, str):
+            return obj
+        return None
+
+    @staticmethod
+    def _split_file(filename, parts):
+        """
+        Method of splitting file into byte ranges at line boundaries
+        :param filename:
+        :param parts: wanted number of ranges
+        :return: list of pairs of start and end offsets of ranges
+        """
+
+        size = os.path.getsize(filename)
+        bounds = [0]
+        with open(filename, 'rb') as f_records:
+            for part in range(1, parts):
+                f_records.seek(max(size * part // parts - 1, bounds[-1]))
+                f_records.readline()
+                bounds.append(min(f_records.tell(), size))
+        bounds.append(size)
+        return [(start, end) for start, end in zip(bounds, bounds[1:])
+                if start < end]
+
+    @staticmethod
+    def _read_bytes(filename, start, end):
+        with open(filename, 'rb') as f_records:
+            f_records.seek(start)
+            return f_records.read(end - start)
+
+    @staticmethod
+    def _count_lines(filename, start, end):
+        """
+        Method of counting lines in a byte range of file the way text mode
+        reading splits them
+        :param filename:
+        :param start:
+        :param end:
+        :return: number of lines
+        """
+
+        data = Load._read_bytes(filename, start, end)
+        count = (data.count(b'\n') + data.count(b'\r')
+                 - data.count(b'\r\n'))
+        if data and not data.endswith((b'\n', b'\r')):
+            count += 1
+        return count
+
+    @staticmethod
+    def _read_range(record_class, filename, start, end, first_id):
+        """
+        Method of creating records from a byte range of file in a worker
+        :param record_class:
+        :param filename:
+        :param start:
+        :param end:
+        :param first_id: id of the first record of the range
+        :return: marshalled list of stored attributes of records
+        """
+
+        data = io.TextIOWrapper(
+            io.BytesIO(Load._read_bytes(filename, start, end)),
+            encoding='utf8')
+        return Load._parse_lines(record_class, data, first_id)
+
+    @staticmethod
+    def _read_range_checked(record_class, filename, start, end, first_line):
+        """
+        Method of creating records from a byte range of file in a worker,
+        rows the constructor raises on are explained instead
+        :param record_class:
+        :param filename:
+        :param start:
+        :param end:
+        :param first_line: number of the first line of the range in file
+        :return: marshalled stored attributes of accepted records, counts
+        of their rejected fields and arguments of Quarantine.reject
+        """
+
+        data = io.TextIOWrapper(
+            io.BytesIO(Load._read_bytes(filename, start, end)),
+            encoding='utf8')
+        return Load._parse_lines_checked(record_class, data, first_line)
+
+    @staticmethod
+    def _parse_lines_checked(record_class, lines, first_line):
+        """
+        Method of creating records from lines in a worker, rows the
+        constructor raises on are explained instead
+        :param record_class:
+        :param lines: iterable of lines of file
+        :param first_line: number of the first line in file
+        :return: marshalled stored attributes of accepted records, counts
+        of their rejected fields and arguments of Quarantine.reject
+        """
+
+        schema = record_class._schema
+        states = []
+        counts = [0] * len(schema.fields)
+        rejected = []
+        for line_number, ptr in enumerate(lines, first_line):
+            values = ptr.split(';')[:-1]
+            try:
+                record = record_class(0, *values)
+            except (TypeError, ValueError) as error:
+                rejected.append((line_number, ptr,
+                                 *schema.explain(values, error)))
+                continue
+            schema.count_rejected(record, counts)
+            states.append(schema.state(record))
+        return marshal.dumps((states, counts, rejected))
+
+    @staticmethod
+    def _parse_lines(record_class, lines, first_id):
+        """
+        Method of creating records from lines in a worker
+        :param record_class:
+        :param lines: iterable of lines of file
+        :param first_id: id of the first record
+        :return: marshalled list of stored attributes of records
+        """
+
+        state = record_class._schema.state
+        return marshal.dumps([
+            state(record_class(record_id, *ptr.split(';')[:-1]))
+            for record_id, ptr in enumerate(lines, first_id)])
+
+    @staticmethod
+    def _count_read(metrics, record_class, size, accepted, rejected=0,
+                    counts=()):
+        """
+        Method of adding a part of a read of file to counters of metrics
+        :param metrics: metrics.Metrics
+        :param record_class:
+        :param size: number of bytes of read lines
+        :param accepted: number of records made
+        :param rejected: number of rows passed to quarantine
+        :param counts: numbers of rejected values of accepted rows by fields
+        of schema
+        :return:
+        """
+
+        loader = record_class.__name__
+        if size:
+            metrics.inc('load_bytes_total', size, loader=loader)
+        if accepted:
+            metrics.inc('load_rows_total', accepted, loader=loader,
+                        result='accepted')
+        if rejected:
+            metrics.inc('load_rows_total', rejected, loader=loader,
+                        result='rejected')
+        for name, count in zip(record_class._schema.names, counts):
+            if count:
+                metrics.inc('load_rejected_fields_total', count,
+                            loader=loader, field=name)
+
+    @staticmethod
+    def _chunked(records, chunk_size):
+        """
+        Method of grouping records into lists of chunk_size records
+        :param records:
+        :param chunk_size:
+        :return: generator of lists of records
+        """
+
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be positive')
+
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _checksum(f_records, offset):
+        """
+        Method of computing checksum of the beginning and of the end of the
+        first offset bytes of file, so that checking a big file costs two
+        short reads
+        :param f_records: file opened in binary mode
+        :param offset:
+        :return: checksum
+        """
+
+        size = min(offset, Load.checked_bytes)
+        f_records.seek(0)
+        checksum = zlib.crc32(f_records.read(size))
+        f_records.seek(offset - size)
+        return zlib.crc32(f_records.read(size), checksum)
+
+    @staticmethod
+    def is_appended(f_records, position):
+        """
+        Method of checking that file was only appended since it was read up
+        to position
+        :param f_records: file opened in binary mode
+        :param position: dict with offset, checksum of read bytes and whether
+        the last read line had no line end
+        :return: True if the read bytes did not change and a last read line
+        without line end was only followed by a line end
+        """
+
+        size = os.fstat(f_records.fileno()).st_size
+        if size < position['offset']:
+            return False
+        if position['partial'] and size > position['offset']:
+            f_records.seek(position['offset'])
+            if f_records.read(1) not in (b'\n', b'\r'):
+                return False
+        return (Load._checksum(f_records, position['offset'])
+                == position['checksum'])
+
+    @staticmethod
+    def yes_no(obj):
+        """
+        Method of presenting boolean obj in Russian
+        :param obj:
+        :return: 'да', 'нет' or None if obj is None
+        """
+
+        if obj is None:
+            return None
+        return 'да' if obj else 'нет'
+
+    @staticmethod
+    def detected(obj):
+        """
+        Method of presenting diagnosis or allergy obj
+        :param obj:
+        :return: obj or None if nothing was detected
+        """
+
+        return None if obj == 'Не выявлено' else obj
+
+    @staticmethod
+    def render_all(records, sink, batch_size=1000):
+        """
+        Method of writing cards of records to sink, one card per line as
+        print(record) does
+        :param records:
+        :param sink: file-like object with write method
+        :param batch_size: number of cards joined for one write
+        :return:
+        """
+
+        batch = []
+        for record in records:
+            batch.append(str(record))
+            if len(batch) == batch_size:
+                batch.append('')
+                sink.write('\n'.join(batch))
+                batch = []
+        if batch:
+            batch.append('')
+            sink.write('\n'.join(batch))
+
+    @staticmethod
+    def print_without_none(output):
+        """
+        Method of printing output without strings with None
+        :param output:
+        :return:
+        """
+
+        lst_out = output.split('\n')
+        for i in range(len(lst_out)-1, -1, -1):
+            if 'None' in lst_out[i]:
+                lst_out.pop(i)
+        return '\n'.join(lst_out)
+
+
+class Check:
     """
-    Class representing loading data from files
+    Class representing a check of one field written as a Python expression
     """
 
-    hospital_patients = []
-    ambulatory_patients = []
-    nurses = []
-    doctors = []
-    current_id = 1
+    values = None
+    # whether the check returns None instead of raising for any string, so
+    # that lazy records may run it on first access
+    safe = False
+    # type of values the check returns except None, so that they are
+    # exported to typed columns
+    type = str
+    # regular expression of a check of format, so that whole columns are
+    # checked by it at once
+    pattern = None
+    # InternPool of the field, so that restored records share its values
+    pool = None
+
+    def __init__(self, expression, **namespace):
+        """
+        Sets all the necessary attributes for the class Check
+        :param expression: expression with {value} placeholder for checked
+        value and {name} placeholders for objects of namespace
+        :param namespace: objects used by expression
+        """
+
+        self.expression = expression
+        self.namespace = namespace
+        self.function = eval(f'lambda value: {self.inline("value")}',
+                             dict(namespace))
+
+    def __call__(self, obj):
+        """
+        Method of checking the obj
+        :param obj:
+        :return: checked obj or None
+        """
+
+        return self.function(obj)
+
+    def inline(self, value, prefix=''):
+        """
+        Method of substituting names into expression
+        :param value: name of checked value
+        :param prefix: prefix of names of namespace objects
+        :return: expression source
+        """
+
+        return self.expression.format(value=value, **{
+            name: prefix + name for name in self.namespace})
+
+    @staticmethod
+    def is_one_of(allowed):
+        """
+        Method of making a check that the obj is one of allowed values
+        :param allowed:
+        :return: check returning obj if it is allowed and None otherwise
+        """
+
+        check = Check('{value} if {value} in {allowed} else None',
+                      allowed=frozenset(allowed))
+        check.values = tuple(allowed)
+        check.safe = True
+        return check
+
+    @staticmethod
+    def is_match(pattern):
+        """
+        Method of making a check that the obj fully matches pattern
+        :param pattern: regular expression, compiled once
+        :return: check returning obj if it matches and None otherwise
+        """
+
+        check = Check('{value} if {fullmatch}({value}) else None',
+                      fullmatch=re.compile(pattern).fullmatch)
+        check.safe = True
+        check.pattern = pattern
+        return check
 
     @staticmethod
-    def is_int(obj):
+    def is_prefix(length):
         """
-        Method that checks that the obj has int type
-        :param obj:
-        :return: integer obj if type is int and None otherwise
+        Method of making a check that the obj has string type, which is cut
+        to length
+        :param length:
+        :return: check returning at most length first characters of obj
         """
 
-        try:
-            return int(obj)
-        except ValueError:
-            return None
+        check = Check(f'{{is_str}}({{value}})[:{length}]', is_str=Load.is_str)
+        check.safe = True
+        return check
 
     @staticmethod
-    def is_bool(obj):
+    def is_between(low, high):
         """
-        Method that checks that the obj has bool type
-        :param obj:
-        :return: boolean obj if type is bool and None otherwise
+        Method of making a check that the string obj lies between low and high
+        :param low:
+        :param high:
+        :return: check returning integer obj if it lies between low and high
+        and None otherwise
         """
 
-        if obj == 'True':
-            return True
-        elif obj == 'False':
-            return False
-        return None
+        check = Check(f'int({{value}}) if {low!r} <= {{value}} <= {high!r} '
+                      f'else None')
+        check.type = int
+        return check
 
     @staticmethod
-    def is_str(obj):
+    def to_int_between(low, high):
         """
-        Method that checks that the obj has string type
-        :param obj:
-        :return:
+        Method of making a check that the integer obj lies between low and
+        high, obj that is not an integer raises ValueError
+        :param low:
+        :param high:
+        :return: check returning integer obj if it lies between low and high
+        and None otherwise
         """
 
-        if isinstance(obj, str):
-            return obj
-        return None
+        check = Check(f'int({{value}}) if {low!r} <= int({{value}}) '
+                      f'<= {high!r} else None')
+        check.type = int
+        return check
 
     @staticmethod
-    def load_hospital_patients(filename):
+    def is_int_between(low, high):
         """
-        Method of loading data about hospital patients
-        :param filename:
-        :return:
+        Method of making a check that the obj is integer between low and high
+        :param low:
+        :param high:
+        :return: check returning integer obj if it lies between low and high
+        and None otherwise
         """
 
-        with open(filename, 'r', encoding='utf8') as f_hospital:
-            for ptr in f_hospital:
-                Load.hospital_patients.append(HospitalPatient(Load.current_id, *ptr.split(';')[:-1]))
-                Load.current_id += 1
+        def is_int_between(obj):
+            obj = Load.is_int(obj)
+            return obj if obj is not None and low <= obj <= high else None
+
+        check = Check.call(is_int_between)
+        check.safe = True
+        check.type = int
+        return check
 
     @staticmethod
-    def load_ambulatory_patients(filename):
+    def is_interned(pool):
         """
-        Method of loading data about ambulatory patients
-        :param filename:
-        :return:
+        Method of making a check that the obj has string type, equal strings
+        are replaced by one object of pool
+        :param pool: InternPool of the field
+        :return: check returning pooled obj if type is str and None otherwise
         """
 
-        with open(filename, 'r', encoding='utf8') as f_ambulatory:
-            for ptr in f_ambulatory:
-                Load.ambulatory_patients.append(AmbulatoryPatient(Load.current_id, *ptr.split(';')[:-1]))
-                Load.current_id += 1
+        check = Check('({get}({value}) or {intern}({value})) '
+                      'if isinstance({value}, str) else None',
+                      get=pool.get, intern=pool.intern)
+        check.safe = True
+        check.pool = pool
+        return check
 
     @staticmethod
-    def load_nurses(filename):
+    def call(function):
         """
-        Method of loading data about nurses
-        :param filename:
-        :return:
+        Method of making a check from a function
+        :param function:
+        :return: check returning function(obj)
+        """
+
+        return Check('{function}({value})', function=function)
+
+
+Check.is_int = Check('{is_int}({value})', is_int=Load.is_int)
+Check.is_str = Check('{value} if isinstance({value}, str) else None')
+Check.is_bool = Check("True if {value} == 'True' else "
+                      "False if {value} == 'False' else None")
+Check.is_bool.values = (True, False)
+Check.is_int.safe = Check.is_str.safe = Check.is_bool.safe = True
+Check.is_int.type = int
+Check.is_bool.type = bool
+
+
+class Packed:
+    """
+    Class representing a field with a small closed set of values, stored as
+    a code in a few bits of the _codes integer of a record
+    """
+
+    def __init__(self, check, values=None, writable=False):
+        """
+        Sets all the necessary attributes for the class Packed
+        :param check: check of the field
+        :param values: all values the check can return except None, by
+        default check.values
+        :param writable: whether the field may be assigned after construction
+        """
+
+        self.check = check
+        self.values = (None,) + tuple(check.values if values is None
+                                      else values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+        self.width = (len(self.values) - 1).bit_length()
+        self.mask = (1 << self.width) - 1
+        self.shift = None
+        self.writable = writable
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return self.values[obj._codes >> self.shift & self.mask]
+
+    def __set__(self, obj, value):
+        if not self.writable:
+            raise AttributeError(f"can't set attribute '{self.name}'")
+        code = self.codes.get(value)
+        # 1 and 0 are equal to True and False, but are not allowed for them
+        if code is None or type(self.values[code]) is not type(value):
+            raise ValueError(f'{value!r} is not allowed for {self.name}')
+        obj._codes = (obj._codes & ~(self.mask << self.shift)
+                      | code << self.shift)
+
+
+class Schema:
+    """
+    Class representing compiled validation rules for fields of a record class
+    """
+
+    def __init__(self, *fields, parent=None):
+        """
+        Sets all the necessary attributes for the class Schema
+        :param fields: pairs of attribute name and check in the order of
+        constructor arguments; a check that is not a Check is called as is,
+        a Packed field gets the next free bits of _codes
+        :param parent: schema of the parent record class
         """
 
-        with open(filename, 'r', encoding='utf8') as f_nurses:
-            for ptr in f_nurses:
-                Load.nurses.append(Nurse(Load.current_id, *ptr.split(';')[:-1]))
-                Load.current_id += 1
+        fields = tuple(
+            (name, check if isinstance(check, (Check, Packed))
+             else Check.call(check))
+            for name, check in fields)
+        self.fields = (parent.fields if parent else ()) + fields
+        self.width = parent.width if parent else 0
+        for name, check in fields:
+            if isinstance(check, Packed):
+                check.shift = self.width
+                self.width += check.width
+        self.stored = tuple(name for name, check in self.fields
+                            if not isinstance(check, Packed)) + ('_codes',)
+        self.names = tuple(Schema.public_name(name)
+                           for name, check in self.fields)
+        self.apply = self.compile()
+        self.state, self.restore = self.compile_state()
+        self.count_rejected = self.compile_count()
+        self.lazy_make = None
 
     @staticmethod
-    def load_doctors(filename):
+    def public_name(name):
         """
-        Method of loading data about doctors
-        :param filename:
+        Method of getting property name of a field
+        :param name: attribute name, possibly name-mangled
+        :return: name without the _Class__ prefix
+        """
+
+        if name.startswith('_') and '__' in name:
+            return name.split('__', 1)[1]
+        return name
+
+    def extend(self, *fields):
+        """
+        Method of making schema of a child record class
+        :param fields:
+        :return: schema with fields of self followed by fields
+        """
+
+        return Schema(*fields, parent=self)
+
+    def compile(self):
+        """
+        Method of compiling all checks into one function, so that a row is
+        validated in one pass without a call per field
+        :return: function apply(obj, values) checking values in the order of
+        fields and setting them on obj, packed fields all at once
+        """
+
+        namespace = {}
+        values = ', '.join(f'value_{i}' for i in range(len(self.fields)))
+        lines = ['def apply(obj, values):', f'    {values}, = values',
+                 '    codes = 0']
+        for i, (name, check) in enumerate(self.fields):
+            prefix = f'field_{i}_'
+            if isinstance(check, Packed):
+                namespace[prefix + 'codes'] = check.codes
+                packed, check = check, check.check
+            else:
+                packed = None
+            namespace.update((prefix + key, item)
+                             for key, item in check.namespace.items())
+            expression = check.inline(f'value_{i}', prefix)
+            if packed:
+                lines.append(f'    codes |= {prefix}codes.get({expression}, 0)'
+                             f' << {packed.shift}')
+            else:
+                lines.append(f'    obj.{name} = {expression}')
+        lines.append('    obj._codes = codes')
+
+        exec('\n'.join(lines), namespace)
+        return namespace['apply']
+
+    def compile_state(self):
+        """
+        Method of compiling functions copying stored attributes of a record
+        to and from a tuple, used to pass records between processes;
+        restored values of interned fields are replaced by objects of their
+        pools like in the constructor
+        :return: pair of functions state(obj) and restore(record_class, state)
+        """
+
+        attributes = ', '.join(f'obj.{name}' for name in self.stored)
+        namespace = {'new': object.__new__}
+        lines = ['def state(obj):', f'    return {attributes},',
+                 'def restore(record_class, state):',
+                 '    obj = new(record_class)', f'    {attributes}, = state']
+        for i, (name, check) in enumerate(self.fields):
+            if isinstance(check, Packed) or check.pool is None:
+                continue
+            namespace[f'get_{i}'] = check.pool.get
+            namespace[f'intern_{i}'] = check.pool.intern
+            lines += [f'    value = obj.{name}',
+                      '    if value is not None:',
+                      f'        obj.{name} = get_{i}(value) or '
+                      f'intern_{i}(value)']
+        lines.append('    return obj')
+
+        exec('\n'.join(lines), namespace)
+        return namespace['state'], namespace['restore']
+
+    def compile_count(self):
+        """
+        Method of compiling function counting fields of a record whose values
+        were rejected by their checks and stored as None
+        :return: function count(obj, counts) adding 1 to counts[i] for every
+        absent field number i of obj
+        """
+
+        lines = ['def count(obj, counts):', '    codes = obj._codes']
+        for i, (name, check) in enumerate(self.fields):
+            if isinstance(check, Packed):
+                lines.append(f'    if not codes >> {check.shift} & '
+                             f'{check.mask}:')
+            else:
+                lines.append(f'    if obj.{name} is None:')
+            lines.append(f'        counts[{i}] += 1')
+
+        namespace = {}
+        exec('\n'.join(lines), namespace)
+        return namespace['count']
+
+    def lazy(self, record_class):
+        """
+        Method of getting function making lazy records of record_class, it
+        is compiled on the first call
+        :param record_class: class whose schema is self
+        :return: function make(id, values) like record_class(id, *values)
+        """
+
+        if self.lazy_make is None:
+            self.lazy_make = self.compile_lazy(record_class)
+        return self.lazy_make
+
+    def compile_lazy(self, record_class):
+        """
+        Method of compiling lazy records: a subclass of record_class keeps
+        the values of the row, a stored attribute is checked and set when it
+        is first read, packed fields all at once; the id and fields whose
+        checks may raise are checked at once, so that the same rows are
+        rejected with the same errors as by record_class
+        :param record_class:
+        :return: function make(id, values) returning lazy record
+        """
+
+        namespace = {'new': object.__new__, 'record_class': record_class}
+        make = ['def make(id, values):',
+                f'    if len(values) != {len(self.fields) - 1}:',
+                '        return record_class(id, *values)',
+                '    obj = new(lazy_class)',
+                '    obj._row = values']
+        codes = ['def load_codes(obj):', '    values = obj._row',
+                 '    codes = 0']
+        loaders = []
+        eager_codes = False
+        for i, (name, check) in enumerate(self.fields):
+            prefix = f'field_{i}_'
+            if isinstance(check, Packed):
+                namespace[prefix + 'codes'] = check.codes
+                packed, check = check, check.check
+            else:
+                packed = None
+            namespace.update((prefix + key, item)
+                             for key, item in check.namespace.items())
+            expression = check.inline(f'value_{i}', prefix)
+            if packed:
+                eager_codes = eager_codes or not check.safe
+                codes += [f'    value_{i} = values[{i - 1}]',
+                          f'    codes |= {prefix}codes.get({expression}, 0)'
+                          f' << {packed.shift}']
+            elif i == 0:
+                make.append(f'    obj.{name} = {check.inline("id", prefix)}')
+            elif not check.safe:
+                make += [f'    value_{i} = values[{i - 1}]',
+                         f'    obj.{name} = {expression}']
+            else:
+                loaders.append((name, f'load_{i}'))
+                codes[:0] = [f'def load_{i}(obj):',
+                             f'    value_{i} = obj._row[{i - 1}]',
+                             f'    obj.{name} = value = {expression}',
+                             '    return value']
+        if eager_codes:
+            make.append('    load_codes(obj)')
+        make.append('    return obj')
+        codes += ['    obj._codes = codes', '    return codes']
+        exec('\n'.join(make + codes), namespace)
+
+        loaders = {name: namespace[loader] for name, loader in loaders}
+        loaders['_codes'] = namespace['load_codes']
+
+        def __getattr__(obj, name):
+            load = loaders.get(name)
+            if load is None:
+                raise AttributeError(f'{type(obj).__name__!r} object has no '
+                                     f'attribute {name!r}')
+            return load(obj)
+
+        namespace['lazy_class'] = type(
+            'Lazy' + record_class.__name__, (record_class,),
+            {'__slots__': ('_row',), '__getattr__': __getattr__,
+             '__doc__': f'Class representing a lazy '
+                        f'{record_class.__name__}, see Schema.compile_lazy'})
+        return namespace['make']
+
+    def explain(self, values, error=None):
+        """
+        Method of finding why the constructor did not accept values, checks
+        are run one by one, so it is only used for rejected rows
+        :param values: constructor arguments after id
+        :param error: exception raised by the constructor
+        :return: pair of name of the failed field, None if the number of
+        values is wrong, and message
+        """
+
+        fields = self.fields[1:]
+        if len(values) != len(fields):
+            return None, f'{len(values)} fields instead of {len(fields)}'
+        for (name, check), value in zip(fields, values):
+            if isinstance(check, Packed):
+                check = check.check
+            try:
+                check(value)
+            except Exception as field_error:
+                return (Schema.public_name(name),
+                        f'{type(field_error).__name__}: {field_error}')
+        return None, f'{type(error).__name__}: {error}'
+
+
+class Card:
+    """
+    Class representing compiled printing rules for fields of a record class
+    """
+
+    def __init__(self, *fields, parent=None):
+        """
+        Sets all the necessary attributes for the class Card
+        :param fields: pairs of label and expression of printed value of the
+        record, a field whose value is None is not printed
+        :param parent: card of the parent record class
+        """
+
+        self.fields = (parent.fields if parent else ()) + fields
+        self.render = self.compile()
+
+    def extend(self, *fields):
+        """
+        Method of making card of a child record class
+        :param fields:
+        :return: card with fields of self followed by fields
+        """
+
+        return Card(*fields, parent=self)
+
+    def compile(self):
+        """
+        Method of compiling all fields into one function, so that a card is
+        built once without printing parts and removing absent lines
+        :return: function render(record) returning card of record
+        """
+
+        lines = ['def render(record):', '    parts = []']
+        for label, expression in self.fields:
+            lines += [f'    value = {expression}',
+                      '    if value is not None:',
+                      f"        parts.append(f'\\n{label}: {{value}}')"]
+        lines.append("    return ''.join(parts)")
+
+        namespace = {'yes_no': Load.yes_no, 'detected': Load.detected}
+        exec('\n'.join(lines), namespace)
+        return namespace['render']
+
+
+class Quarantine:
+    """
+    Class representing rows rejected while loading a file, which are written
+    to a quarantine file with line numbers and reasons, and counts of
+    accepted and rejected values of every field
+    """
+
+    def __init__(self, record_class, path=None):
+        """
+        Sets all the necessary attributes for the class Quarantine
+        :param record_class:
+        :param path: name of quarantine file, rejected rows are only counted
+        if it is None
+        """
+
+        schema = record_class._schema
+        self.record_class = record_class
+        self.path = path
+        self.file = open(path, 'w', encoding='utf8') if path else None
+        self.accepted = 0
+        self.rejected = 0
+        self.counts = [0] * len(schema.fields)
+        self.reasons = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def reject(self, line_number, line, field, message):
+        """
+        Method of writing rejected row to quarantine file
+        :param line_number: number of line in file starting from 1
+        :param line:
+        :param field: name of field that made the constructor fail or None
+        :param message: reason of rejection
         :return:
         """
 
-        with open(filename, 'r', encoding='utf8') as f_doctors:
-            for ptr in f_doctors:
-                Load.doctors.append(Doctor(Load.current_id, *ptr.split(';')[:-1]))
-                Load.current_id += 1
+        self.rejected += 1
+        self.reasons[field] = self.reasons.get(field, 0) + 1
+        if self.file is not None:
+            reason = message if field is None else f'{field}: {message}'
+            line = line.rstrip('\r\n')
+            self.file.write(f'{line_number}\t{reason}\t{line}\n')
 
-    @staticmethod
-    def print_without_none(output):
+    def merge(self, accepted, counts, rejected):
         """
-        Method of printing output without strings with None
-        :param output:
+        Method of adding results of a worker process
+        :param accepted: number of accepted rows
+        :param counts: counts of rejected fields of accepted rows
+        :param rejected: list of arguments of reject
         :return:
         """
 
-        lst_out = output.split('\n')
-        for i in range(len(lst_out)-1, -1, -1):
-            if 'None' in lst_out[i]:
-                lst_out.pop(i)
-        return '\n'.join(lst_out)
+        self.accepted += accepted
+        self.counts = [total + count for total, count in
+                       zip(self.counts, counts)]
+        for row in rejected:
+            self.reject(*row)
+
+    def summary(self):
+        """
+        Method of getting counts of accepted and rejected rows and fields
+        :return: dict with numbers of accepted and rejected rows, rows of
+        wrong length and, for every field, numbers of accepted and rejected
+        values in accepted rows and of rows rejected because of the field
+        """
+
+        names = self.record_class._schema.names
+        return {
+            'rows': {'accepted': self.accepted, 'rejected': self.rejected,
+                     'wrong_length': self.reasons.get(None, 0)},
+            'fields': {name: {'accepted': self.accepted - count,
+                              'rejected': count,
+                              'rows_rejected': self.reasons.get(name, 0)}
+                       for name, count in zip(names[1:], self.counts[1:])},
+        }
+
+    def close(self):
+        """
+        Method of closing quarantine file
+        :return:
+        """
+
+        if self.file is not None:
+            self.file.close()
 
 
 class Person:
@@ -123,8 +1786,45 @@ class Person:
     Class representing a person
     """
 
+    __slots__ = ('__id', '__full_name', '__birthday', 'place_birth',
+                 '__passport', 'residence_address', '__phone_number',
+                 '_codes')
+
     allowed_level_education = ['высшее', 'ср.спец', 'среднее']
 
+    gender = Packed(Check.is_one_of(['муж.', 'жен.']))
+    married = Packed(Check.is_bool, writable=True)
+    level_education = Packed(Check.is_one_of(allowed_level_education))
+
+    _schema = Schema(
+        ('_Person__id', Check.is_int),
+        ('_Person__full_name', Check.is_prefix(25)),
+        ('gender', gender),
+        ('_Person__birthday', Check.is_match(r'\d{2}.\d{2}.\d{4}')),
+        ('place_birth', Check.is_interned(Load.pools['place_birth'])),
+        ('married', married),
+        ('_Person__passport',
+         Check.is_match(r'\d{4} \d{6} \d{2}.\d{2}.\d{4}')),
+        ('residence_address',
+         Check.is_interned(Load.pools['residence_address'])),
+        ('level_education', level_education),
+        ('_Person__phone_number',
+         Check.is_match(r'\+\d\(\d{3}\)\d{3}-\d{2}-\d{2}')),
+    )
+
+    _card = Card(
+        ('Номер', 'record.id'),
+        ('ФИО', 'record.full_name'),
+        ('Пол', 'record.gender'),
+        ('Дата рождения', 'record.birthday'),
+        ('Место рождения', 'record.place_birth'),
+        ('В браке', 'yes_no(record.married)'),
+        ('Паспорт', 'record.passport'),
+        ('Адрес регистрации', 'record.residence_address'),
+        ('Уровень образования', 'record.level_education'),
+        ('Телефон', 'record.phone_number'),
+    )
+
     def __init__(self, id, full_name, gender, birthday, place_birth,
                  married, passport, residence_address, level_education,
                  phone_number):
@@ -142,37 +1842,9 @@ class Person:
         :param phone_number:
         """
 
-        self.__id = Load.is_int(id)
-        self.__full_name = Load.is_str(full_name)[:25]
-
-        if gender == 'муж.' or gender == 'жен.':
-            self.__gender = gender
-        else:
-            self.__gender = None
-
-        if re.fullmatch('\d{2}.\d{2}.\d{4}', birthday):
-            self.__birthday = birthday
-        else:
-            self.__birthday = None
-
-        self.place_birth = Load.is_str(place_birth)
-        self.married = Load.is_bool(married)
-
-        if re.fullmatch('\d{4} \d{6} \d{2}.\d{2}.\d{4}', passport):
-            self.__passport = passport
-        else:
-            self.__passport = None
-
-        self.residence_address = Load.is_str(residence_address)
-        if level_education in Person.allowed_level_education:
-            self.__level_education = level_education
-        else:
-            self.__level_education = None
-
-        if re.fullmatch('\+\d\(\d{3}\)\d{3}-\d{2}-\d{2}', phone_number):
-            self.__phone_number = phone_number
-        else:
-            self.__phone_number = None
+        Person._schema.apply(self, (
+            id, full_name, gender, birthday, place_birth, married, passport,
+            residence_address, level_education, phone_number))
 
     @property
     def id(self):
@@ -182,10 +1854,6 @@ class Person:
     def full_name(self):
         return self.__full_name
 
-    @property
-    def gender(self):
-        return self.__gender
-
     @property
     def birthday(self):
         return self.__birthday
@@ -194,34 +1862,17 @@ class Person:
     def passport(self):
         return self.__passport
 
-    @property
-    def level_education(self):
-        return self.__level_education
-
     @property
     def phone_number(self):
         return self.__phone_number
 
     def __str__(self):
         """
-        Method of presenting data for printing data of class Person
-        :return: data in appropriate format of class Person
+        Method of presenting data for printing data of the record
+        :return: card of the record without absent fields
         """
 
-        output = f'''
-Номер: {self.id}
-ФИО: {self.full_name}
-Пол: {self.gender}
-Дата рождения: {self.birthday}
-Место рождения: {self.place_birth}
-В браке: {'да' if self.married == True else 'нет' if self.married == False
-        else None }
-Паспорт: {self.passport}
-Адрес регистрации: {self.residence_address}
-Уровень образования: {self.level_education}
-Телефон: {self.phone_number}'''
-
-        return Load.print_without_none(output)
+        return self._card.render(self)
 
     def __repr__(self):
         """
@@ -237,8 +1888,35 @@ class Employee(Person):
     Class representing an employee
     """
 
+    __slots__ = ('education_document', '__year_graduation', 'qualification',
+                 'specialty', '__work_experience')
+
     professions_allowed = ['врач', 'медицинская сестра']
 
+    know_foreign_language = Packed(Check.is_bool, writable=True)
+    profession = Packed(Check.is_one_of(professions_allowed))
+
+    _schema = Person._schema.extend(
+        ('know_foreign_language', know_foreign_language),
+        ('education_document', Check.is_str),
+        ('_Employee__year_graduation', Check.is_between('1950', '2030')),
+        ('qualification', Check.is_interned(Load.pools['qualification'])),
+        ('specialty', Check.is_interned(Load.pools['specialty'])),
+        ('profession', profession),
+        ('_Employee__work_experience', Check.to_int_between(0, 60)),
+    )
+
+    _card = Person._card.extend(
+        ('Знание иностранного языка',
+         "'да' if record.know_foreign_language else 'нет'"),
+        ('Документ об образовании', 'record.education_document'),
+        ('Год окончания', 'record.year_graduation'),
+        ('Квалификация', 'record.qualification'),
+        ('Специализация', 'record.specialty'),
+        ('Профессия', 'record.profession'),
+        ('Стаж', 'record.work_experience'),
+    )
+
     def __init__(self, id, full_name, gender, birthday, place_birth, married,
                  passport, residence_address, level_education, phone_number,
                  know_foreign_language, education_document, year_graduation,
@@ -264,60 +1942,20 @@ class Employee(Person):
         :param work_experience:
         """
 
-        super().__init__(id, full_name, gender, birthday, place_birth,
-                         married, passport, residence_address,
-                         level_education, phone_number)
-
-        self.know_foreign_language = Load.is_bool(know_foreign_language)
-        self.education_document = Load.is_str(education_document)
-
-        if '1950' <= year_graduation <= '2030':
-            self.__year_graduation = int(year_graduation)
-        else:
-            self.__year_graduation = None
-
-        self.qualification = Load.is_str(qualification)
-        self.specialty = Load.is_str(specialty)
-
-        if profession in Employee.professions_allowed:
-            self.__profession = profession
-        else:
-            self.__profession = None
-
-        if 0 <= int(work_experience) <= 60:
-            self.__work_experience = int(work_experience)
-        else:
-            self.__work_experience = None
+        Employee._schema.apply(self, (
+            id, full_name, gender, birthday, place_birth, married, passport,
+            residence_address, level_education, phone_number,
+            know_foreign_language, education_document, year_graduation,
+            qualification, specialty, profession, work_experience))
 
     @property
     def year_graduation(self):
         return self.__year_graduation
 
-    @property
-    def profession(self):
-        return self.__profession
-
     @property
     def work_experience(self):
         return self.__work_experience
 
-    def __str__(self):
-        """
-        Method of presenting data for printing data of class Employee
-        :return: data in appropriate format of class Employee
-        """
-
-        output = f'''
-Знание иностранного языка: {'да' if self.know_foreign_language else 'нет'}
-Документ об образовании: {self.education_document}
-Год окончания: {self.year_graduation}
-Квалификация: {self.qualification}
-Специализация: {self.specialty}
-Профессия: {self.profession}
-Стаж: {self.work_experience}'''
-
-        return Load.print_without_none(output)
-
     def __repr__(self):
         """
         Method of representing data of class Employee
@@ -332,8 +1970,44 @@ class Doctor(Employee):
     Class representing a doctor
     """
 
+    __slots__ = ('medical_errors',)
+
     category_allowed = ['высшая', 'первая', 'вторая']
 
+    academic_degree = Packed(Check.is_bool, writable=True)
+    academic_rank = Packed(Check.is_bool, writable=True)
+    category = Packed(Check.is_one_of(category_allowed))
+    trainings = Packed(Check.is_bool, writable=True)
+    diagnosis_patients = Packed(Check.is_bool, writable=True)
+    treatment_patients = Packed(Check.is_bool, writable=True)
+    rehabilitation_patients = Packed(Check.is_bool, writable=True)
+
+    _schema = Employee._schema.extend(
+        ('academic_degree', academic_degree),
+        ('academic_rank', academic_rank),
+        ('category', category),
+        ('trainings', trainings),
+        ('medical_errors', Check.is_interned(Load.pools['medical_errors'])),
+        ('diagnosis_patients', diagnosis_patients),
+        ('treatment_patients', treatment_patients),
+        ('rehabilitation_patients', rehabilitation_patients),
+    )
+
+    _card = Employee._card.extend(
+        ('Ученая степень', 'yes_no(record.academic_degree)'),
+        ('Ученое звание', 'yes_no(record.academic_rank)'),
+        ('Категория', 'record.category'),
+        ('Повышение квалификации',
+         'yes_no(record.trainings)'),
+        ('Врачебные ошибки', 'record.medical_errors'),
+        ('Выполнение диагностики заболеваний',
+         'yes_no(record.diagnosis_patients)'),
+        ('Лечебная практика',
+         'yes_no(record.treatment_patients)'),
+        ('Реабилитация больных',
+         'yes_no(record.rehabilitation_patients)'),
+    )
+
     def __init__(self, id, full_name, gender, birthday, place_birth, married,
                  passport, residence_address, level_education, phone_number,
                  know_foreign_language, education_document, year_graduation,
@@ -370,56 +2044,14 @@ class Doctor(Employee):
         :param rehabilitation_patients:
         """
 
-        super().__init__(id, full_name, gender, birthday, place_birth,
-                         married, passport, residence_address,
-                         level_education, phone_number, know_foreign_language,
-                         education_document, year_graduation, qualification,
-                         specialty, profession, work_experience)
-
-        self.academic_degree = Load.is_bool(academic_degree)
-        self.academic_rank = Load.is_bool(academic_rank)
-
-        if category in Doctor.category_allowed:
-            self.__category = category
-        else:
-            self.__category = None
-
-        self.trainings = Load.is_bool(trainings)
-        self.medical_errors = Load.is_str(medical_errors)
-        self.diagnosis_patients = Load.is_bool(diagnosis_patients)
-        self.treatment_patients = Load.is_bool(treatment_patients)
-        self.rehabilitation_patients = Load.is_bool(rehabilitation_patients)
-
-    @property
-    def category(self):
-        return self.__category
-
-    def __str__(self):
-        """
-        Method of presenting data for printing data of class Doctor
-        :return: data in appropriate format of class Doctor
-        """
-
-        print(Person.__str__(self), end='')
-        print(Employee.__str__(self), end='')
-
-        output = f'''
-Ученая степень: {'да' if self.academic_degree else 'нет' if
-        self.academic_degree == False else None}
-Ученое звание: {'да' if self.academic_rank else 'нет' if 
-        self.academic_rank == False else None}
-Категория: {self.category}
-Повышение квалификации: {'да' if self.trainings else 'нет' if 
-        self.trainings == False else None}
-Врачебные ошибки: {self.medical_errors}
-Выполнение диагностики заболеваний: {'да' if self.diagnosis_patients else
-        'нет' if self.diagnosis_patients == False else None}
-Лечебная практика: {'да' if self.treatment_patients else 'нет' if 
-        self.treatment_patients == False else None}
-Реабилитация больных: {'да' if self.rehabilitation_patients else 'нет' if
-        self.rehabilitation_patients == False else None}'''
-
-        return Load.print_without_none(output)
+        Doctor._schema.apply(self, (
+            id, full_name, gender, birthday, place_birth, married, passport,
+            residence_address, level_education, phone_number,
+            know_foreign_language, education_document, year_graduation,
+            qualification, specialty, profession, work_experience,
+            academic_degree, academic_rank, category, trainings,
+            medical_errors, diagnosis_patients, treatment_patients,
+            rehabilitation_patients))
 
     def __repr__(self):
         """
@@ -435,6 +2067,26 @@ class Nurse(Employee):
     Class representing a nurse
     """
 
+    __slots__ = ()
+
+    sanitary_service = Packed(Check.is_bool, writable=True)
+    patient_care = Packed(Check.is_bool, writable=True)
+    medical_procedures = Packed(Check.is_bool, writable=True)
+
+    _schema = Employee._schema.extend(
+        ('sanitary_service', sanitary_service),
+        ('patient_care', patient_care),
+        ('medical_procedures', medical_procedures),
+    )
+
+    _card = Employee._card.extend(
+        ('Санитарная обработка помещений',
+         'yes_no(record.sanitary_service)'),
+        ('Уход за больными', 'yes_no(record.patient_care)'),
+        ('Выполнение медицинских процедур',
+         'yes_no(record.medical_procedures)'),
+    )
+
     def __init__(self, id, full_name, gender, birthday, place_birth, married,
                  passport, residence_address, level_education, phone_number,
                  know_foreign_language, education_document, year_graduation,
@@ -464,34 +2116,12 @@ class Nurse(Employee):
         :param medical_procedures:
         """
 
-        super().__init__(id, full_name, gender, birthday, place_birth,
-                         married, passport, residence_address,
-                         level_education, phone_number, know_foreign_language,
-                         education_document, year_graduation, qualification,
-                         specialty, profession, work_experience)
-
-        self.sanitary_service = Load.is_bool(sanitary_service)
-        self.patient_care = Load.is_bool(patient_care)
-        self.medical_procedures = Load.is_bool(medical_procedures)
-
-    def __str__(self):
-        """
-        Method of presenting data for printing data of class Nurse
-        :return: data in appropriate format of class Nurse
-        """
-
-        print(Person.__str__(self), end='')
-        print(Employee.__str__(self), end='')
-
-        output = f'''
-Санитарная обработка помещений: {'да' if self.sanitary_service else 'нет' if 
-        self.sanitary_service == False else None}
-Уход за больными: {'да' if self.patient_care else 'нет' if 
-        self.patient_care == False else None}
-Выполнение медицинских процедур: {'да' if self.medical_procedures else 'нет'
-        if self.medical_procedures == False else None}'''
-
-        return Load.print_without_none(output)
+        Nurse._schema.apply(self, (
+            id, full_name, gender, birthday, place_birth, married, passport,
+            residence_address, level_education, phone_number,
+            know_foreign_language, education_document, year_graduation,
+            qualification, specialty, profession, work_experience,
+            sanitary_service, patient_care, medical_procedures))
 
     def __repr__(self):
         """
@@ -507,8 +2137,38 @@ class Patient(Person):
     Class representing a patient
     """
 
+    __slots__ = ('medical_policy', 'place_work_study', '__blood_type',
+                 'allergic_reactions')
+
     status_allowed = ['рабочий', 'служащий', 'обучающийся']
 
+    status = Packed(Check.is_one_of(status_allowed))
+    # every substring of '+-' is accepted, including '' and '+-'
+    rhesus_affiliation = Packed(Check.is_one_of(['+', '-', '', '+-']))
+
+    _schema = Person._schema.extend(
+        ('medical_policy', Check.is_str),
+        ('status', status),
+        ('place_work_study',
+         Check.is_interned(Load.pools['place_work_study'])),
+        ('_Patient__blood_type', Check.is_between('1', '4')),
+        ('rhesus_affiliation', rhesus_affiliation),
+        ('allergic_reactions',
+         Check.is_interned(Load.pools['allergic_reactions'])),
+    )
+
+    _card = Person._card.extend(
+        ('Медицинский полис', 'record.medical_policy'),
+        ('Статус', 'record.status'),
+        ('Место работы (учебы)', 'record.place_work_study'),
+        ('Группа крови',
+         "None if record.blood_type is None "
+         "or record.rhesus_affiliation is None "
+         "else f'{record.blood_type}({record.rhesus_affiliation})'"),
+        ('Аллергические реакции',
+         'detected(record.allergic_reactions)'),
+    )
+
     def __init__(self, id, full_name, gender, birthday, place_birth, married,
                  passport, residence_address, level_education, phone_number,
                  medical_policy, status, place_work_study, blood_type,
@@ -533,59 +2193,16 @@ class Patient(Person):
         :param allergic_reactions:
         """
 
-        super().__init__(id, full_name, gender, birthday, place_birth,
-                         married, passport, residence_address,
-                         level_education, phone_number)
-
-        self.medical_policy = Load.is_str(medical_policy)
-
-        if status in Patient.status_allowed:
-            self.__status = status
-        else:
-            self.__status = None
-
-        self.place_work_study = Load.is_str(place_work_study)
-
-        if '1' <= blood_type <= '4':
-            self.__blood_type = int(blood_type)
-        else:
-            self.__blood_type = None
-
-        if rhesus_affiliation in '+-':
-            self.__rhesus_affiliation = rhesus_affiliation
-        else:
-            self.__rhesus_affiliation = None
-
-        self.allergic_reactions = Load.is_str(allergic_reactions)
-
-    @property
-    def status(self):
-        return self.__status
+        Patient._schema.apply(self, (
+            id, full_name, gender, birthday, place_birth, married, passport,
+            residence_address, level_education, phone_number, medical_policy,
+            status, place_work_study, blood_type, rhesus_affiliation,
+            allergic_reactions))
 
     @property
     def blood_type(self):
         return self.__blood_type
 
-    @property
-    def rhesus_affiliation(self):
-        return self.__rhesus_affiliation
-
-    def __str__(self):
-        """
-        Method of presenting data for printing data of class Patient
-        :return: data in appropriate format of class Patient
-        """
-
-        output = f'''
-Медицинский полис: {self.medical_policy}
-Статус: {self.status}
-Место работы (учебы): {self.place_work_study}
-Группа крови: {self.blood_type}({self.rhesus_affiliation})
-Аллергические реакции: {None if self.allergic_reactions == 'Не выявлено' else
-        self.allergic_reactions}'''
-
-        return Load.print_without_none(output)
-
     def __repr__(self):
         """
         Method of representing data of class Patient
@@ -600,8 +2217,30 @@ class AmbulatoryPatient(Patient):
     Class representing an ambulatory patient
     """
 
+    __slots__ = ('__disability', 'chronic_diagnosis')
+
     health_group_allowed = ['I', 'II', 'III']
 
+    territorial_number = Packed(Check.is_int_between(1, 20), range(1, 21))
+    health_group = Packed(Check.is_one_of(health_group_allowed))
+
+    _schema = Patient._schema.extend(
+        ('territorial_number', territorial_number),
+        ('_AmbulatoryPatient__disability', Check.is_between('0', '3')),
+        ('health_group', health_group),
+        ('chronic_diagnosis',
+         Check.is_interned(Load.pools['chronic_diagnosis'])),
+    )
+
+    _card = Patient._card.extend(
+        ('Участок', 'record.territorial_number'),
+        ('Группа инвалидности',
+         'None if record.disability == 0 else record.disability'),
+        ('Группа здоровья', 'record.health_group'),
+        ('Хронический диагноз',
+         'detected(record.chronic_diagnosis)'),
+    )
+
     def __init__(self, id, full_name, gender, birthday, place_birth, married,
                  passport, residence_address, level_education, phone_number,
                  medical_policy, status, place_work_study, blood_type,
@@ -631,65 +2270,17 @@ class AmbulatoryPatient(Patient):
         :param chronic_diagnosis:
         """
 
-        super().__init__(id, full_name, gender, birthday, place_birth,
-                         married, passport, residence_address,
-                         level_education, phone_number, medical_policy,
-                         status, place_work_study, blood_type,
-                         rhesus_affiliation, allergic_reactions,
-                         )
-        try:
-            territorial_number = int(territorial_number)
-
-            if 1 <= territorial_number <= 20:
-                self.__territorial_number = territorial_number
-            else:
-                self.__territorial_number = None
-
-        except ValueError:
-            self.__territorial_number = None
-
-        if '0' <= disability <= '3':
-            self.__disability = int(disability)
-        else:
-            self.__disability = None
-
-        if health_group in AmbulatoryPatient.health_group_allowed:
-            self.__health_group = health_group
-        else:
-            self.__health_group = None
-
-        self.chronic_diagnosis = Load.is_str(chronic_diagnosis)
-
-    @property
-    def territorial_number(self):
-        return self.__territorial_number
+        AmbulatoryPatient._schema.apply(self, (
+            id, full_name, gender, birthday, place_birth, married, passport,
+            residence_address, level_education, phone_number, medical_policy,
+            status, place_work_study, blood_type, rhesus_affiliation,
+            allergic_reactions, territorial_number, disability, health_group,
+            chronic_diagnosis))
 
     @property
     def disability(self):
         return self.__disability
 
-    @property
-    def health_group(self):
-        return self.__health_group
-
-    def __str__(self):
-        """
-        Method of presenting data for printing data of class AmbulatoryPatient
-        :return: data in appropriate format of class AmbulatoryPatient
-        """
-
-        print(Person.__str__(self), end='')
-        print(Patient.__str__(self), end='')
-
-        output = f'''
-Участок: {self.territorial_number}
-Группа инвалидности: {None if self.disability == 0 else self.disability}
-Группа здоровья: {self.health_group}
-Хронический диагноз: {None if self.chronic_diagnosis == 'Не выявлено' else
-        self.chronic_diagnosis}'''
-
-        return Load.print_without_none(output)
-
     def __repr__(self):
         """
         Method of representing data of class AmbulatoryPatient
@@ -699,12 +2290,38 @@ class AmbulatoryPatient(Patient):
         return f'{self.id}. {self.full_name}'
 
 
-class HospitalPatient(Patient):
+class HospitalPatientType(type):
+    """
+    Class representing the type of HospitalPatient, its hospital_patients
+    are lines of hospital patients of the default registry
+    """
+
+    @property
+    def hospital_patients(cls):
+        return Load.registry.patient_names
+
+
+class HospitalPatient(Patient, metaclass=HospitalPatientType):
     """
     Class representing a hospital patient
     """
 
-    hospital_patients = []
+    __slots__ = ('medical_department', 'room_number', 'clinic_diagnosis')
+
+    _schema = Patient._schema.extend(
+        ('medical_department',
+         Check.is_interned(Load.pools['medical_department'])),
+        ('room_number', Check.is_int),
+        ('clinic_diagnosis',
+         Check.is_interned(Load.pools['clinic_diagnosis'])),
+    )
+
+    _card = Patient._card.extend(
+        ('Отделение', 'record.medical_department'),
+        ('Палата', 'record.room_number'),
+        ('Клинический диагноз',
+         'detected(record.clinic_diagnosis)'),
+    )
 
     def __init__(self, id, full_name, gender, birthday, place_birth, married,
                  passport, residence_address, level_education, phone_number,
@@ -734,33 +2351,12 @@ class HospitalPatient(Patient):
         :param clinic_diagnosis:
         """
 
-        super().__init__(id, full_name, gender, birthday, place_birth, married,
-                         passport, residence_address, level_education,
-                         phone_number, medical_policy, status,
-                         place_work_study, blood_type, rhesus_affiliation,
-                         allergic_reactions)
-
-        self.medical_department = Load.is_str(medical_department)
-        self.room_number = Load.is_int(room_number)
-        self.clinic_diagnosis = Load.is_str(clinic_diagnosis)
-        HospitalPatient.hospital_patients.append(f'{self.id}. {self.full_name} ')
-
-    def __str__(self):
-        """
-        Method of presenting data for printing data of class HospitalPatient
-        :return: data in appropriate format of class HospitalPatient
-        """
-
-        print(Person.__str__(self), end='')
-        print(Patient.__str__(self), end='')
-
-        output = f'''
-Отделение: {self.medical_department}
-Палата: {self.room_number}
-Клинический диагноз: {None if self.clinic_diagnosis == 'Не выявлено'
-        else self.clinic_diagnosis}'''
-
-        return Load.print_without_none(output)
+        HospitalPatient._schema.apply(self, (
+            id, full_name, gender, birthday, place_birth, married, passport,
+            residence_address, level_education, phone_number, medical_policy,
+            status, place_work_study, blood_type, rhesus_affiliation,
+            allergic_reactions, medical_department, room_number,
+            clinic_diagnosis))
 
     def __repr__(self):
         """
@@ -769,3 +2365,12 @@ class HospitalPatient(Patient):
         """
 
         return f'{self.id}. {self.full_name}'
+
+
+# names of lists of loaded records of record classes in Registry
+RECORDS = {
+    HospitalPatient: 'hospital_patients',
+    AmbulatoryPatient: 'ambulatory_patients',
+    Nurse: 'nurses',
+    Doctor: 'doctors',
+}
@@ -0,0 +1,244 @@
+import json
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# upper bounds of buckets of timing histograms, in seconds
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+           1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+
+# descriptions of metrics written by Load
+DESCRIPTIONS = {
+    'load_rows_total': 'Rows read by loader and result',
+    'load_bytes_total': 'Bytes of lines read by loader',
+    'load_rejected_fields_total':
+        'Values of accepted rows rejected by their checks and stored as None',
+    'load_read_seconds': 'Reading a batch of lines from file',
+    'load_split_seconds': 'Splitting a batch of lines into fields',
+    'load_validate_seconds': 'Validating one row in the record constructor',
+    'load_insert_seconds': 'Adding a batch of records to lists and indexes',
+}
+
+
+class Histogram:
+    """
+    Class representing counts of observed values by buckets
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        """
+        Sets all the necessary attributes for the class Histogram
+        :param buckets: increasing upper bounds of buckets, values above the
+        last one are only counted in the total
+        """
+
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """
+        Method of counting value
+        :param value:
+        :return:
+        """
+
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Method of getting cumulative counts of buckets
+        :return: list of pairs of upper bound, inf for the last one, and
+        number of values not above it
+        """
+
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float('inf'),),
+                                self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class Metrics:
+    """
+    Class representing counters and histograms with labels, exported in
+    Prometheus text format or as JSON
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        """
+        Sets all the necessary attributes for the class Metrics
+        :param buckets: bounds of buckets of new histograms
+        """
+
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        """
+        Method of adding value to counter
+        :param name:
+        :param value:
+        :param labels: values of labels of counter
+        :return:
+        """
+
+        key = Metrics._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def histogram(self, name, **labels):
+        """
+        Method of getting histogram, a new one is made on the first call, so
+        that hot loops look it up once
+        :param name:
+        :param labels:
+        :return: Histogram
+        """
+
+        key = Metrics._key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(
+                    key, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, name, value, **labels):
+        """
+        Method of counting value in histogram
+        :param name:
+        :param value:
+        :param labels:
+        :return:
+        """
+
+        self.histogram(name, **labels).observe(value)
+
+    def clear(self):
+        """
+        Method of removing all counters and histograms
+        :return:
+        """
+
+        self.counters.clear()
+        self.histograms.clear()
+
+    def report(self):
+        """
+        Method of getting all values
+        :return: dict with lists of counters and of histograms, each a dict
+        with name, labels and values
+        """
+
+        return {
+            'counters': [{'name': name, 'labels': dict(labels),
+                          'value': value}
+                         for (name, labels), value
+                         in sorted(self.counters.items())],
+            'histograms': [{'name': name, 'labels': dict(labels),
+                            'count': histogram.count, 'sum': histogram.sum,
+                            'buckets': {repr(bound): count for bound, count
+                                        in histogram.cumulative()}}
+                           for (name, labels), histogram
+                           in sorted(self.histograms.items())],
+        }
+
+    def to_json(self):
+        """
+        Method of exporting all values as JSON
+        :return: string
+        """
+
+        return json.dumps(self.report(), ensure_ascii=False, indent=1)
+
+    def to_prometheus(self):
+        """
+        Method of exporting all values in Prometheus text format
+        :return: string
+        """
+
+        lines = []
+        for kind, values in (('counter', self.counters),
+                             ('histogram', self.histograms)):
+            described = set()
+            for (name, labels), value in sorted(values.items()):
+                if name not in described:
+                    described.add(name)
+                    if name in DESCRIPTIONS:
+                        lines.append(f'# HELP {name} {DESCRIPTIONS[name]}')
+                    lines.append(f'# TYPE {name} {kind}')
+                if kind == 'counter':
+                    lines.append(f'{name}{_labels(labels)} {value}')
+                    continue
+                for bound, count in value.cumulative():
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket'
+                                 f'{_labels(labels + (("le", le),))} {count}')
+                lines.append(f'{name}_sum{_labels(labels)} {value.sum!r}')
+                lines.append(f'{name}_count{_labels(labels)} {value.count}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=9100, host='127.0.0.1'):
+        """
+        Method of serving values over HTTP in a daemon thread, /metrics in
+        Prometheus text format and /metrics.json as JSON
+        :param port: 0 for any free port
+        :param host:
+        :return: server, its shutdown method stops it
+        """
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body = metrics.to_prometheus()
+                    content_type = 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body = metrics.to_json()
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                body = body.encode('utf8')
+                self.send_response(200)
+                self.send_header('Content-Type',
+                                 content_type + '; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def _labels(labels):
+    """
+    Function of writing labels in Prometheus text format
+    :param labels: tuple of pairs of name and value
+    :return: string
+    """
+
+    if not labels:
+        return ''
+    values = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\')
+                         .replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels)
+    return '{' + values + '}'
@@ -0,0 +1,353 @@
+import re
+
+import numpy as np
+
+from cow import Chunks, Column
+
+_SEPARATORS = re.compile(r'[\W_]+')
+# places of postings no name was added to, greater than every name number
+POSTINGS_END = np.iinfo(np.int32).max
+
+
+def normalize(name):
+    """
+    Function of normalizing name for fuzzy search: letters are lowercased, ё
+    is replaced by е and words are separated by one space
+    :param name:
+    :return: normalized name
+    """
+
+    words = _SEPARATORS.split(name.lower().replace('ё', 'е'))
+    return ' '.join(word for word in words if word)
+
+
+def trigrams(name):
+    """
+    Function of getting trigrams of normalized name, every word is padded
+    with two spaces before and one after, so that beginnings of words weigh
+    more than their ends
+    :param name: normalized name
+    :return: set of trigrams
+    """
+
+    grams = set()
+    for word in name.split():
+        word = f'  {word} '
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+class NameIndex:
+    """
+    Class representing an inverted index of trigrams of names for fuzzy
+    search, equal normalized names share one entry and records of a name are
+    kept in the order they were added; names and trigrams are only appended,
+    so copies of the index share them, each copy sees the names it had when
+    it was made
+    """
+
+    def __init__(self, name, length=None, budget=50000, candidates=2000):
+        """
+        Sets all the necessary attributes for the class NameIndex, trigrams
+        are numbered and kept both as postings, arrays of names having them,
+        and as trigrams of every name one after another
+        :param name: name of indexed field
+        :param length: length values of field are truncated to, queries are
+        truncated the same way
+        :param budget: most postings of the rarest trigrams of a query read
+        to find candidate names
+        :param candidates: most names having the most of these trigrams
+        that are compared with query
+        """
+
+        self.name = name
+        self.length = length
+        self.budget = budget
+        self.candidates = candidates
+        # shared by copies, only the last copy adds names, see _own
+        self.ids = {}
+        self.codes = {}
+        self.postings = []
+        self.grams = Column(np.int32)
+        self.starts = Column(np.int64)
+        self.sizes = Column(np.uint16)
+        self.head = [self]
+        # codes of postings with names not flushed yet
+        self.dirty = set()
+        # of this copy: numbers of its names and trigrams, records of its
+        # names and whether they have records
+        self.names = 0
+        self.code_count = 0
+        self.records = Chunks()
+        # names whose lists of records are not shared with a copy
+        self.owned = set()
+        self.alive = Column(np.uint8)
+        self.shared_alive = 0
+        self.count = 0
+
+    def _key(self, value):
+        return normalize(value[:self.length] if self.length else value)
+
+    def _name_id(self, key):
+        name_id = self.ids.get(key)
+        return name_id if name_id is not None and name_id < self.names \
+            else None
+
+    def add(self, record):
+        """
+        Method of adding record to the index, trigrams are only made for a
+        name that is not in the index yet
+        :param record:
+        :return:
+        """
+
+        value = getattr(record, self.name, None)
+        if value is None:
+            return
+        if self.head[0] is not self:
+            self._own()
+        name_id = self.ids.get(value)
+        if name_id is None or name_id >= self.names:
+            name_id = self._add_name(value)
+        records = (self.records[name_id] if name_id in self.owned
+                   else self._records(name_id))
+        records.append(record)
+        if len(records) == 1:
+            self._set_alive(name_id, 1)
+        self.count += 1
+
+    def _add_name(self, value):
+        """
+        Method of numbering name, the value is kept along with the normalized
+        name, so that records with equal values are added without
+        normalizing them again
+        :param value: value of field
+        :return: number of name
+        """
+
+        key = self._key(value)
+        name_id = self._name_id(key)
+        if name_id is None:
+            name_id = self.ids[key] = self.names
+            grams = trigrams(key)
+            self.starts.append(len(self.grams))
+            for gram in grams:
+                code = self.codes.get(gram)
+                if code is None:
+                    code = self.codes[gram] = self.code_count
+                    self.code_count += 1
+                    self.postings.append(Column(np.int32, POSTINGS_END))
+                self.postings[code].append(name_id)
+                self.dirty.add(code)
+                self.grams.append(code)
+            self.records.append([])
+            self.owned.add(name_id)
+            self.sizes.append(len(grams))
+            self.alive.append(0)
+            self.names += 1
+        self.ids[value] = name_id
+        return name_id
+
+    def _records(self, name_id):
+        """
+        Method of getting records of name to be changed, records shared with
+        a copy of the index are copied first
+        :param name_id:
+        :return: list of records
+        """
+
+        records = self.records[name_id]
+        if name_id not in self.owned:
+            records = self.records[name_id] = list(records)
+            self.owned.add(name_id)
+        return records
+
+    def _set_alive(self, name_id, alive):
+        """
+        Method of marking whether name has records, flags seen by copies of
+        the index are copied first
+        :param name_id:
+        :param alive: 1 or 0
+        :return:
+        """
+
+        if name_id < self.shared_alive and self.alive[name_id] != alive:
+            self.alive = self.alive.copy()
+            self.shared_alive = 0
+        self.alive[name_id] = alive
+
+    def _own(self):
+        """
+        Method of copying names and trigrams of this copy of the index, so
+        that it adds names without changing the ones the last copy adds to
+        :return:
+        """
+
+        names, codes = self.names, self.code_count
+        self.ids = {value: name_id for value, name_id in self.ids.items()
+                    if name_id < names}
+        self.codes = {gram: code for gram, code in self.codes.items()
+                      if code < codes}
+        self.postings = [
+            postings.copy(np.searchsorted(postings.data, names))
+            for postings in self.postings[:codes]]
+        ends = self.starts.view(names)[-1:] + self.sizes.view(names)[-1:]
+        self.grams = self.grams.copy(int(ends[0]) if names else 0)
+        self.starts = self.starts.copy(names)
+        self.sizes = self.sizes.copy(names)
+        self.alive = self.alive.copy(names)
+        self.shared_alive = 0
+        self.head = [self]
+        self.dirty = set()
+
+    def flush(self):
+        """
+        Method of writing added names and trigrams to the arrays searched,
+        it is only done by the last copy of the index, see copy
+        :return:
+        """
+
+        if self.head[0] is not self:
+            return
+        for code in self.dirty:
+            self.postings[code].flush()
+        self.dirty.clear()
+        for column in self.grams, self.starts, self.sizes, self.alive:
+            column.flush()
+
+    def remove(self, record):
+        """
+        Method of removing record from the index, trigrams of a name without
+        records stay in the index and it is skipped by search
+        :param record:
+        :return:
+        """
+
+        value = getattr(record, self.name, None)
+        if value is None:
+            return
+        name_id = self._name_id(value)
+        if name_id is None:
+            return
+        for i, other in enumerate(self.records[name_id]):
+            if other is record:
+                records = self._records(name_id)
+                del records[i]
+                self.count -= 1
+                break
+        records = self.records[name_id]
+        if not records:
+            self._set_alive(name_id, 0)
+
+    def copy(self):
+        """
+        Method of copying the index, records are not copied; names and
+        trigrams are shared and only the copy adds new ones to them
+        :return: index
+        """
+
+        self.flush()
+        index = NameIndex.__new__(NameIndex)
+        index.__dict__.update(self.__dict__)
+        index.records = self.records.copy()
+        index.owned, self.owned = set(), set()
+        index.alive = self.alive.share()
+        index.shared_alive = self.shared_alive = self.names
+        if self.head[0] is self:
+            self.head[0] = index
+        else:
+            index._own()
+        return index
+
+    def find(self, value):
+        """
+        Method of finding records whose normalized name equals normalized
+        value
+        :param value:
+        :return: list of records
+        """
+
+        name_id = self._name_id(self._key(value))
+        return [] if name_id is None else list(self.records[name_id])
+
+    def get(self, value):
+        """
+        Method of finding the first record whose normalized name equals
+        normalized value
+        :param value:
+        :return: record or None
+        """
+
+        records = self.find(value)
+        return records[0] if records else None
+
+    def search(self, query, k=10):
+        """
+        Method of finding records with names most similar to query by Dice
+        coefficient of trigrams; candidates are names having the rarest
+        trigrams of query, postings are read from the rarest until budget is
+        spent, so a name sharing only common trigrams with query may be
+        missed
+        :param query: name, possibly misspelled
+        :param k: most records found
+        :return: list of pairs of similarity from 0 to 1 and record, the
+        most similar first
+        """
+
+        self.flush()
+        grams = trigrams(self._key(query))
+        codes = [self.codes[gram] for gram in grams
+                 if self.codes.get(gram, self.code_count) < self.code_count]
+        if not codes or k <= 0:
+            return []
+        lists = []
+        for code in codes:
+            postings = self.postings[code].data
+            lists.append(postings[:np.searchsorted(postings, self.names)])
+        lists.sort(key=len)
+        read = [lists[0][:self.budget]]
+        total = len(read[0])
+        for postings in lists[1:]:
+            total += len(postings)
+            if total > self.budget:
+                break
+            read.append(postings)
+        candidates = np.concatenate(read)
+        candidates.sort()
+        firsts = np.flatnonzero(np.diff(candidates, prepend=-1))
+        counts = np.diff(firsts, append=len(candidates))
+        candidates = candidates[firsts]
+        alive = self.alive.data[candidates] == 1
+        candidates, counts = candidates[alive], counts[alive]
+        if len(candidates) > self.candidates:
+            best = np.argpartition(-counts, self.candidates - 1)
+            candidates = candidates[best[:self.candidates]]
+        if not len(candidates):
+            return []
+
+        # trigrams of candidates one after another, shared ones are counted
+        # for every candidate
+        sizes = self.sizes.data[candidates].astype(np.int64)
+        ends = np.cumsum(sizes)
+        positions = (np.arange(ends[-1])
+                     + np.repeat(self.starts.data[candidates] - ends + sizes,
+                                 sizes))
+        wanted = np.zeros(self.code_count, dtype=np.int32)
+        wanted[codes] = 1
+        shared = np.add.reduceat(wanted[self.grams.data[positions]],
+                                 ends - sizes)
+        scores = 2 * shared / (len(grams) + sizes)
+        best = (np.argpartition(-scores, k - 1)[:k]
+                if len(scores) > k else np.arange(len(scores)))
+        best = best[np.lexsort((candidates[best], -scores[best]))]
+
+        found = []
+        for i in best:
+            for record in self.records[candidates[i]]:
+                found.append((float(scores[i]), record))
+                if len(found) == k:
+                    return found
+        return found
+
+    def __len__(self):
+        return self.count
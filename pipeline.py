@@ -0,0 +1,300 @@
+import asyncio
+import marshal
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from main import Load, RECORDS
+
+
+class StageMetrics:
+    """
+    Class representing counters of one stage of the pipeline
+    """
+
+    def __init__(self, name, queue=None):
+        """
+        Sets all the necessary attributes for the class StageMetrics
+        :param name:
+        :param queue: queue the stage puts its output to, None for the last
+        stage
+        """
+
+        self.name = name
+        self.queue = queue
+        self.items = 0
+        self.rejected = 0
+        self.waited = 0.0
+        self.max_depth = 0
+        self.started = time.perf_counter()
+
+    def add(self, items, waited=0.0, rejected=0):
+        """
+        Method of counting items passed by the stage
+        :param items: number of lines or records
+        :param waited: seconds the stage waited for place in full queue
+        :param rejected: number of rejected lines
+        :return:
+        """
+
+        self.items += items
+        self.rejected += rejected
+        self.waited += waited
+        if self.queue is not None:
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def report(self):
+        """
+        Method of getting current values of counters
+        :return: dict of counters
+        """
+
+        elapsed = time.perf_counter() - self.started
+        report = {'items': self.items,
+                  'rejected': self.rejected,
+                  'per_second': self.items / elapsed if elapsed else 0.0,
+                  'waited_seconds': self.waited}
+        if self.queue is not None:
+            report.update(queue_depth=self.queue.qsize(),
+                          max_queue_depth=self.max_depth,
+                          queue_size=self.queue.maxsize)
+        return report
+
+
+class Pipeline:
+    """
+    Class representing ingestion of lines of a feed into loaded records in
+    three stages connected by bounded queues: reading lines into batches,
+    validating batches in a worker pool and adding records to a registry, a
+    full queue stops the stage before it; rows the constructor raises on
+    are rejected without stopping the pipeline
+    """
+
+    def __init__(self, record_class, workers=None, batch_size=500,
+                 queue_size=8, registry=None, quarantine=None):
+        """
+        Sets all the necessary attributes for the class Pipeline
+        :param record_class:
+        :param workers: number of processes validating batches, if None
+        batches are validated in a thread, which keeps the event loop free
+        but does not run in parallel
+        :param batch_size: most lines in one batch
+        :param queue_size: most batches waiting in each queue, the second
+        queue also limits batches being validated at once
+        :param registry: Registry records are added to, by default the
+        default registry when the pipeline starts
+        :param quarantine: Quarantine rejected rows are passed to, they are
+        only counted in the report if it is None
+        """
+
+        self.record_class = record_class
+        self.registry = registry
+        self.quarantine = quarantine
+        self.target = None
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.batches = None
+        self.line_number = 1
+        self.validated = None
+        self.metrics = {}
+
+    async def run(self, chunks):
+        """
+        Method of ingesting all lines of feed, ids continue from
+        current_id of the registry and are only given to accepted rows, as
+        in Registry.iter_records with quarantine
+        :param chunks: async iterable of lists of lines, like read_file and
+        read_stream give
+        :return: number of added records
+        """
+
+        loop = asyncio.get_running_loop()
+        self.target = (Load.registry if self.registry is None
+                       else self.registry)
+        self.batches = asyncio.Queue(self.queue_size)
+        self.validated = asyncio.Queue(self.queue_size)
+        self.metrics = {'read': StageMetrics('read', self.batches),
+                        'validate': StageMetrics('validate', self.validated),
+                        'insert': StageMetrics('insert')}
+
+        executor = (ProcessPoolExecutor(self.workers) if self.workers
+                    else None)
+        tasks = [asyncio.create_task(self._read(chunks)),
+                 asyncio.create_task(self._validate(loop, executor)),
+                 asyncio.create_task(self._insert())]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        return self.metrics['insert'].items
+
+    def report(self):
+        """
+        Method of getting counters of all stages, it may be called while
+        the pipeline runs
+        :return: dict of stage names and counters
+        """
+
+        return {name: metrics.report()
+                for name, metrics in self.metrics.items()}
+
+    async def _read(self, chunks):
+        """
+        Method of the first stage: grouping lines into batches with numbers
+        of their first lines
+        :param chunks:
+        :return:
+        """
+
+        metrics = self.metrics['read']
+        self.line_number = 1
+        batch = []
+        async for lines in chunks:
+            batch.extend(lines)
+            while len(batch) >= self.batch_size:
+                await self._put_batch(batch[:self.batch_size], metrics)
+                batch = batch[self.batch_size:]
+            if batch:
+                await self._put_batch(batch, metrics)
+                batch = []
+        await self.batches.put(None)
+
+    async def _put_batch(self, batch, metrics):
+        first_line = self.line_number
+        self.line_number += len(batch)
+        start = time.perf_counter()
+        await self.batches.put((first_line, batch))
+        metrics.add(len(batch), time.perf_counter() - start)
+
+    async def _validate(self, loop, executor):
+        """
+        Method of the second stage: starting validation of batches in the
+        pool, futures are queued in order of batches
+        :param loop:
+        :param executor: process pool or None for the default thread pool
+        :return:
+        """
+
+        metrics = self.metrics['validate']
+        while True:
+            item = await self.batches.get()
+            if item is None:
+                await self.validated.put(None)
+                return
+            first_line, batch = item
+            future = loop.run_in_executor(executor, Load._parse_lines_checked,
+                                          self.record_class, batch,
+                                          first_line)
+            future.add_done_callback(
+                lambda done, count=len(batch): metrics.add(count))
+            start = time.perf_counter()
+            await self.validated.put(future)
+            metrics.add(0, time.perf_counter() - start)
+
+    async def _insert(self):
+        """
+        Method of the third stage: adding validated records to the registry
+        with the next ids and passing rejected rows to the quarantine
+        :return:
+        """
+
+        metrics = self.metrics['insert']
+        records = RECORDS[self.record_class]
+        restore = self.record_class._schema.restore
+        while True:
+            future = await self.validated.get()
+            if future is None:
+                return
+            states, counts, rejected = marshal.loads(await future)
+            if self.quarantine is not None:
+                self.quarantine.merge(len(states), counts, rejected)
+            for state in states:
+                record = restore(self.record_class,
+                                 (self.target.current_id,) + state[1:])
+                self.target.current_id += 1
+                self.target._add(record, records)
+            metrics.add(len(states), rejected=len(rejected))
+
+
+async def read_file(filename, follow=False, stop=None, poll=0.1,
+                    chunk_bytes=1 << 16):
+    """
+    Function of reading lines of file without blocking the event loop
+    :param filename:
+    :param follow: if True, lines appended to file are read as they come,
+    like tail -f does
+    :param stop: asyncio.Event, when it is set following ends at the end of
+    file
+    :param poll: seconds between checks of file for new lines
+    :param chunk_bytes: about how many bytes are read at once
+    :return: async generator of lists of complete lines, an unfinished last
+    line is kept until the rest of it is read or reading ends
+    """
+
+    with open(filename, 'r', encoding='utf8', newline='') as f_records:
+        pending = ''
+        while True:
+            lines = await asyncio.to_thread(f_records.readlines, chunk_bytes)
+            if lines:
+                if pending.endswith('\r') and lines[0] != '\n':
+                    lines.insert(0, pending)
+                else:
+                    lines[0] = pending + lines[0]
+                pending = ''
+                # a line ending with \r is kept too, the \n of its line
+                # end \r\n may come with the next read
+                if not lines[-1].endswith('\n'):
+                    pending = lines.pop()
+                if lines:
+                    yield lines
+            elif follow and not (stop is not None and stop.is_set()):
+                await asyncio.sleep(poll)
+            else:
+                break
+        if pending:
+            yield [pending]
+
+
+async def read_stream(reader, chunk_bytes=1 << 16):
+    """
+    Function of reading lines from asyncio stream, e.g. of a socket
+    :param reader: asyncio.StreamReader
+    :param chunk_bytes: most bytes read at once
+    :return: async generator of lists of complete lines
+    """
+
+    pending = b''
+    while True:
+        data = await reader.read(chunk_bytes)
+        if not data:
+            break
+        data = pending + data
+        end = data.rfind(b'\n') + 1
+        pending = data[end:]
+        if end:
+            yield data[:end].decode('utf8').splitlines(keepends=True)
+    if pending:
+        yield [pending.decode('utf8')]
+
+
+def ingest_file(record_class, filename, workers=None, batch_size=500,
+                queue_size=8, registry=None, quarantine=None):
+    """
+    Function of loading file through the pipeline
+    :param record_class:
+    :param filename:
+    :param workers:
+    :param batch_size:
+    :param queue_size:
+    :param registry:
+    :param quarantine:
+    :return: pipeline after run, for its report
+    """
+
+    pipeline = Pipeline(record_class, workers, batch_size, queue_size,
+                        registry, quarantine)
+    asyncio.run(pipeline.run(read_file(filename)))
+    return pipeline
@@ -0,0 +1,126 @@
+import sys
+
+
+class InternPool:
+    """
+    Class representing a pool of values of one string field, equal values of
+    loaded records are replaced by one object of the pool
+    """
+
+    def __init__(self, name, size):
+        """
+        Sets all the necessary attributes for the class InternPool, values
+        are kept in two generations: when the new one is full it becomes the
+        old one, and values of the old one that are not used again before
+        the next change of generations are evicted
+        :param name: name of field
+        :param size: most values kept in the pool
+        """
+
+        self.name = name
+        self.size = size
+        self.new = {}
+        self.old = {}
+        self.get = self.new.get
+        self.misses = 0
+        self.evicted = 0
+
+    def intern(self, value):
+        """
+        Method of getting the pooled object equal to value, the lookup in the
+        new generation is done by get before calling it
+        :param value: string
+        :return: object of the pool equal to value
+        """
+
+        value = self.old.get(value, value)
+        self.new[value] = value
+        if len(self.new) >= self.size // 2:
+            self.evicted += len(self.old.keys() - self.new.keys())
+            self.old.clear()
+            self.old.update(self.new)
+            self.new.clear()
+        self.misses += 1
+        return value
+
+    def __len__(self):
+        return len(self.new.keys() | self.old.keys())
+
+    def saved(self, records):
+        """
+        Method of measuring memory saved by the pool in records
+        :param records: iterable of records
+        :return: pair of bytes of values of field in records and bytes they
+        would take if every record had its own copy
+        """
+
+        copies = 0
+        distinct = {}
+        for record in records:
+            value = getattr(record, self.name, None)
+            if value is not None:
+                copies += sys.getsizeof(value)
+                distinct[id(value)] = value
+        shared = sum(sys.getsizeof(value) for value in distinct.values())
+        return shared, copies
+
+    def report(self, records=()):
+        """
+        Method of getting counters of the pool
+        :param records: records whose memory is measured
+        :return: dict with numbers of pooled, missed and evicted values and
+        bytes saved in records
+        """
+
+        shared, copies = self.saved(records)
+        return {'values': len(self), 'misses': self.misses,
+                'evicted': self.evicted, 'bytes': shared,
+                'saved_bytes': copies - shared}
+
+    def clear(self):
+        """
+        Method of removing all values and counters, records keep their values
+        :return:
+        """
+
+        self.new.clear()
+        self.old.clear()
+        self.misses = self.evicted = 0
+
+
+class InternPools:
+    """
+    Class representing intern pools of all pooled fields
+    """
+
+    def __init__(self, **sizes):
+        """
+        Sets all the necessary attributes for the class InternPools
+        :param sizes: names of fields and sizes of their pools
+        """
+
+        self.pools = {name: InternPool(name, size)
+                      for name, size in sizes.items()}
+
+    def __getitem__(self, name):
+        return self.pools[name]
+
+    def report(self, *records):
+        """
+        Method of getting counters of all pools
+        :param records: lists of records whose memory is measured
+        :return: dict of field names and counters
+        """
+
+        records = [record for group in records for record in group]
+        return {name: pool.report(records)
+                for name, pool in self.pools.items()}
+
+    def clear(self):
+        """
+        Method of clearing all pools
+        :return:
+        """
+
+        for pool in self.pools.values():
+            pool.clear()
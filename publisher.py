@@ -0,0 +1,68 @@
+import threading
+from contextlib import contextmanager
+
+from main import Registry
+
+
+class Publisher:
+    """
+    Class representing a registry read by many threads and changed by one
+    writer: the writer changes a snapshot of its registry and publishes it
+    with one assignment, readers take the last published snapshot
+    without a lock; a snapshot never changes, it is freed when the last
+    reader drops it
+    """
+
+    def __init__(self, registry=None):
+        """
+        Sets all the necessary attributes for the class Publisher
+        :param registry: Registry of the writer, by default an empty one
+        """
+
+        self.registry = Registry() if registry is None else registry
+        self.lock = threading.Lock()
+        self.current = None
+        self.publish()
+
+    def read(self):
+        """
+        Method of getting the last published version, readers must not
+        change it
+        :return: registry with epoch of its publication
+        """
+
+        return self.current
+
+    def publish(self):
+        """
+        Method of publishing changes of the writer, its next change copies
+        the lists and indexes shared with the published snapshot
+        :return: published registry
+        """
+
+        registry = self.registry
+        # lookups of sorted indexes and free beds change them lazily, so
+        # the work is done before readers share them
+        registry.indexes.sort()
+        registry.wards.prune()
+        registry.epoch += 1
+        snapshot = registry.snapshot()
+        self.current = snapshot
+        return snapshot
+
+    @contextmanager
+    def write(self):
+        """
+        Method of changing the registry of the writer: the block changes a
+        snapshot of it, which replaces the registry of the writer and is
+        published when the block ends; if the block raises, its changes are
+        dropped and nothing is published; a second writer waits for the
+        first one, readers do not wait
+        :return: context manager giving the registry changed by the block
+        """
+
+        with self.lock:
+            registry = self.registry.snapshot()
+            yield registry
+            self.registry = registry
+            self.publish()
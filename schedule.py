@@ -0,0 +1,351 @@
+import heapq
+from collections import deque
+
+# specialty of doctors of every department
+SPECIALTIES = {
+    'терапевтическое': 'терапевт',
+    'кардиологическое': 'кардиолог',
+    'хирургическое': 'хирург',
+    'неврологическое': 'невролог',
+}
+
+# doctors of a higher category are preferred among equally loaded doctors
+CATEGORY_RANKS = {'высшая': 0, 'первая': 1, 'вторая': 2, None: 3}
+
+# penalty of a therapist taking a patient of another department, in patients
+# of load of one doctor
+BACKUP_PENALTY = 3
+
+
+def needs_diagnosis(patient):
+    """
+    Function of checking that diagnosis of patient is not established yet
+    :param patient:
+    :return: True if clinic diagnosis is absent or not detected
+    """
+
+    return patient.clinic_diagnosis in (None, 'Не выявлено')
+
+
+class Schedule:
+    """
+    Class representing patients assigned to staff
+    """
+
+    def __init__(self):
+        """
+        Sets all the necessary attributes for the class Schedule
+        """
+
+        self.staff = {}
+        self.patients = {}
+        self.penalties = 0
+        self.unassigned = []
+
+    def assign(self, patient, member, penalty=0):
+        """
+        Method of assigning patient to member of staff
+        :param patient:
+        :param member:
+        :param penalty: penalty of assignment
+        :return:
+        """
+
+        self.staff[patient] = member
+        self.patients.setdefault(member, []).append(patient)
+        self.penalties += penalty
+
+    def loads(self):
+        """
+        Method of getting numbers of patients of staff
+        :return: dict of members of staff and numbers of their patients
+        """
+
+        return {member: len(patients)
+                for member, patients in self.patients.items()}
+
+    def cost(self):
+        """
+        Method of getting cost of schedule: penalties plus 1 for the first
+        patient of a member of staff, 2 for the second and so on, so that
+        balanced schedules cost less
+        :return: cost
+        """
+
+        return self.penalties + sum(load * (load + 1) // 2
+                                    for load in self.loads().values())
+
+
+class Scheduler:
+    """
+    Class representing assignment of patients to qualified staff with
+    balanced load; staff and patients are grouped into types with equal
+    qualification, so the work depends on numbers of types, not of people
+    """
+
+    def __init__(self, staff, staff_type, penalty, capacity=None):
+        """
+        Sets all the necessary attributes for the class Scheduler
+        :param staff: list of doctors or nurses
+        :param staff_type: function giving type of member of staff, a tuple
+        with category rank last, or None if member takes no patients
+        :param penalty: function of patient group and staff type giving
+        penalty of assignment or None if staff of type is not qualified
+        :param capacity: most patients of one member of staff
+        """
+
+        self.penalty = penalty
+        self.capacity = capacity
+        self.types = {}
+        for member in staff:
+            kind = staff_type(member)
+            if kind is not None:
+                self.types.setdefault(kind, []).append(member)
+
+    @staticmethod
+    def for_doctors(doctors, capacity=None, covers=None):
+        """
+        Method of making scheduler of doctors: patients with established
+        diagnosis need a doctor treating patients, others need a doctor
+        diagnosing them, the doctor should have specialty of department
+        :param doctors:
+        :param capacity:
+        :param covers: dict of departments and dicts of specialties and
+        penalties, by default own specialty without penalty and therapists
+        with BACKUP_PENALTY
+        :return: scheduler
+        """
+
+        if covers is None:
+            covers = {department: {specialty: 0, 'терапевт': BACKUP_PENALTY}
+                      for department, specialty in SPECIALTIES.items()}
+            covers['терапевтическое'] = {'терапевт': 0}
+
+        def doctor_type(doctor):
+            return (doctor.specialty, bool(doctor.diagnosis_patients),
+                    bool(doctor.treatment_patients),
+                    CATEGORY_RANKS.get(doctor.category, 3))
+
+        def penalty(group, kind):
+            department, diagnosis = group
+            specialty, diagnoses, treats = kind[:3]
+            if not (diagnoses if diagnosis else treats):
+                return None
+            return covers.get(department, {}).get(specialty)
+
+        return Scheduler(doctors, doctor_type, penalty, capacity)
+
+    @staticmethod
+    def for_nurses(nurses, capacity=None):
+        """
+        Method of making scheduler of nurses: every patient needs a nurse
+        caring for patients, patients with established diagnosis need a
+        nurse doing medical procedures too
+        :param nurses:
+        :param capacity:
+        :return: scheduler
+        """
+
+        def nurse_type(nurse):
+            if not nurse.patient_care:
+                return None
+            return bool(nurse.medical_procedures), 0
+
+        def penalty(group, kind):
+            department, diagnosis = group
+            return 0 if diagnosis or kind[0] else None
+
+        return Scheduler(nurses, nurse_type, penalty, capacity)
+
+    def assign(self, patients, exact=False):
+        """
+        Method of assigning patients to staff
+        :param patients: list of hospital patients
+        :param exact: if True, the schedule of least cost is found as a
+        minimum cost flow, otherwise patients are assigned one by one to the
+        least loaded qualified member of staff
+        :return: schedule
+        """
+
+        groups = {}
+        for patient in patients:
+            groups.setdefault((patient.medical_department,
+                               needs_diagnosis(patient)), []).append(patient)
+        penalties = {group: {kind: self.penalty(group, kind)
+                             for kind in self.types
+                             if self.penalty(group, kind) is not None}
+                     for group in groups}
+        if exact:
+            return self._assign_flow(groups, penalties)
+        return self._assign_greedy(patients, penalties)
+
+    def _assign_greedy(self, patients, penalties):
+        """
+        Method of assigning patients in order to the qualified member of
+        staff with the least load plus penalty
+        :param patients:
+        :param penalties: dict of patient groups and dicts of qualified
+        staff types and penalties
+        :return: schedule
+        """
+
+        schedule = Schedule()
+        heaps = {kind: [(0, i, member) for i, member in enumerate(members)]
+                 for kind, members in self.types.items()}
+        for patient in patients:
+            group = (patient.medical_department, needs_diagnosis(patient))
+            best = None
+            for kind, penalty in penalties[group].items():
+                heap = heaps[kind]
+                if heap and (best is None or (penalty + heap[0][0], kind[-1])
+                             < best[0]):
+                    best = (penalty + heap[0][0], kind[-1]), kind, penalty
+            if best is None:
+                schedule.unassigned.append(patient)
+                continue
+
+            best, kind, penalty = best
+            heap = heaps[kind]
+            load, i, member = heap[0]
+            schedule.assign(patient, member, penalty)
+            if self.capacity is not None and load + 1 >= self.capacity:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (load + 1, i, member))
+        return schedule
+
+    def _assign_flow(self, groups, penalties):
+        """
+        Method of finding schedule of least cost by successive shortest
+        paths in network of patient groups and staff types; a type of m
+        members with load L spreads it evenly, so its next patient costs
+        L // m + 1, units are pushed in bulk while costs stay the same
+        :param groups: dict of patient groups and their patients
+        :param penalties:
+        :return: schedule
+        """
+
+        kinds = list(self.types)
+        names = list(groups)
+        sizes = [len(self.types[kind]) for kind in kinds]
+        limits = [None if self.capacity is None else size * self.capacity
+                  for size in sizes]
+        # category ranks only break ties of costs
+        scale = 3 * sum(len(patients) for patients in groups.values()) + 1
+        costs = [[None if kind not in penalties[name]
+                  else penalties[name][kind] * scale for kind in kinds]
+                 for name in names]
+        left = [len(groups[name]) for name in names]
+        flow = [[0] * len(kinds) for _ in names]
+        loads = [0] * len(kinds)
+
+        while True:
+            ends = [None if limits[t] is not None and loads[t] >= limits[t]
+                    else (loads[t] // sizes[t] + 1) * scale + kinds[t][-1]
+                    for t in range(len(kinds))]
+            path = Scheduler._shortest_path(costs, left, flow, ends)
+            if path is None:
+                break
+            g, steps, t = path
+            amount = min(left[g], sizes[t] - loads[t] % sizes[t])
+            if limits[t] is not None:
+                amount = min(amount, limits[t] - loads[t])
+            for back_t, back_g in steps:
+                amount = min(amount, flow[back_g][back_t])
+
+            left[g] -= amount
+            loads[t] += amount
+            for back_t, back_g in steps:
+                flow[g][back_t] += amount
+                flow[back_g][back_t] -= amount
+                g = back_g
+            flow[g][t] += amount
+
+        return self._spread(groups, names, kinds, flow, penalties)
+
+    @staticmethod
+    def _shortest_path(costs, left, flow, ends):
+        """
+        Method of finding the cheapest path in the residual network from a
+        group with unassigned patients to a type with free places; a path
+        may move patients of other groups between types
+        :param costs: costs[g][t] of assigning patient of group g to type
+        t, None if not qualified
+        :param left: numbers of unassigned patients of groups
+        :param flow: flow[g][t] numbers of patients of group g given to t
+        :param ends: costs of the next patient of types, None if full
+        :return: tuple of first group, list of pairs of type and group the
+        path moves a patient between and last type, or None
+        """
+
+        groups, kinds = len(costs), len(ends)
+        inf = float('inf')
+        group_cost = [0 if left[g] else inf for g in range(groups)]
+        kind_cost = [inf] * kinds
+        group_from = [None] * groups
+        kind_from = [None] * kinds
+
+        # Bellman-Ford with a queue, nodes below groups are groups
+        queue = deque(g for g in range(groups) if left[g])
+        queued = [bool(left[g]) for g in range(groups)] + [False] * kinds
+        while queue:
+            node = queue.popleft()
+            queued[node] = False
+            if node < groups:
+                for t, cost in enumerate(costs[node]):
+                    if cost is not None and \
+                            group_cost[node] + cost < kind_cost[t]:
+                        kind_cost[t] = group_cost[node] + cost
+                        kind_from[t] = node
+                        if not queued[groups + t]:
+                            queued[groups + t] = True
+                            queue.append(groups + t)
+            else:
+                t = node - groups
+                for g in range(groups):
+                    if flow[g][t] and kind_cost[t] - costs[g][t] \
+                            < group_cost[g]:
+                        group_cost[g] = kind_cost[t] - costs[g][t]
+                        group_from[g] = t
+                        if not queued[g]:
+                            queued[g] = True
+                            queue.append(g)
+
+        best = None
+        for t in range(kinds):
+            if ends[t] is not None and kind_cost[t] < inf and (
+                    best is None or kind_cost[t] + ends[t] < best[0]):
+                best = kind_cost[t] + ends[t], t
+        if best is None:
+            return None
+
+        t = best[1]
+        steps = []
+        g = kind_from[t]
+        while group_from[g] is not None:
+            steps.append((group_from[g], g))
+            g = kind_from[group_from[g]]
+        steps.reverse()
+        return g, steps, t
+
+    def _spread(self, groups, names, kinds, flow, penalties):
+        """
+        Method of giving patients of every group to the least loaded members
+        of types as the flow says
+        :return: schedule
+        """
+
+        schedule = Schedule()
+        heaps = {kind: [(0, i, member) for i, member in enumerate(members)]
+                 for kind, members in self.types.items()}
+        for g, name in enumerate(names):
+            patients = iter(groups[name])
+            for t, kind in enumerate(kinds):
+                heap = heaps[kind]
+                for _ in range(flow[g][t]):
+                    load, i, member = heap[0]
+                    heapq.heapreplace(heap, (load + 1, i, member))
+                    schedule.assign(next(patients), member,
+                                    penalties[name][kind])
+            schedule.unassigned.extend(patients)
+        return schedule
@@ -0,0 +1,380 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from heapq import merge
+from operator import attrgetter
+from urllib.parse import quote
+
+import columnar
+from main import Registry, RECORDS, HospitalPatient, AmbulatoryPatient
+
+# fields records of a class are placed into shards by, records of other
+# classes and records without a value of the field are placed into the
+# shard None
+KEYS = {HospitalPatient: 'medical_department',
+        AmbulatoryPatient: 'territorial_number'}
+
+MAGIC = 'registry-shards'
+VERSION = 1
+MANIFEST = 'shards.json'
+
+
+def shard_path(directory, name, record_class):
+    """
+    Function of getting name of file of records of record_class of shard
+    :param directory: directory of saved shards
+    :param name: name of shard
+    :param record_class:
+    :return: name of .npz file
+    """
+
+    name = quote(json.dumps(name, ensure_ascii=False), safe='')
+    return os.path.join(directory, f'{name}.{record_class.__name__}.npz')
+
+
+def read_manifest(directory):
+    """
+    Function of reading description of shards saved to directory
+    :param directory:
+    :return: dict with current_id, placement and names of shards
+    """
+
+    with open(os.path.join(directory, MANIFEST), 'r',
+              encoding='utf8') as f_manifest:
+        manifest = json.load(f_manifest)
+    if manifest.get('format') != MAGIC or manifest.get('version') != VERSION:
+        raise ValueError(f'{directory} has no shards of version {VERSION}')
+    return manifest
+
+
+def open_shard(directory, name):
+    """
+    Function of loading one shard saved by Shards.save without the others,
+    e.g. in a worker process
+    :param directory: directory of saved shards
+    :param name: name of shard
+    :return: Registry of records of shard, they keep their ids
+    """
+
+    manifest = read_manifest(directory)
+    if name not in manifest['shards']:
+        raise ValueError(f'{directory} has no shard {name!r}')
+    registry = Registry(manifest['current_id'])
+    for record_class, records in RECORDS.items():
+        path = shard_path(directory, name, record_class)
+        if os.path.exists(path):
+            with columnar.ColumnFile(path, record_class) as columns:
+                registry._insert(columns.records(record_class), records)
+    return registry
+
+
+def sizes(registry):
+    """
+    Function of counting records of registry, e.g. of every shard by
+    map_shards
+    :param registry:
+    :return: dict of name of list of loaded records and its length
+    """
+
+    return {records: len(getattr(registry, records))
+            for records in RECORDS.values()}
+
+
+def _apply(directory, name, function):
+    return function(open_shard(directory, name))
+
+
+def map_shards(directory, function, names=None, workers=None):
+    """
+    Function of calling function with every shard saved to directory, each
+    shard is loaded and queried in a worker process
+    :param directory: directory of saved shards
+    :param function: module level function of Registry, its result must be
+    picklable, e.g. counts or ids rather than records
+    :param names: names of queried shards, by default all saved shards
+    :param workers: number of processes, by default number of CPUs
+    :return: dict of name of shard and result of function
+    """
+
+    names = read_manifest(directory)['shards'] if names is None else names
+    with ProcessPoolExecutor(workers) as executor:
+        results = executor.map(_apply, [directory] * len(names), names,
+                               [function] * len(names))
+        return dict(zip(names, results))
+
+
+class Shards:
+    """
+    Class representing records partitioned into registries by values of
+    key fields, hospital patients by department and ambulatory patients by
+    territorial number; a shard is loaded, queried and saved on its own,
+    queries of all shards are sent to each of them and their results merged
+    """
+
+    def __init__(self, placement=None, first_id=1, keys=KEYS):
+        """
+        Sets all the necessary attributes for the class Shards
+        :param placement: dict of value of key field and name of its shard,
+        e.g. territorial numbers of a region and the region, other values are
+        names of their own shards
+        :param first_id: id of the first loaded record
+        :param keys: dict of record class and its key field
+        """
+
+        self.placement = {} if placement is None else placement
+        self.keys = keys
+        self.shards = {}
+        self.current_id = first_id
+
+    def place(self, value):
+        """
+        Method of getting name of shard of value of key field
+        :param value:
+        :return: name of shard
+        """
+
+        return self.placement.get(value, value)
+
+    def shard_of(self, record):
+        """
+        Method of getting name of shard of record
+        :param record:
+        :return: name of shard
+        """
+
+        field = self.keys.get(type(record))
+        return self.place(None if field is None
+                          else getattr(record, field, None))
+
+    def shard(self, name):
+        """
+        Method of getting registry of shard, an empty one is made for a new
+        name
+        :param name:
+        :return: Registry
+        """
+
+        registry = self.shards.get(name)
+        if registry is None:
+            registry = self.shards[name] = Registry(self.current_id)
+        return registry
+
+    def load(self, record_class, filename, names=None, workers=None,
+             quarantine=None):
+        """
+        Method of loading records of record_class from file into their
+        shards; records get the same ids whichever shards are loaded, so
+        shards loaded apart from one file do not share ids
+        :param record_class:
+        :param filename:
+        :param names: if given, only records of these shards are kept
+        :param workers: if given, the file is parsed by that many processes
+        :param quarantine: if given, Quarantine of rejected rows
+        :return: number of kept records
+        """
+
+        if names is not None:
+            names = set(names)
+            for name in names:
+                self.shard(name)
+        reader = Registry(self.current_id)
+        records = RECORDS[record_class]
+        kept = 0
+        for record in reader.iter_records(record_class, filename,
+                                          workers=workers,
+                                          quarantine=quarantine):
+            name = self.shard_of(record)
+            if names is None or name in names:
+                self.shard(name)._add(record, records)
+                kept += 1
+        self.current_id = reader.current_id
+        for registry in self.shards.values():
+            registry.current_id = self.current_id
+        return kept
+
+    def load_hospital_patients(self, filename, names=None, workers=None,
+                               quarantine=None):
+        """
+        Method of loading data about hospital patients into shards of their
+        departments
+        :param filename:
+        :param names: if given, only records of these shards are kept
+        :param workers:
+        :param quarantine:
+        :return: number of kept records
+        """
+
+        return self.load(HospitalPatient, filename, names, workers,
+                         quarantine)
+
+    def load_ambulatory_patients(self, filename, names=None, workers=None,
+                                 quarantine=None):
+        """
+        Method of loading data about ambulatory patients into shards of
+        their territorial numbers
+        :param filename:
+        :param names: if given, only records of these shards are kept
+        :param workers:
+        :param quarantine:
+        :return: number of kept records
+        """
+
+        return self.load(AmbulatoryPatient, filename, names, workers,
+                         quarantine)
+
+    def admit_hospital_patient(self, patient):
+        """
+        Method of adding new hospital patient to the shard of its department
+        :param patient:
+        :return: room number
+        """
+
+        return self.shard(self.shard_of(patient)).admit_hospital_patient(
+            patient)
+
+    def discharge_hospital_patient(self, patient):
+        """
+        Method of freeing bed of hospital patient in the shard of its
+        department
+        :param patient:
+        :return: copy of patient without a room
+        """
+
+        shard = self.shards[self.shard_of(patient)]
+        return shard.discharge_hospital_patient(patient)
+
+    def query(self, function, names=None):
+        """
+        Method of calling function with registry of every shard
+        :param function: function of Registry
+        :param names: names of queried shards, by default all shards
+        :return: dict of name of shard and result of function
+        """
+
+        names = list(self.shards) if names is None else names
+        return {name: function(self.shards[name]) for name in names
+                if name in self.shards}
+
+    def records(self, records):
+        """
+        Method of getting records of all shards
+        :param records: name of one of the lists of loaded records
+        :return: list of records ordered by id
+        """
+
+        return sorted((record for registry in self.shards.values()
+                       for record in getattr(registry, records)),
+                      key=attrgetter('id'))
+
+    def find(self, name, value):
+        """
+        Method of finding records of all shards with the value of field name
+        :param name: name of index
+        :param value:
+        :return: list of records ordered by id
+        """
+
+        return sorted((record for registry in self.shards.values()
+                       for record in registry.indexes.find(name, value)),
+                      key=attrgetter('id'))
+
+    def get(self, name, value):
+        """
+        Method of finding the record with the least id of all shards with the
+        value of field name
+        :param name: name of index
+        :param value:
+        :return: record or None
+        """
+
+        found = [registry.indexes.get(name, value)
+                 for registry in self.shards.values()]
+        return min((record for record in found if record is not None),
+                   key=attrgetter('id'), default=None)
+
+    def range(self, name, low=None, high=None):
+        """
+        Method of finding records of all shards with value of field name
+        between low and high, ordered lists of shards are merged
+        :param name: name of sorted index
+        :param low:
+        :param high:
+        :return: list of records ordered by value of field
+        """
+
+        if not self.shards:
+            return []
+        key = next(iter(self.shards.values())).indexes[name].key
+        return list(merge(*(registry.indexes.range(name, low, high)
+                            for registry in self.shards.values()),
+                          key=lambda record: key(getattr(record, name))))
+
+    def search(self, name, query, k=10):
+        """
+        Method of finding records of all shards with value of field name
+        most similar to query, the best k of every shard are merged
+        :param name: name of name index
+        :param query:
+        :param k: most records found
+        :return: list of pairs of similarity and record, the most similar
+        first
+        """
+
+        found = [pair for registry in self.shards.values()
+                 for pair in registry.indexes.search(name, query, k)]
+        found.sort(key=lambda pair: (-pair[0], pair[1].id))
+        return found[:k]
+
+    def save(self, directory, names=None):
+        """
+        Method of saving shards to directory, every shard to its own column
+        files, shards saved before and not given stay
+        :param directory:
+        :param names: names of saved shards, by default all shards
+        :return: number of saved records
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        names = list(self.shards) if names is None else list(names)
+        try:
+            manifest = read_manifest(directory)
+        except OSError:
+            manifest = {'format': MAGIC, 'version': VERSION,
+                        'current_id': self.current_id, 'shards': []}
+
+        saved = 0
+        for name in names:
+            registry = self.shards[name]
+            for record_class, records in RECORDS.items():
+                path = shard_path(directory, name, record_class)
+                records = getattr(registry, records)
+                if records:
+                    saved += columnar.write(path, record_class, records)
+                elif os.path.exists(path):
+                    os.remove(path)
+            if name not in manifest['shards']:
+                manifest['shards'].append(name)
+
+        manifest['current_id'] = max(manifest['current_id'], self.current_id)
+        manifest['placement'] = list(self.placement.items())
+        path = os.path.join(directory, MANIFEST)
+        with open(path + '.tmp', 'w', encoding='utf8') as f_manifest:
+            json.dump(manifest, f_manifest, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+        return saved
+
+
+def load(directory, names=None):
+    """
+    Function of loading shards saved by Shards.save
+    :param directory:
+    :param names: names of loaded shards, by default all saved shards
+    :return: Shards
+    """
+
+    manifest = read_manifest(directory)
+    shards = Shards(dict(map(tuple, manifest['placement'])),
+                    manifest['current_id'])
+    for name in manifest['shards'] if names is None else names:
+        shards.shards[name] = open_shard(directory, name)
+    return shards
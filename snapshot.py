@@ -0,0 +1,199 @@
+import marshal
+import mmap
+import os
+import struct
+from array import array
+
+from main import Load, RECORDS
+
+MAGIC = b'REGSNAP\0'
+VERSION = 1
+
+# magic, version, source size, source mtime, number of records,
+# offset of the offsets table, length of record class name
+HEADER = struct.Struct('<8sIQqQQH')
+
+
+class Snapshot:
+    """
+    Class representing records of one class saved in a binary file that is
+    memory-mapped, records are created only when they are accessed
+    """
+
+    def __init__(self, path, record_class, first_id=None):
+        """
+        Sets all the necessary attributes for the class Snapshot
+        :param path: name of snapshot file
+        :param record_class:
+        :param first_id: id of the first record, by default the id it had
+        when the snapshot was written
+        """
+
+        self.path = path
+        self.record_class = record_class
+        self.data = self.offsets = None
+        with open(path, 'rb') as f_snapshot:
+            self.map = mmap.mmap(f_snapshot.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+        try:
+            self._open(first_id)
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self, first_id):
+        """
+        Method of checking header of the mapped file and reading its table
+        of offsets
+        :param first_id:
+        :return:
+        """
+
+        path, size = self.path, len(self.map)
+        if size < HEADER.size:
+            raise ValueError(f'{path} is truncated')
+        (magic, version, self.source_size, self.source_mtime, self.count,
+         offsets, name_length) = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a snapshot of version {VERSION}')
+        name = bytes(self.map[HEADER.size:HEADER.size + name_length])
+        if name != self.record_class.__name__.encode('utf8'):
+            raise ValueError(f'{path} is not a snapshot of '
+                             f'{self.record_class.__name__}')
+        if offsets % 8 or offsets + 8 * (self.count + 1) > size:
+            raise ValueError(f'{path} is truncated')
+
+        self.data = memoryview(self.map)
+        self.offsets = self.data[offsets:offsets + 8 * (self.count + 1)
+                                 ].cast('Q')
+        if not (HEADER.size + name_length <= self.offsets[0]
+                <= self.offsets[self.count] <= offsets):
+            raise ValueError(f'{path} has a corrupt table of offsets')
+        self.records = [None] * self.count
+        if first_id is None and self.count:
+            first_id = marshal.loads(self.data[self.offsets[0]:
+                                               self.offsets[1]])[0]
+        self.first_id = first_id
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        """
+        Method of getting record number i, it is created on first access
+        :param i:
+        :return: record
+        """
+
+        if i < 0:
+            i += self.count
+        record = self.records[i]
+        if record is None:
+            state = marshal.loads(self.data[self.offsets[i]:
+                                            self.offsets[i + 1]])
+            record = self.record_class._schema.restore(
+                self.record_class, (self.first_id + i,) + state[1:])
+            self.records[i] = record
+        return record
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def is_valid(self, filename):
+        """
+        Method of checking that the snapshot was made from filename as it is
+        :param filename:
+        :return: True if size and modification time of filename did not
+        change since the snapshot was written
+        """
+
+        stat = os.stat(filename)
+        return (stat.st_size == self.source_size
+                and stat.st_mtime_ns == self.source_mtime)
+
+    def close(self):
+        """
+        Method of unmapping the snapshot file, records already created stay
+        :return:
+        """
+
+        if self.offsets is not None:
+            self.offsets.release()
+            self.data.release()
+        self.map.close()
+
+
+def write(path, record_class, records, filename):
+    """
+    Function of writing records to a snapshot file
+    :param path: name of snapshot file
+    :param record_class:
+    :param records: iterable of records of record_class
+    :param filename: name of source file of records
+    :return: number of written records
+    """
+
+    stat = os.stat(filename)
+    name = record_class.__name__.encode('utf8')
+    state = record_class._schema.state
+    offsets = array('Q')
+    start = HEADER.size + len(name)
+    start += -start % 8
+
+    with open(path + '.tmp', 'wb') as f_snapshot:
+        f_snapshot.write(bytes(start))
+        for record in records:
+            offsets.append(f_snapshot.tell())
+            f_snapshot.write(marshal.dumps(state(record)))
+        offsets.append(f_snapshot.tell())
+        f_snapshot.write(bytes(-f_snapshot.tell() % 8))
+        offsets_start = f_snapshot.tell()
+        f_snapshot.write(offsets.tobytes())
+
+        f_snapshot.seek(0)
+        f_snapshot.write(HEADER.pack(MAGIC, VERSION, stat.st_size,
+                                     stat.st_mtime_ns, len(offsets) - 1,
+                                     offsets_start, len(name)) + name)
+    os.replace(path + '.tmp', path)
+    return len(offsets) - 1
+
+
+def load(record_class, filename, path=None, registry=None, insert=False):
+    """
+    Function of loading records of file through its snapshot: a valid
+    snapshot is opened, otherwise the file is parsed and a new snapshot is
+    written; ids continue from current_id of the registry as in
+    Registry.iter_records. The snapshot is detached from the registry: ids
+    of its records are taken, but unless insert is True they are not added
+    to the lists, indexes and wards of the registry, so that they are only
+    created when accessed
+    :param record_class:
+    :param filename:
+    :param path: name of snapshot file, by default filename + '.snap'
+    :param registry: Registry giving ids, by default the default registry
+    :param insert: if True, all records are created and added to the
+    registry as by its load methods
+    :return: snapshot with records of file
+    """
+
+    registry = Load.registry if registry is None else registry
+    path = path or filename + '.snap'
+    try:
+        snapshot = Snapshot(path, record_class, registry.current_id)
+    except (OSError, ValueError):
+        snapshot = None
+
+    if snapshot is None or not snapshot.is_valid(filename):
+        if snapshot is not None:
+            snapshot.close()
+        first_id = registry.current_id
+        write(path, record_class,
+              registry.iter_records(record_class, filename), filename)
+        registry.current_id = first_id
+        snapshot = Snapshot(path, record_class, first_id)
+
+    registry.current_id += len(snapshot)
+    if insert:
+        registry._insert(snapshot, RECORDS[record_class])
+    return snapshot
@@ -0,0 +1,297 @@
+from bisect import bisect_right
+from datetime import date
+from operator import attrgetter
+
+from index import date_key
+
+# lower bounds of buckets of work experience in years
+EXPERIENCE = (0, 1, 3, 5, 10, 20, 30)
+
+
+def birth_date(birthday):
+    """
+    Function of making key of birthday in dd.mm.yyyy format, so that ages
+    are counted without parsing it again
+    :param birthday:
+    :return: date in yyyymmdd format or None
+    """
+
+    return None if birthday is None else date_key(birthday)
+
+
+def experience_bucket(years):
+    """
+    Function of getting bucket of work experience
+    :param years:
+    :return: lower bound of bucket of EXPERIENCE or None
+    """
+
+    if years is None:
+        return None
+    return EXPERIENCE[max(bisect_right(EXPERIENCE, years) - 1, 0)]
+
+
+def age(key, today=None):
+    """
+    Function of getting age of a person on a date
+    :param key: birthday in yyyymmdd format, see birth_date
+    :param today: date, by default today
+    :return: full years
+    """
+
+    today = date.today() if today is None else today
+    return (today.year - int(key[:4])
+            - (key[4:] > f'{today.month:02}{today.day:02}'))
+
+
+def age_bucket(width=10, today=None):
+    """
+    Function of making bucket function of birthdays for group_by
+    :param width: years in one bucket
+    :param today: date ages are counted on, by default today
+    :return: function of birthday in dd.mm.yyyy format giving lower bound of
+    its age group or None
+    """
+
+    today = date.today() if today is None else today
+
+    def bucket(birthday):
+        if birthday is None:
+            return None
+        return age(date_key(birthday), today) // width * width
+
+    return bucket
+
+
+# aggregates kept for records of every class having all their fields:
+# pairs of field and function putting its values into buckets, None keeps
+# values as they are
+AGGREGATES = {
+    'birthday': (('birthday', birth_date),),
+    'category_experience': (('category', None),
+                            ('work_experience', experience_bucket)),
+    'blood_group': (('blood_type', None), ('rhesus_affiliation', None)),
+    'disability': (('disability', None),),
+    'health_group': (('health_group', None),),
+}
+
+
+def _getter(fields):
+    """
+    Function of making function getting key of record
+    :param fields: pairs of field and bucket function or None
+    :return: function of record giving value of one field or tuple of values
+    """
+
+    get = attrgetter(*(field for field, bucket in fields))
+    buckets = [bucket for field, bucket in fields]
+    if len(fields) == 1:
+        bucket = buckets[0]
+        return get if bucket is None else lambda record: bucket(get(record))
+    if not any(buckets):
+        return get
+    return lambda record: tuple(
+        value if bucket is None else bucket(value)
+        for value, bucket in zip(get(record), buckets))
+
+
+def _attribute(record_class, field, suffix, namespace):
+    """
+    Function of getting expression reading field of record, fields of the
+    schema of record_class are read where they are stored instead of through
+    their properties
+    :param record_class:
+    :param field: name of property
+    :param suffix: suffix of names added to namespace
+    :param namespace: objects used by the expression
+    :return: expression source
+    """
+
+    schema = getattr(record_class, '_schema', None)
+    if schema is None or field not in schema.names:
+        return f'record.{field}'
+    name, check = schema.fields[schema.names.index(field)]
+    if not hasattr(check, 'shift'):
+        return f'record.{name}'
+    # a packed field, see main.Packed
+    namespace[f'values_{suffix}'] = check.values
+    return f'values_{suffix}[record._codes >> {check.shift} & {check.mask}]'
+
+
+def _record_class(record_class):
+    """
+    Function of getting class whose tables count records of record_class,
+    lazy records of main.Schema.compile_lazy are counted with the records
+    of their schema
+    :param record_class:
+    :return: nearest class of record_class defining _schema or record_class
+    """
+
+    return next((owner for owner in record_class.__mro__
+                 if '_schema' in vars(owner)), record_class)
+
+
+def group_by(records, *fields, **buckets):
+    """
+    Function of counting records by values of fields in one pass, e.g.
+    records of one list of a registry
+    :param records: iterable of records having all fields
+    :param fields: names of fields
+    :param buckets: names of fields and functions putting their values into
+    buckets, e.g. birthday=age_bucket()
+    :return: dict of value of field or tuple of values of fields and number
+    of records
+    """
+
+    key = _getter(tuple((field, buckets.get(field)) for field in fields))
+    counts = {}
+    for record in records:
+        value = key(record)
+        counts[value] = counts.get(value, 0) + 1
+    return counts
+
+
+class Statistics:
+    """
+    Class representing numbers of records by values of aggregates, kept for
+    every record class and changed with every added and removed record, so
+    that reports read them instead of scanning records; aggregates are of
+    fields that do not change after loading
+    """
+
+    def __init__(self, aggregates=AGGREGATES):
+        """
+        Sets all the necessary attributes for the class Statistics
+        :param aggregates: dict of name of aggregate and its pairs of field
+        and bucket function
+        """
+
+        self.aggregates = aggregates
+        self.tables = {}
+        self.plans = {}
+
+    def _compile(self, record_class):
+        """
+        Method of compiling functions counting records of record_class in
+        all their aggregates at once, they are made on the first record
+        :param record_class:
+        :return: pair of functions add(record) and remove(record)
+        """
+
+        functions = self.plans.get(record_class)
+        if functions is not None:
+            return functions
+
+        namespace = {}
+        add = ['def add(record):']
+        remove = ['def remove(record):']
+        for i, (name, fields) in enumerate(self.aggregates.items()):
+            if not all(hasattr(record_class, field)
+                       for field, bucket in fields):
+                continue
+            namespace[f'counts_{i}'] = self.tables.setdefault(
+                (_record_class(record_class).__name__, name), {})
+            values = []
+            for j, (field, bucket) in enumerate(fields):
+                value = _attribute(record_class, field, f'{i}_{j}',
+                                   namespace)
+                if bucket is not None:
+                    namespace[f'bucket_{i}_{j}'] = bucket
+                    value = f'bucket_{i}_{j}({value})'
+                values.append(value)
+            value = ', '.join(values) + (',' if len(values) > 1 else '')
+            add += [f'    value = {value}',
+                    f'    counts_{i}[value] = counts_{i}.get(value, 0) + 1']
+            remove += [f'    value = {value}',
+                       f'    count = counts_{i}.get(value, 0) - 1',
+                       f'    if count > 0:',
+                       f'        counts_{i}[value] = count',
+                       f'    else:',
+                       f'        counts_{i}.pop(value, None)']
+
+        exec('\n'.join(add + ['    pass']) + '\n'
+             + '\n'.join(remove + ['    pass']), namespace)
+        functions = self.plans[record_class] = (namespace['add'],
+                                                namespace['remove'])
+        return functions
+
+    def add(self, record):
+        """
+        Method of counting record in its aggregates
+        :param record:
+        :return:
+        """
+
+        self._compile(type(record))[0](record)
+
+    def remove(self, record):
+        """
+        Method of removing record from counts of its aggregates
+        :param record:
+        :return:
+        """
+
+        self._compile(type(record))[1](record)
+
+    def copy(self):
+        """
+        Method of copying counts
+        :return: statistics
+        """
+
+        statistics = Statistics(self.aggregates)
+        statistics.tables = {key: dict(counts)
+                             for key, counts in self.tables.items()}
+        return statistics
+
+    def counts(self, name, record_class=None):
+        """
+        Method of getting numbers of records by values of aggregate
+        :param name: name of aggregate
+        :param record_class: by default records of all classes are counted
+        :return: dict of value and number of records
+        """
+
+        if record_class is not None:
+            return dict(self.tables.get(
+                (_record_class(record_class).__name__, name), {}))
+        total = {}
+        for (class_name, table_name), counts in self.tables.items():
+            if table_name == name:
+                for value, count in counts.items():
+                    total[value] = total.get(value, 0) + count
+        return total
+
+    def count(self, name, value, record_class=None):
+        """
+        Method of getting number of records with value of aggregate
+        :param name: name of aggregate
+        :param value: value or tuple of values of its fields after buckets
+        :param record_class: by default records of all classes are counted
+        :return: number of records
+        """
+
+        if record_class is not None:
+            return self.tables.get(
+                (_record_class(record_class).__name__, name), {}).get(value, 0)
+        return sum(counts.get(value, 0) for (class_name, table_name), counts
+                   in self.tables.items() if table_name == name)
+
+    def ages(self, record_class=None, width=10, today=None):
+        """
+        Method of getting numbers of persons by age groups from counts of
+        birthdays, its time depends on the number of distinct birthdays only
+        :param record_class: by default persons of all classes are counted
+        :param width: years in one age group
+        :param today: date ages are counted on, by default today
+        :return: dict of lower bound of age group, None for absent birthday,
+        and number of persons ordered by age groups
+        """
+
+        today = date.today() if today is None else today
+        groups = {}
+        for key, count in self.counts('birthday', record_class).items():
+            group = None if key is None else age(key, today) // width * width
+            groups[group] = groups.get(group, 0) + count
+        return dict(sorted(groups.items(),
+                           key=lambda item: (item[0] is None, item[0] or 0)))
@@ -0,0 +1,274 @@
+import numpy as np
+
+
+class ColumnTable:
+    """
+    Class representing loaded records of one class stored by columns:
+    integer fields of the schema as NumPy arrays with a null mask, other
+    fields as NumPy arrays of codes into a string pool shared by the table
+    """
+
+    def __init__(self, record_class, records=()):
+        """
+        Sets all the necessary attributes for the class ColumnTable
+        :param record_class: class of records, its schema gives the columns
+        :param records: records of record_class
+        """
+
+        self.record_class = record_class
+        self.records = list(records)
+        self.names = list(record_class._schema.names)
+        self.pool = [None]
+        self.pool_index = {None: 0}
+        self.numbers = {}
+        self.nulls = {}
+        self.codes = {}
+
+        for name, (_, check) in zip(self.names,
+                                    record_class._schema.fields):
+            # the kind of column is the type of its check, see main.Check,
+            # checks of packed fields are kept by main.Packed
+            check = getattr(check, 'check', check)
+            values = [getattr(record, name) for record in self.records]
+            if check.type is int:
+                nulls = np.fromiter((value is None for value in values),
+                                    dtype=bool, count=len(values))
+                self.numbers[name] = np.fromiter(
+                    (0 if value is None else value for value in values),
+                    dtype=np.int64, count=len(values))
+                self.nulls[name] = nulls
+            else:
+                self.codes[name] = np.fromiter(
+                    (self.intern(value) for value in values),
+                    dtype=np.int32, count=len(values))
+
+    @staticmethod
+    def from_records(records):
+        """
+        Method of making table from a non-empty list of records of one class
+        :param records:
+        :return: table
+        """
+
+        return ColumnTable(type(records[0]), records)
+
+    def intern(self, value):
+        """
+        Method of getting code of value in the string pool
+        :param value:
+        :return: code of value
+        """
+
+        code = self.pool_index.get(value)
+        if code is None:
+            code = self.pool_index[value] = len(self.pool)
+            self.pool.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, name):
+        """
+        Method of getting values of column
+        :param name:
+        :return: list of values with None for absent values
+        """
+
+        if name in self.codes:
+            return [self.pool[code] for code in self.codes[name].tolist()]
+        return [None if null else value for value, null in
+                zip(self.numbers[name].tolist(), self.nulls[name].tolist())]
+
+    def all(self):
+        """
+        Method of getting mask selecting all rows
+        :return: boolean array
+        """
+
+        return np.ones(len(self), dtype=bool)
+
+    def eq(self, name, value):
+        """
+        Method of selecting rows where column name equals value
+        :param name:
+        :param value:
+        :return: boolean array
+        """
+
+        if name in self.codes:
+            code = self.pool_index.get(value)
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            return self.codes[name] == code
+        if value is None:
+            return self.nulls[name].copy()
+        if not isinstance(value, int):
+            return np.zeros(len(self), dtype=bool)
+        return (self.numbers[name] == value) & ~self.nulls[name]
+
+    def isin(self, name, values):
+        """
+        Method of selecting rows where column name is one of values
+        :param name:
+        :param values:
+        :return: boolean array
+        """
+
+        mask = np.zeros(len(self), dtype=bool)
+        for value in values:
+            mask |= self.eq(name, value)
+        return mask
+
+    def lt(self, name, value):
+        """
+        Method of selecting rows where numeric column name is less than value
+        :param name:
+        :param value:
+        :return: boolean array
+        """
+
+        return (self.numbers[name] < value) & ~self.nulls[name]
+
+    def le(self, name, value):
+        """
+        Method of selecting rows where numeric column name is at most value
+        :param name:
+        :param value:
+        :return: boolean array
+        """
+
+        return (self.numbers[name] <= value) & ~self.nulls[name]
+
+    def gt(self, name, value):
+        """
+        Method of selecting rows where numeric column name is more than value
+        :param name:
+        :param value:
+        :return: boolean array
+        """
+
+        return (self.numbers[name] > value) & ~self.nulls[name]
+
+    def ge(self, name, value):
+        """
+        Method of selecting rows where numeric column name is at least value
+        :param name:
+        :param value:
+        :return: boolean array
+        """
+
+        return (self.numbers[name] >= value) & ~self.nulls[name]
+
+    def where(self, **values):
+        """
+        Method of selecting rows where every given column equals its value
+        :param values: column names and values
+        :return: boolean array
+        """
+
+        mask = self.all()
+        for name, value in values.items():
+            mask &= self.eq(name, value)
+        return mask
+
+    def count(self, mask=None):
+        """
+        Method of counting selected rows
+        :param mask:
+        :return: number of rows
+        """
+
+        return len(self) if mask is None else int(np.count_nonzero(mask))
+
+    def sum(self, name, mask=None):
+        """
+        Method of summing non-absent values of numeric column
+        :param name:
+        :param mask:
+        :return: sum
+        """
+
+        valid = ~self.nulls[name] if mask is None else mask & ~self.nulls[name]
+        return int(self.numbers[name][valid].sum())
+
+    def mean(self, name, mask=None):
+        """
+        Method of averaging non-absent values of numeric column
+        :param name:
+        :param mask:
+        :return: mean or None if there are no values
+        """
+
+        valid = ~self.nulls[name] if mask is None else mask & ~self.nulls[name]
+        if not valid.any():
+            return None
+        return float(self.numbers[name][valid].mean())
+
+    def group_keys(self, by, mask=None):
+        """
+        Method of getting group numbers of rows and values of groups
+        :param by: column name
+        :param mask:
+        :return: pair of array of group numbers of selected rows and list of
+        values of groups
+        """
+
+        if by in self.codes:
+            keys = self.codes[by] if mask is None else self.codes[by][mask]
+            return keys, self.pool
+
+        numbers = self.numbers[by]
+        nulls = self.nulls[by]
+        if mask is not None:
+            numbers, nulls = numbers[mask], nulls[mask]
+        values, keys = np.unique(numbers, return_inverse=True)
+        values = values.tolist() + [None]
+        return np.where(nulls, len(values) - 1, keys), values
+
+    def group_count(self, by, mask=None):
+        """
+        Method of counting selected rows by values of column by
+        :param by:
+        :param mask:
+        :return: dict of value and number of rows
+        """
+
+        keys, values = self.group_keys(by, mask)
+        counts = np.bincount(keys, minlength=len(values))
+        return {values[key]: int(counts[key]) for key in np.flatnonzero(counts)}
+
+    def group_mean(self, by, name, mask=None):
+        """
+        Method of averaging numeric column name by values of column by
+        :param by:
+        :param name:
+        :param mask:
+        :return: dict of value and mean of non-absent values
+        """
+
+        valid = ~self.nulls[name] if mask is None else mask & ~self.nulls[name]
+        keys, values = self.group_keys(by, valid)
+        counts = np.bincount(keys, minlength=len(values))
+        sums = np.bincount(keys, weights=self.numbers[name][valid],
+                           minlength=len(values))
+        return {values[key]: float(sums[key] / counts[key])
+                for key in np.flatnonzero(counts)}
+
+    def ids(self, mask=None):
+        """
+        Method of getting ids of selected rows
+        :param mask:
+        :return: array of ids
+        """
+
+        return self.numbers['id'] if mask is None else self.numbers['id'][mask]
+
+    def select(self, mask):
+        """
+        Method of getting selected records
+        :param mask:
+        :return: list of records
+        """
+
+        return [self.records[row] for row in np.flatnonzero(mask).tolist()]
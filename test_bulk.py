@@ -0,0 +1,69 @@
+import os
+import tempfile
+
+from bulk import BulkSchema
+from main import Load as Loader, HospitalPatient, AmbulatoryPatient, Nurse, \
+    Doctor, Quarantine
+
+for record_class, filename in ((HospitalPatient, 'hospital.txt'),
+                               (AmbulatoryPatient, 'ambulatory.txt'),
+                               (Nurse, 'nurses.txt'),
+                               (Doctor, 'doctors.txt')):
+    with open(filename, 'r', encoding='utf8') as f_records:
+        rows = [ptr.split(';')[:-1] for ptr in f_records]
+    records, valid, null = BulkSchema(record_class).records(rows, 1)
+    state = record_class._schema.state
+    assert [state(record) for record in records] == [
+        state(record_class(record_id, *row))
+        for record_id, row in enumerate(rows, 1)]
+    assert valid.all()
+    print(record_class.__name__, null.sum(axis=0).tolist())
+
+with open('nurses.txt', 'r', encoding='utf8') as f_nurses:
+    lines = f_nurses.readlines()
+rows = [ptr.split(';')[:-1] for ptr in lines]
+checks = BulkSchema(Nurse)
+names = list(checks.names)
+rows[0][names.index('work_experience')] = 'восемь'
+rows[1] = rows[1][:4]
+rows[2][names.index('birthday')] = '1.02.1990'
+rows[3][names.index('gender')] = 'м'
+# \d matches digits of every script, like the constructor
+rows[4][names.index('phone_number')] = '+٧(912)345-67-89'
+valid, null = checks.check(rows)
+print(valid.tolist())
+assert valid.tolist() == [False, False, True, True, True, True]
+assert null[2, names.index('birthday')] and null[3, names.index('gender')]
+assert not null[4, names.index('phone_number')]
+assert Nurse(1, *rows[4]).phone_number == '+٧(912)345-67-89'
+
+with tempfile.TemporaryDirectory() as directory:
+    filename = os.path.join(directory, 'nurses.txt')
+    with open(filename, 'w', encoding='utf8') as f_out:
+        f_out.writelines([lines[0].replace(';8;', ';восемь;')] + lines)
+
+    summaries = []
+    for bulk in (False, True):
+        with Quarantine(Nurse) as rejected:
+            nurses = list(Loader.iter_nurses(filename, quarantine=rejected,
+                                             bulk=bulk))
+        summaries.append(rejected.summary())
+    assert summaries[0] == summaries[1]
+
+    first_id = Loader.current_id
+    nurses = []
+    try:
+        for nurse in Loader.iter_nurses(filename, bulk=True):
+            nurses.append(nurse)
+    except ValueError as error:
+        print(error)
+    else:
+        raise AssertionError('rejected row was loaded')
+    assert nurses == [] and Loader.current_id == first_id
+
+    patients = list(Loader.iter_hospital_patients('hospital.txt', bulk=True))
+    Loader.current_id = first_id
+    state = HospitalPatient._schema.state
+    assert [state(patient) for patient in patients] == [
+        state(patient) for patient
+        in Loader.iter_hospital_patients('hospital.txt')]
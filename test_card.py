@@ -0,0 +1,65 @@
+import io
+from contextlib import redirect_stdout
+
+from main import Load as Loader, Registry
+
+# cards as print(record) wrote them before they were rendered in one pass
+DOCTOR = '''
+Номер: 2
+ФИО: Кузьмин Нинель Сергеевич
+Пол: муж.
+Дата рождения: 13.09.1993
+Место рождения: Новосибирская обл. Северный р-н с. Северное
+В браке: нет
+Паспорт: 5004 530344 11.12.2020
+Адрес регистрации: г. Новосибирск ул. Гоголя д. 10 кв. 173
+Уровень образования: высшее
+Телефон: +7(913)866-74-82
+Знание иностранного языка: нет
+Документ об образовании: 591123 7884470
+Квалификация: кардиолог
+Специализация: кардиолог
+Врачебные ошибки: нет'''
+
+PATIENT = '''
+Номер: 7
+ФИО: Рыбаков Семен Иосифович
+Пол: муж.
+Дата рождения: 31.10.1983
+Место рождения: Новосибирская обл. г. Новосибирск
+В браке: нет
+Паспорт: 5004 870836 11.01.2011
+Адрес регистрации: г. Новосибирск ул. Содружества д. 16 кв. 25
+Уровень образования: высшее
+Телефон: +7(923)894-87-88
+Медицинский полис: 5400006321957700
+Статус: рабочий
+Место работы (учебы): ОАО Инфо
+Группа крови: 3(+)
+Аллергические реакции: Пенициллины
+Участок: 4
+Группа инвалидности: 2
+Группа здоровья: III
+Хронический диагноз: Сердечная аритмия'''
+
+registry = Registry(first_id=1)
+registry.load_doctors('doctors.txt')
+registry.load_ambulatory_patients('ambulatory.txt')
+doctor, patient = registry.doctors[1], registry.ambulatory_patients[0]
+
+output = io.StringIO()
+with redirect_stdout(output):
+    cards = [str(doctor), str(patient)]
+# the card is returned, nothing is printed
+assert output.getvalue() == ''
+assert cards == [DOCTOR, PATIENT]
+
+with redirect_stdout(output):
+    print(doctor)
+    print(patient)
+assert output.getvalue() == DOCTOR + '\n' + PATIENT + '\n'
+
+sink = io.StringIO()
+records = registry.doctors + registry.ambulatory_patients
+Loader.render_all(records, sink, batch_size=4)
+assert sink.getvalue() == ''.join(str(record) + '\n' for record in records)
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+import columnar
+from main import Load as Loader, HospitalPatient, AmbulatoryPatient, Nurse, \
+    Doctor
+
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'records.npz')
+    for record_class, filename in ((HospitalPatient, 'hospital.txt'),
+                                   (AmbulatoryPatient, 'ambulatory.txt'),
+                                   (Nurse, 'nurses.txt'),
+                                   (Doctor, 'doctors.txt')):
+        records = list(Loader.iter_records(record_class, filename))
+        assert columnar.write(path, record_class, iter(records),
+                              chunk_size=4) == len(records)
+        state = record_class._schema.state
+        with columnar.ColumnFile(path, record_class) as columns:
+            print(record_class.__name__, len(columns), columns.sizes)
+            copies = list(columns.records(record_class))
+            assert [state(record) for record in copies] == [
+                state(record) for record in records]
+            assert [str(record) for record in copies] == [
+                str(record) for record in records]
+            assert columns.column('full_name') == [
+                record.full_name for record in records]
+
+    patients = list(Loader.iter_hospital_patients('hospital.txt'))
+    columnar.write(path, HospitalPatient, patients,
+                   columns=['id', 'room_number', 'married'], compress=True)
+    with columnar.ColumnFile(path) as columns:
+        chunk = next(columns.chunks(['room_number', 'married']))
+        print(chunk)
+        assert chunk['room_number'] == [patient.room_number
+                                        for patient in patients]
+        assert chunk['married'] == [patient.married for patient in patients]
+        try:
+            next(columns.records(HospitalPatient))
+        except ValueError as error:
+            print(error)
+        else:
+            raise AssertionError('records were read without all columns')
+
+    # ids may continue from the loader like Load.iter_records
+    columnar.write(path, Nurse, Loader.iter_nurses('nurses.txt'))
+    with columnar.ColumnFile(path, Nurse) as columns:
+        nurses = list(columns.records(Nurse, first_id=1000))
+    assert [nurse.id for nurse in nurses] == list(range(1000, 1006))
+
+    try:
+        columnar.ColumnFile(path, Doctor)
+    except ValueError as error:
+        print(error)
+    else:
+        raise AssertionError('nurses were read as doctors')
+
+    # codes of categories are numbers of the values stored in the file, not
+    # of the values of the field when it is read
+    patients = list(Loader.iter_hospital_patients('hospital.txt'))
+    columnar.write(path, HospitalPatient, patients, chunk_size=8)
+    with columnar.ColumnFile(path, HospitalPatient) as columns:
+        arrays = dict(columns.arrays)
+        meta = {'format': columnar.MAGIC, 'version': columnar.VERSION,
+                'record_class': columns.class_name,
+                'columns': list(columns.columns.values()),
+                'chunks': columns.sizes}
+    for column in meta['columns']:
+        if column['kind'] == 'category':
+            values = column['values']
+            column['values'] = values[::-1]
+            for chunk in range(len(meta['chunks'])):
+                key = f'{chunk}/{column["name"]}'
+                arrays[key] = np.where(arrays[key] == 0, 0,
+                                       len(values) + 1 - arrays[key]) \
+                    .astype(np.uint8)
+    arrays['meta'] = np.array(json.dumps(meta, ensure_ascii=False))
+    np.savez(path, **arrays)
+    with columnar.ColumnFile(path, HospitalPatient) as columns:
+        assert [str(patient) for patient in
+                columns.records(HospitalPatient)] == [
+            str(patient) for patient in patients]
+
+    meta['columns'][2]['values'].append('?')
+    arrays['meta'] = np.array(json.dumps(meta, ensure_ascii=False))
+    np.savez(path, **arrays)
+    with columnar.ColumnFile(path, HospitalPatient) as columns:
+        try:
+            list(columns.records(HospitalPatient))
+        except ValueError as error:
+            print(error)
+        else:
+            raise AssertionError('an unknown value of a category was read')
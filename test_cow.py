@@ -0,0 +1,100 @@
+from cow import Chunks, Buckets, Column
+from main import HospitalPatient
+from publisher import Publisher
+
+# copies share chunks, a changed chunk is copied first
+items = Chunks(range(10), size=4)
+assert items == list(range(10)) and len(items) == 10
+copy = items.copy()
+copy[1] = 'a'
+copy.append(10)
+items[9] = 'b'
+assert items == [0, 1, 2, 3, 4, 5, 6, 7, 8, 'b']
+assert copy == [0, 'a', 2, 3, 4, 5, 6, 7, 8, 9, 10]
+assert copy.chunks[1] is items.chunks[1]
+assert items[-1] == 'b' and items[3:9] == [3, 4, 5, 6, 7, 8]
+assert copy[::3] == [0, 3, 6, 9] and items[5:2] == []
+try:
+    items[10]
+except IndexError:
+    pass
+else:
+    raise AssertionError('index 10 of 10 items was read')
+
+values = Buckets(bits=2)
+for key in range(20):
+    values[key] = key * key
+copy = values.copy()
+del copy[3]
+copy[20] = 400
+values[5] = -1
+assert 3 in values and 3 not in copy and 20 not in values
+assert values[5] == -1 and copy[5] == 25 and len(copy) == 20
+assert sorted(copy.items()) == [(key, key * key) for key in range(21)
+                                if key != 3]
+assert values.pop(3) == 9 and values.pop(3) is None and len(values) == 19
+
+# lists in buckets are copied with them
+lists = Buckets(bits=1, copy=lambda bucket: {key: list(value) for key, value
+                                             in bucket.items()})
+lists['a'] = [1]
+copy = lists.copy()
+copy.bucket('a')['a'].append(2)
+assert lists['a'] == [1] and copy['a'] == [1, 2]
+
+# appends to a shared column are written past the end of the other one
+column = Column('int32', fill=-1)
+for value in range(20):
+    column.append(value)
+assert list(column.view(5)) == [0, 1, 2, 3, 4] and len(column) == 20
+shared = column.share()
+column.append(20)
+shared.append(-20)
+assert list(column.view()) == list(range(21))
+assert list(shared.view()) == list(range(20)) + [-20]
+assert column.data is not shared.data
+assert list(column.copy(3).view()) == [0, 1, 2]
+
+# published versions are not changed by later writes
+with open('hospital.txt', 'r', encoding='utf8') as f_patients:
+    row = f_patients.readline().split(';')[:-1]
+row[16] = ''
+
+
+def state(registry):
+    indexes = registry.indexes
+    return ([patient.id for patient in registry.hospital_patients],
+            list(registry.patient_names),
+            [patient.id for patient in indexes.range('room_number')],
+            [patient.id for patient in indexes.range('birthday')],
+            [indexes.get('id', patient.id) is patient
+             for patient in registry.hospital_patients],
+            [[found.id for _, found in
+              indexes.search('full_name', patient.full_name, 3)]
+             for patient in registry.hospital_patients[:5]],
+            sorted(registry.wards.departments().items()))
+
+
+publisher = Publisher()
+versions = []
+for step in range(12):
+    with publisher.write() as registry:
+        if step % 4 == 0:
+            registry.load_hospital_patients('hospital.txt')
+        elif step % 4 == 1:
+            patient = HospitalPatient(registry.current_id, *row)
+            registry.current_id += 1
+            try:
+                registry.admit_hospital_patient(patient)
+            except ValueError as error:
+                print(error)
+        elif step % 4 == 2:
+            registry.discharge_hospital_patient(next(
+                patient for patient in registry.hospital_patients
+                if patient.room_number is not None))
+        else:
+            registry.reload_hospital_patients('hospital.txt')
+    versions.append((publisher.read(), state(publisher.read())))
+for registry, expected in versions:
+    assert state(registry) == expected
+print(len(versions), 'versions kept')
@@ -0,0 +1,43 @@
+from main import Load as Loader, HospitalPatient, AmbulatoryPatient
+from dedup import Duplicates, find_duplicates
+
+with open('hospital.txt', 'r', encoding='utf8') as f_patients:
+    hospital_rows = [line.split(';')[:-1] for line in f_patients]
+with open('ambulatory.txt', 'r', encoding='utf8') as f_patients:
+    ambulatory_rows = [line.split(';')[:-1] for line in f_patients]
+
+first = Loader.current_id
+hospital = [HospitalPatient(first + i, *row)
+            for i, row in enumerate(hospital_rows)]
+first += len(hospital)
+# the first ambulatory patient has passport of the first hospital patient,
+# the second one has name and birthday of the fourth one written in capitals
+# with е instead of ё, the third one has phone number of the second
+# ambulatory patient
+ambulatory_rows[0][5] = hospital_rows[0][5]
+ambulatory_rows[1][0] = hospital_rows[3][0].upper().replace('Ё', 'Е')
+ambulatory_rows[1][2] = hospital_rows[3][2]
+ambulatory_rows[2][8] = ambulatory_rows[1][8]
+ambulatory = [AmbulatoryPatient(first + i, *row)
+              for i, row in enumerate(ambulatory_rows)]
+Loader.current_id = first + len(ambulatory)
+
+duplicates = Duplicates()
+duplicates.add_all(hospital)
+duplicates.add_all(ambulatory)
+clusters = duplicates.clusters()
+for cluster in clusters:
+    print([f'{record.id}. {record.full_name}' for record in cluster])
+print(duplicates.report())
+assert [[record.id for record in cluster] for cluster in clusters] == [
+    [hospital[0].id, ambulatory[0].id],
+    [hospital[3].id, ambulatory[1].id, ambulatory[2].id]]
+assert duplicates.links == {'passport': 1, 'medical_policy': 0,
+                            'phone_number': 1, 'full_name+birthday': 1}
+assert find_duplicates(hospital, ambulatory) == clusters
+assert find_duplicates(hospital, keys=('passport',)) == []
+
+ids = Duplicates(keep=False)
+ids.add_all(hospital + ambulatory)
+assert ids.clusters() == [[record.id for record in cluster]
+                          for cluster in clusters]
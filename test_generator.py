@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+import generator
+from main import Load as Loader
+
+with tempfile.TemporaryDirectory() as directory:
+    for kind in generator.COLUMNS:
+        filename = os.path.join(directory, kind + '.txt')
+        generator.write_file(kind, 500, filename, invalid=0)
+        records = list(getattr(Loader, 'iter_' + kind)(filename))
+        print(kind, len(records), repr(records[0]))
+        names = type(records[0])._schema.names
+        assert len(records) == 500
+        assert all(getattr(record, name) is not None
+                   for record in records for name in names)
+        assert len({record.passport for record in records}) == 500
+
+        generator.write_file(kind, 500, filename, invalid=1)
+        with open(filename, 'r', encoding='utf8') as f_records:
+            for line, record in zip(f_records,
+                                    getattr(Loader, 'iter_' + kind)(filename)):
+                assert line.count(';') == len(generator.COLUMNS[kind])
+                assert any(getattr(record, name) is None for name in names)
+
+assert list(generator.generate_rows('nurses', 10, seed=1)) == list(
+    generator.generate_rows('nurses', 10, seed=1))
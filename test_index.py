@@ -0,0 +1,56 @@
+from index import date_key
+from main import Load as Loader
+
+load = Loader()
+
+load.load_hospital_patients('hospital.txt')
+load.load_ambulatory_patients('ambulatory.txt')
+load.load_nurses('nurses.txt')
+load.load_doctors('doctors.txt')
+records = (load.hospital_patients + load.ambulatory_patients + load.nurses
+           + load.doctors)
+indexes = load.indexes
+
+assert len(indexes['id']) == len(records)
+for record in records:
+    assert indexes.get('id', record.id) is record
+    if record.passport is not None:
+        assert record in indexes.find('passport', record.passport)
+patient = load.ambulatory_patients[2]
+assert indexes.get('medical_policy', patient.medical_policy) is patient
+assert indexes.find('passport', patient.passport) == [patient]
+assert indexes.find('passport', '0000 000000 01.01.2000') == []
+assert indexes.get('phone_number', '+0(000)000-00-00') is None
+
+# birthdays are ordered as dates, not as dd.mm.yyyy strings
+born = indexes.range('birthday', '01.01.1980', '31.12.1985')
+print([record.birthday for record in born])
+keys = [date_key(record.birthday) for record in born]
+assert keys == sorted(keys) and keys
+assert sorted(map(id, born)) == sorted(
+    id(record) for record in records if record.birthday is not None
+    and '19800101' <= date_key(record.birthday) <= '19851231')
+assert [date_key(record.birthday)
+        for record in indexes.range('birthday')] == sorted(
+    date_key(record.birthday) for record in records
+    if record.birthday is not None)
+
+rooms = indexes.range('room_number', 20, 30)
+print([(record.id, record.room_number) for record in rooms])
+assert rooms == sorted((patient for patient in load.hospital_patients
+                        if patient.room_number is not None
+                        and 20 <= patient.room_number <= 30),
+                       key=lambda patient: patient.room_number)
+assert indexes.find('room_number', 21) == [
+    patient for patient in load.hospital_patients
+    if patient.room_number == 21]
+
+# removed records are not found by any index
+patient = rooms[0]
+indexes.remove(patient)
+assert indexes.get('id', patient.id) is None
+assert patient not in indexes.find('passport', patient.passport)
+assert patient not in indexes.range('room_number', 20, 30)
+assert patient not in indexes.range('birthday')
+assert len(indexes.range('room_number', 20, 30)) == len(rooms) - 1
+assert len(indexes['id']) == len(records) - 1
@@ -0,0 +1,44 @@
+from main import Load as Loader, Registry, HospitalPatient, AmbulatoryPatient, \
+    Nurse, Doctor
+
+for record_class, filename, name in (
+        (HospitalPatient, 'hospital.txt', 'hospital_patients'),
+        (AmbulatoryPatient, 'ambulatory.txt', 'ambulatory_patients'),
+        (Nurse, 'nurses.txt', 'nurses'), (Doctor, 'doctors.txt', 'doctors')):
+    state = record_class._schema.state
+    loaded = Registry(first_id=10)
+    getattr(loaded, f'load_{name}')(filename)
+    streamed = Registry(first_id=10)
+    records = list(getattr(streamed, f'iter_{name}')(filename))
+    assert [state(record) for record in records] == [
+        state(record) for record in getattr(loaded, name)]
+    assert streamed.current_id == loaded.current_id == 10 + len(records)
+    # records are yielded, not kept
+    assert len(getattr(streamed, name)) == 0
+    assert len(streamed.indexes['id']) == 0
+
+    streamed.current_id = 10
+    chunks = list(streamed.iter_records(record_class, filename,
+                                        chunk_size=5))
+    print(record_class.__name__, [len(chunk) for chunk in chunks])
+    assert all(len(chunk) == 5 for chunk in chunks[:-1])
+    assert 1 <= len(chunks[-1]) <= 5
+    assert [state(record) for chunk in chunks for record in chunk] == [
+        state(record) for record in records]
+
+# reading lazily stops at the first record taken
+first_id = Loader.current_id
+loaded = len(Loader.hospital_patients)
+patients = Loader.iter_hospital_patients('hospital.txt')
+assert Loader.current_id == first_id
+patient = next(patients)
+assert patient.id == first_id and Loader.current_id == first_id + 1
+patients.close()
+assert len(Loader.hospital_patients) == loaded
+
+try:
+    next(Loader.iter_doctors('doctors.txt', chunk_size=0))
+except ValueError as error:
+    print(error)
+else:
+    raise AssertionError('chunks of no records were made')
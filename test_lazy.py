@@ -0,0 +1,68 @@
+from main import Load as Loader, HospitalPatient, AmbulatoryPatient, Nurse, \
+    Doctor
+
+for record_class, filename in ((HospitalPatient, 'hospital.txt'),
+                               (AmbulatoryPatient, 'ambulatory.txt'),
+                               (Nurse, 'nurses.txt'), (Doctor, 'doctors.txt')):
+    first = Loader.current_id
+    eager = list(Loader.iter_records(record_class, filename))
+    Loader.current_id = first
+    lazy = list(Loader.iter_records(record_class, filename, lazy=True))
+    assert all(isinstance(record, record_class) for record in lazy)
+    state = record_class._schema.state
+    assert [str(record) for record in lazy] == [str(record)
+                                                for record in eager]
+    assert [state(record) for record in lazy] == [state(record)
+                                                  for record in eager]
+
+patient = next(Loader.iter_records(HospitalPatient, 'hospital.txt',
+                                   lazy=True))
+print(type(patient).__name__, patient.id, patient.medical_department)
+try:
+    HospitalPatient.residence_address.__get__(patient)
+except AttributeError:
+    pass
+else:
+    raise AssertionError('a field was checked before it was read')
+assert patient.residence_address == \
+    'г. Новосибирск ул. Кочковская д. 42 кв. 208'
+assert HospitalPatient.residence_address.__get__(patient) is not None
+assert getattr(patient, 'specialty', None) is None
+
+# assigning a packed field keeps the other packed fields
+patient.married = False
+assert (patient.married, patient.gender, patient.status) == \
+    (False, 'муж.', 'рабочий')
+
+# rows the constructor rejects are rejected the same way
+with open('doctors.txt', 'r', encoding='utf8') as f_doctors:
+    row = f_doctors.readline().split(';')[:-1]
+make = Doctor._schema.lazy(Doctor)
+for column, value in ((15, 'пять'), (11, '19x5')):
+    values = list(row)
+    values[column] = value
+    errors = []
+    for construct in (lambda: Doctor(1, *values), lambda: make(1, values)):
+        try:
+            construct()
+        except ValueError as error:
+            errors.append(str(error))
+    print(errors)
+    assert len(errors) == 2 and errors[0] == errors[1]
+try:
+    make(1, row[:-1])
+except TypeError as error:
+    print(error)
+else:
+    raise AssertionError('a row of wrong length was accepted')
+
+patients = Loader.iter_ambulatory_patients('ambulatory.txt', lazy=True)
+assert [patient.passport for patient in patients] == [
+    patient.passport
+    for patient in Loader.iter_ambulatory_patients('ambulatory.txt')]
+try:
+    Loader.iter_nurses('nurses.txt', workers=2, lazy=True)
+except ValueError as error:
+    print(error)
+else:
+    raise AssertionError('lazy records were read in parallel')
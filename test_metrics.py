@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+import threading
+
+from main import Load as Loader, Doctor, HospitalPatient, Quarantine
+from metrics import Metrics
+
+Loader.metrics = Metrics()
+try:
+    Loader.load_hospital_patients('hospital.txt')
+    Loader.load_doctors('doctors.txt')
+    doctors = list(Loader.iter_records(Doctor, 'doctors.txt'))
+finally:
+    metrics, Loader.metrics = Loader.metrics, None
+
+text = metrics.to_prometheus()
+print(text[:1000])
+assert 'load_rows_total{loader="HospitalPatient",result="accepted"} 17' \
+    in text
+assert 'load_rows_total{loader="Doctor",result="accepted"} 12' in text
+assert 'load_validate_seconds_count{loader="Doctor"} 12' in text
+assert 'load_insert_seconds_count{loader="Doctor"} 1' in text
+assert '# TYPE load_read_seconds histogram' in text
+
+report = json.loads(metrics.to_json())
+rejected = {(counter['labels']['loader'], counter['labels']['field']):
+            counter['value'] for counter in report['counters']
+            if counter['name'] == 'load_rejected_fields_total'}
+print(rejected)
+# the second and the third hospital patients have wrong gender
+assert rejected[('HospitalPatient', 'gender')] == 2
+assert ('HospitalPatient', 'full_name') not in rejected
+
+validate = [histogram for histogram in report['histograms']
+            if histogram['name'] == 'load_validate_seconds'
+            and histogram['labels'] == {'loader': 'HospitalPatient'}][0]
+assert validate['count'] == 17 and validate['buckets']['inf'] == 17
+
+
+def counters(**options):
+    Loader.metrics = Metrics()
+    try:
+        for record in Loader.iter_records(HospitalPatient, filename,
+                                          **options):
+            pass
+    finally:
+        found, Loader.metrics = Loader.metrics, None
+    return {(name, labels): value
+            for (name, labels), value in found.counters.items()}
+
+
+# readers with options count the same bytes, rows and rejected values
+filename = 'hospital.txt'
+expected = counters()
+assert expected[('load_bytes_total', (('loader', 'HospitalPatient'),))] \
+    == os.path.getsize(filename)
+for options in ({'bulk': True}, {'workers': 2},
+                {'quarantine': Quarantine(HospitalPatient)},
+                {'workers': 2, 'quarantine': Quarantine(HospitalPatient)},
+                {'bulk': True, 'quarantine': Quarantine(HospitalPatient)}):
+    assert counters(**options) == expected, options
+# fields of lazy records are checked after reading
+assert counters(lazy=True) == {key: value for key, value in expected.items()
+                               if key[0] != 'load_rejected_fields_total'}
+
+# rows passed to quarantine are counted as rejected
+with tempfile.TemporaryDirectory() as directory:
+    with open('hospital.txt', 'r', encoding='utf8') as f_patients:
+        lines = f_patients.read().splitlines(keepends=True)
+    row = lines[0].split(';')
+    row[12] = '2x'
+    filename = os.path.join(directory, 'hospital.txt')
+    with open(filename, 'w', encoding='utf8') as f_patients:
+        f_patients.writelines(lines[:3] + [';'.join(row)] + lines[3:])
+    rows = {}
+    for options in ({'bulk': True}, {'workers': 2}, {}):
+        found = counters(quarantine=Quarantine(HospitalPatient), **options)
+        rows[tuple(options)] = {labels: value
+                                for (name, labels), value in found.items()
+                                if name == 'load_rows_total'}
+print(rows[()])
+assert rows[()][(('loader', 'HospitalPatient'), ('result', 'rejected'))] == 1
+assert rows[()][(('loader', 'HospitalPatient'), ('result', 'accepted'))] == 17
+assert rows[('bulk',)] == rows[('workers',)] == rows[()]
+
+# without metrics nothing is counted
+Loader.load_nurses('nurses.txt')
+assert 'Nurse' not in metrics.to_prometheus()
+
+from urllib.request import urlopen
+
+server = metrics.serve(port=0)
+try:
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+    with urlopen(url + '/metrics') as response:
+        assert response.read().decode('utf8') == metrics.to_prometheus()
+    with urlopen(url + '/metrics.json') as response:
+        assert json.load(response) == report
+finally:
+    server.shutdown()
+    server.server_close()
+
+# counters are not lost by threads adding to them at the same time
+metrics = Metrics()
+
+
+def count():
+    for _ in range(10 ** 4):
+        metrics.inc('load_rows_total', loader='Nurse', result='accepted')
+
+
+threads = [threading.Thread(target=count) for _ in range(4)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+assert metrics.report()['counters'][0]['value'] == 4 * 10 ** 4
@@ -0,0 +1,38 @@
+from main import Load as Loader, HospitalPatient
+from names import NameIndex, normalize
+
+assert normalize('  ЖУРАВЛЁВ  Велорий-Авксентьевич ') == \
+    'журавлев велорий авксентьевич'
+
+Loader.load_hospital_patients('hospital.txt')
+Loader.load_doctors('doctors.txt')
+
+found = Loader.indexes.search('full_name', 'журавлев велорий', 3)
+print([(round(score, 2), record.full_name) for score, record in found])
+assert found[0][1].full_name == 'Журавлёв Велорий Авксенть'
+
+# misspelled and longer than the truncated name
+found = Loader.indexes.search('full_name',
+                              'ИСАЕТКАРИМАВ ФАРХАД ТУРСУНГАЛИЕВИЧ')
+print([(round(score, 2), record.full_name) for score, record in found])
+assert found[0][1].full_name == 'Исаеткаримов Фархат Турсу'
+assert len(found) == 10
+assert [score for score, record in found] == sorted(
+    (score for score, record in found), reverse=True)
+
+index = NameIndex('full_name', 25)
+with open('hospital.txt', 'r', encoding='utf8') as f_patients:
+    row = f_patients.readline().split(';')[:-1]
+patient = HospitalPatient(1, *row)
+twin = HospitalPatient(2, *row)
+index.add(patient)
+index.add(twin)
+assert index.find('МАРТЫНОВ варлам рудольфович') == [patient, twin]
+assert [record for score, record in index.search('Мартынов', 1)] == [patient]
+index.remove(patient)
+assert [record for score, record in index.search('Мартынов')] == [twin]
+index.remove(twin)
+assert index.search('Мартынов') == []
+assert len(index) == 0
+index.add(patient)
+assert index.get('мартынов варлам рудольфович') is patient
@@ -0,0 +1,59 @@
+from main import Packed, HospitalPatient, AmbulatoryPatient, Nurse, Doctor
+
+for record_class, filename in ((HospitalPatient, 'hospital.txt'),
+                               (AmbulatoryPatient, 'ambulatory.txt'),
+                               (Nurse, 'nurses.txt'),
+                               (Doctor, 'doctors.txt')):
+    schema = record_class._schema
+    packed = [(name, check) for name, check in schema.fields
+              if isinstance(check, Packed)]
+    assert schema.width <= 64
+
+    with open(filename, 'r', encoding='utf8') as f_records:
+        rows = [ptr.split(';')[:-1] for ptr in f_records]
+    assert not hasattr(record_class(1, *rows[0]), '__dict__')
+    for row in rows:
+        record = record_class(1, *row)
+        # packed fields give the values of their checks
+        for name, check in packed:
+            value = row[schema.names.index(name) - 1]
+            assert getattr(record, name) == check.check(value)
+        copy = schema.restore(record_class, schema.state(record))
+        assert schema.state(copy) == schema.state(record)
+        assert str(copy) == str(record)
+
+    # every value of a writable field is kept without changing the others
+    record = record_class(1, *rows[0])
+    for name, check in packed:
+        if not check.writable:
+            continue
+        for value in check.values:
+            others = {other: getattr(record, other) for other, _ in packed
+                      if other != name}
+            setattr(record, name, value)
+            assert getattr(record, name) is value
+            assert others == {other: getattr(record, other)
+                              for other in others}
+
+    for name, check in packed:
+        if check.writable:
+            continue
+        try:
+            setattr(record, name, check.values[-1])
+        except AttributeError:
+            pass
+        else:
+            raise AssertionError(f'{name} was assigned')
+
+doctor = Doctor(1, *rows[0])
+for value in (1, 0, 'True', 2, 1.0):
+    try:
+        doctor.trainings = value
+    except ValueError as error:
+        print(error)
+    else:
+        raise AssertionError(f'{value!r} was assigned to a flag')
+doctor.trainings = None
+assert doctor.trainings is None
+doctor.trainings = True
+assert doctor.trainings is True
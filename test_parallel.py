@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+from main import Load as Loader, Registry, HospitalPatient, Nurse
+
+with open('hospital.txt', 'r', encoding='utf8') as f_patients:
+    lines = [line.rstrip('\r\n') for line in f_patients]
+
+with tempfile.TemporaryDirectory() as directory:
+    for name, end in (('crlf', '\r\n'), ('cr', '\r'), ('lf', '\n')):
+        filename = os.path.join(directory, f'{name}.txt')
+        with open(filename, 'w', encoding='utf8', newline='') as f_out:
+            # long enough to be split into many ranges
+            f_out.write(end.join(lines * 20))
+
+        state = HospitalPatient._schema.state
+        sequential = Registry(first_id=5)
+        sequential.load_hospital_patients(filename)
+        parallel = Registry(first_id=5)
+        parallel.load_hospital_patients(filename, workers=2)
+        print(name, len(parallel.hospital_patients), parallel.current_id)
+        assert len(sequential.hospital_patients) == len(lines) * 20
+        assert parallel.current_id == sequential.current_id
+        assert [state(patient) for patient in parallel.hospital_patients] \
+            == [state(patient) for patient in sequential.hospital_patients]
+
+        # ranges start after line ends
+        for start, stop in Loader._split_file(filename, 8):
+            assert start == 0 or Loader._read_bytes(
+                filename, start - 1, start) in (b'\n', b'\r')
+
+first_id = Loader.current_id
+nurses = list(Loader.iter_nurses('nurses.txt', workers=2))
+assert [nurse.id for nurse in nurses] == list(
+    range(first_id, first_id + len(nurses)))
+assert Loader.current_id == first_id + len(nurses)
+assert [nurse.full_name for nurse in nurses] == [
+    nurse.full_name for nurse in Registry().iter_records(Nurse, 'nurses.txt')]
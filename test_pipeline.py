@@ -0,0 +1,102 @@
+import asyncio
+import os
+import tempfile
+
+import pipeline
+from main import Load as Loader, Registry, Quarantine, HospitalPatient, \
+    Doctor, Nurse
+
+first_id = Loader.current_id
+expected = [repr(patient) for patient in
+            Loader.iter_hospital_patients('hospital.txt')]
+Loader.current_id = first_id
+patients = pipeline.ingest_file(HospitalPatient, 'hospital.txt',
+                                batch_size=7)
+print(patients.report())
+assert [repr(patient) for patient in
+        Loader.hospital_patients[-len(expected):]] == expected
+assert Loader.indexes.get('id', first_id).full_name == \
+    Loader.hospital_patients[-len(expected)].full_name
+
+
+async def feed_socket():
+    with open('doctors.txt', 'rb') as f_doctors:
+        data = f_doctors.read()
+    reader = asyncio.StreamReader()
+    for i in range(0, len(data), 100):
+        reader.feed_data(data[i:i + 100])
+    reader.feed_eof()
+    return await pipeline.Pipeline(Doctor, queue_size=1).run(
+        pipeline.read_stream(reader, 64))
+
+
+count = asyncio.run(feed_socket())
+print(count, Loader.doctors[-1])
+assert Loader.doctors[-1].full_name is not None
+
+
+async def follow_file(filename):
+    with open('nurses.txt', 'r', encoding='utf8') as f_nurses:
+        lines = f_nurses.readlines()
+    stop = asyncio.Event()
+    feed = pipeline.Pipeline(Nurse)
+    task = asyncio.create_task(feed.run(
+        pipeline.read_file(filename, follow=True, stop=stop, poll=0.01)))
+    # rows and their line ends \r\n are written in parts
+    with open(filename, 'a', encoding='utf8', newline='') as f_out:
+        for line in lines:
+            line = line.rstrip('\r\n')
+            for part in (line[:10], line[10:] + '\r', '\n'):
+                f_out.write(part)
+                f_out.flush()
+                await asyncio.sleep(0.02)
+    await asyncio.sleep(0.05)
+    stop.set()
+    count = await task
+    assert feed.metrics['insert'].report()['rejected'] == 0
+    return count, len(lines)
+
+
+with tempfile.TemporaryDirectory() as directory:
+    filename = os.path.join(directory, 'nurses.txt')
+    open(filename, 'w').close()
+    count, lines = asyncio.run(follow_file(filename))
+    print(count, [repr(nurse) for nurse in Loader.nurses[-count:]])
+    assert count == lines
+
+# a bad row and a blank line are rejected as in sequential loading
+with open('hospital.txt', 'r', encoding='utf8') as f_patients:
+    lines = f_patients.read().splitlines(keepends=True)
+lines[-1] += '\n'
+lines[3:3] = ['\n']
+row = lines[8].split(';')
+row[12] = '2x'
+lines[8] = ';'.join(row)
+with tempfile.TemporaryDirectory() as directory:
+    filename = os.path.join(directory, 'hospital.txt')
+    with open(filename, 'w', encoding='utf8') as f_out:
+        f_out.writelines(lines)
+
+    expected = Quarantine(HospitalPatient)
+    registry = Registry(first_id=1)
+    registry.load_hospital_patients(filename, quarantine=expected)
+    for workers in (None, 2):
+        quarantine = Quarantine(HospitalPatient)
+        loaded = Registry(first_id=1)
+        fed = pipeline.ingest_file(HospitalPatient, filename, workers,
+                                   batch_size=4, registry=loaded,
+                                   quarantine=quarantine)
+        assert [repr(patient) for patient in loaded.hospital_patients] == [
+            repr(patient) for patient in registry.hospital_patients]
+        assert loaded.current_id == registry.current_id == len(lines) - 1
+        assert quarantine.summary() == expected.summary()
+        assert fed.report()['insert']['rejected'] == 2
+
+    # without quarantine rejected rows are only counted
+    loaded = Registry(first_id=1)
+    fed = pipeline.ingest_file(HospitalPatient, filename, registry=loaded)
+    print(fed.report()['insert'])
+    assert fed.report()['insert']['items'] == len(lines) - 2
+    assert fed.report()['insert']['rejected'] == 2
+    assert [patient.id for patient in loaded.hospital_patients] == list(
+        range(1, len(lines) - 1))
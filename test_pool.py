@@ -0,0 +1,46 @@
+import asyncio
+import os
+import tempfile
+
+import pipeline
+import snapshot
+from main import Load as Loader, Registry, HospitalPatient
+from pool import InternPool
+
+patients = list(Loader.iter_hospital_patients('hospital.txt'))
+assert all(patient.medical_department is
+           Loader.pools['medical_department'].get(patient.medical_department)
+           for patient in patients)
+print(Loader.pools.report(patients)['medical_department'])
+
+
+def pooled(records):
+    pool = Loader.pools['medical_department']
+    return all(record.medical_department is
+               pool.get(record.medical_department) for record in records)
+
+
+# records restored from states of other processes and of snapshot files
+# share pooled values too
+assert pooled(Registry().iter_records(HospitalPatient, 'hospital.txt',
+                                      workers=2))
+feed = pipeline.Pipeline(HospitalPatient, workers=2, registry=Registry())
+asyncio.run(feed.run(pipeline.read_file('hospital.txt')))
+assert pooled(feed.target.hospital_patients)
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'hospital.snapshot')
+    snapshot.load(HospitalPatient, 'hospital.txt', path)
+    Loader.pools.clear()
+    restored = snapshot.load(HospitalPatient, 'hospital.txt', path)
+    assert pooled(restored)
+
+pool = InternPool('place_birth', 4)
+first = ''.join(['г. ', 'Новосибирск'])
+assert pool.get(first) is None and pool.intern(first) is first
+second = ''.join(['г. ', 'Новосибирск'])
+assert second is not first and pool.get(second) is first
+for place in ('г. Бердск', 'г. Искитим', 'г. Обь'):
+    pool.get(place) or pool.intern(place)
+assert len(pool) <= 4 and pool.evicted == 2
+assert pool.get(second) is None and pool.intern(second) is second
+print(pool.report())
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from main import HospitalPatient
+from publisher import Publisher
+
+READERS = 4
+WRITES = 20
+
+published = Publisher()
+errors = []
+reads = [0] * READERS
+done = threading.Event()
+
+
+def check(registry):
+    patients = registry.hospital_patients
+    count = len(patients)
+    assert len(registry.patient_names) == count
+    if count:
+        last = patients[-1]
+        assert last.id < registry.current_id
+        assert registry.indexes.get('id', last.id) is last
+        assert registry.patient_names[-1].startswith(f'{last.id}. ')
+    occupancy = registry.wards.departments().values()
+    assert sum(department['occupied'] + department['unassigned']
+               for department in occupancy) == count
+    assert len(registry.indexes['room_number']) == sum(
+        department['occupied'] for department in occupancy)
+    assert len(patients) == count
+
+
+def read(reader):
+    epoch = 0
+    try:
+        while not done.is_set():
+            registry = published.read()
+            assert registry.epoch >= epoch
+            epoch = registry.epoch
+            check(registry)
+            reads[reader] += 1
+    except AssertionError as error:
+        errors.append(error)
+
+
+readers = [threading.Thread(target=read, args=(reader,))
+           for reader in range(READERS)]
+for thread in readers:
+    thread.start()
+
+with open('hospital.txt', 'r', encoding='utf8') as f_patients:
+    row = f_patients.readline().split(';')[:-1]
+row[16] = ''
+
+start = time.perf_counter()
+for write in range(WRITES):
+    with published.write() as registry:
+        registry.load_hospital_patients('hospital.txt')
+        # an admitted patient is seen with its bed or not at all
+        patient = HospitalPatient(registry.current_id, *row)
+        registry.current_id += 1
+        try:
+            registry.admit_hospital_patient(patient)
+        except ValueError:
+            pass
+elapsed = time.perf_counter() - start
+done.set()
+for thread in readers:
+    thread.join()
+
+print(f'{WRITES} versions in {elapsed:.2f} s, {sum(reads)} reads '
+      f'({sum(reads) / elapsed:.0f}/s) by {READERS} readers')
+assert not errors, errors
+assert all(reads)
+assert published.read().epoch == WRITES + 1
+assert len(published.read().hospital_patients) >= 17 * WRITES
+
+# a block that raises publishes nothing, not even with the next write
+current = published.read()
+writer = published.registry
+try:
+    with published.write() as registry:
+        registry.load_hospital_patients('hospital.txt')
+        registry.load_doctors('missing.txt')
+except FileNotFoundError as error:
+    print(error)
+else:
+    raise AssertionError('a missing file was loaded')
+assert published.read() is current
+assert published.registry is writer
+assert len(writer.hospital_patients) == len(current.hospital_patients)
+assert writer.current_id == current.current_id
+
+with published.write() as registry:
+    registry.load_doctors('doctors.txt')
+assert published.read().epoch == current.epoch + 1
+assert len(published.read().hospital_patients) == \
+    len(current.hospital_patients)
+assert published.read().hospital_patients[-1] is \
+    current.hospital_patients[-1]
+assert published.read().doctors[0].id == current.current_id
+check(published.read())
@@ -0,0 +1,35 @@
+import os
+import tempfile
+
+from main import Load as Loader, Nurse, Quarantine
+
+with open('nurses.txt', 'r', encoding='utf8') as f_nurses:
+    lines = f_nurses.readlines()
+bad_experience = lines[0].replace(';8;', ';восемь;')
+short = ';'.join(lines[1].split(';')[:4]) + ';\n'
+
+with tempfile.TemporaryDirectory() as directory:
+    filename = os.path.join(directory, 'nurses.txt')
+    with open(filename, 'w', encoding='utf8') as f_out:
+        f_out.writelines([bad_experience, short] + lines)
+
+    for workers in (None, 2):
+        path = os.path.join(directory, f'rejected_{workers}.txt')
+        first_id = Loader.current_id
+        with Quarantine(Nurse, path) as rejected:
+            nurses = list(Loader.iter_nurses(filename, workers=workers,
+                                             quarantine=rejected))
+        summary = rejected.summary()
+        print(summary['rows'], summary['fields']['work_experience'])
+        with open(path, 'r', encoding='utf8') as f_rejected:
+            quarantined = f_rejected.readlines()
+        print(quarantined)
+
+        assert [nurse.id for nurse in nurses] == list(
+            range(first_id, first_id + len(lines)))
+        assert Loader.current_id == first_id + len(lines)
+        assert summary['rows'] == {'accepted': len(lines), 'rejected': 2,
+                                   'wrong_length': 1}
+        assert summary['fields']['work_experience']['rows_rejected'] == 1
+        assert quarantined[0].startswith('1\twork_experience: ValueError')
+        assert quarantined[1].startswith('2\t4 fields instead of 19\t')
@@ -0,0 +1,68 @@
+from main import Load as Loader, Registry, HospitalPatient
+
+live = Registry()
+live.load_hospital_patients('hospital.txt')
+live.load_doctors('doctors.txt')
+assert [patient.id for patient in live.hospital_patients] == list(
+    range(1, 18))
+assert live.current_id == 24
+
+# a registry loaded in the background does not touch the live one
+reloaded = Registry(first_id=100)
+reloaded.load_hospital_patients('hospital.txt')
+assert len(live.hospital_patients) == 17
+assert reloaded.hospital_patients[0].id == 100
+assert live.indexes.get('id', 100) is None
+assert reloaded.indexes.get('id', 100) is reloaded.hospital_patients[0]
+
+snapshot = live.snapshot()
+assert snapshot.hospital_patients is live.hospital_patients
+live.load_ambulatory_patients('ambulatory.txt')
+patient = live.hospital_patients[0]
+department = patient.medical_department
+live.discharge_hospital_patient(patient)
+print(live.wards.occupancy(department), snapshot.wards.occupancy(department))
+assert live.wards.occupancy(department)['occupied'] + 1 == \
+    snapshot.wards.occupancy(department)['occupied']
+assert len(live.ambulatory_patients) == 21
+assert snapshot.ambulatory_patients == []
+assert snapshot.indexes.get('passport',
+                            live.ambulatory_patients[0].passport) is None
+assert len(snapshot.indexes['room_number']) == \
+    len(live.indexes['room_number']) + 1
+assert snapshot.indexes.get('id', patient.id) is patient
+
+# the discharged patient is a copy, the snapshot keeps the patient in its room
+discharged = live.hospital_patients[0]
+assert discharged is not patient and discharged.id == patient.id
+assert discharged.room_number is None and patient.room_number is not None
+assert live.indexes.get('id', patient.id) is discharged
+assert live.indexes.get('passport', patient.passport) is discharged
+assert patient in snapshot.indexes.range('room_number', patient.room_number,
+                                         patient.room_number)
+assert patient not in live.indexes.range('room_number')
+assert all(record.room_number is not None
+           for record in snapshot.indexes.range('room_number'))
+assert snapshot.hospital_patients[0] is patient
+room = snapshot.wards.room(department, patient.room_number)
+assert room['occupied'] == len([
+    record for record in snapshot.indexes.find('room_number',
+                                               patient.room_number)
+    if record.medical_department == department])
+assert live.wards.room(department, patient.room_number)['occupied'] == \
+    room['occupied'] - 1
+try:
+    live.discharge_hospital_patient(patient)
+except ValueError as error:
+    print(error)
+else:
+    raise AssertionError('a discharged patient was discharged again')
+
+# readers keep the registry they got while the default one is swapped
+first = len(Loader.hospital_patients)
+old = Loader.swap(live)
+assert Loader.registry is live and Loader.hospital_patients is \
+    live.hospital_patients
+assert HospitalPatient.hospital_patients[0] == f'1. {patient.full_name} '
+assert Loader.swap(old) is live
+assert len(Loader.hospital_patients) == first
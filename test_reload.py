@@ -0,0 +1,78 @@
+import os
+import tempfile
+
+from main import Registry
+
+with open('hospital.txt', 'rb') as f_patients:
+    rows = [line.rstrip(b'\r\n') for line in f_patients]
+# the files end with a finished row without line end
+assert rows[-1].endswith(b';')
+
+
+def ids(records):
+    return [record.id for record in records]
+
+
+with tempfile.TemporaryDirectory() as directory:
+    filename = os.path.join(directory, 'hospital.txt')
+
+    def write(data, mode='ab'):
+        with open(filename, mode) as f_patients:
+            f_patients.write(data)
+
+    # appended rows keep the ids of the rows before them
+    registry = Registry(first_id=1)
+    write(b'\n'.join(rows[:3]), 'wb')
+    assert ids(registry.reload_hospital_patients(filename)) == [1, 2, 3]
+    write(b'\n' + rows[3])
+    assert ids(registry.reload_hospital_patients(filename)) == [4]
+    write(b'\r\n' + rows[4] + b'\r')
+    assert ids(registry.reload_hospital_patients(filename)) == [5]
+    write(b'\n' + rows[5] + b'\n')
+    assert ids(registry.reload_hospital_patients(filename)) == [6]
+    assert registry.reload_hospital_patients(filename) == []
+    assert ids(registry.hospital_patients) == [1, 2, 3, 4, 5, 6]
+    assert [patient.full_name for patient in registry.hospital_patients] == [
+        row.decode('utf8').split(';')[0][:25] for row in rows[:6]]
+
+    # a half-written line is left until it is finished
+    half = len(rows[6]) // 2
+    write(rows[6][:half])
+    assert registry.reload_hospital_patients(filename) == []
+    write(rows[6][half:-1])
+    assert registry.reload_hospital_patients(filename) == []
+    write(rows[6][-1:])
+    assert ids(registry.reload_hospital_patients(filename)) == [7]
+    write(b'\n')
+    assert registry.reload_hospital_patients(filename) == []
+    write(rows[7] + b'\n')
+    assert ids(registry.reload_hospital_patients(filename)) == [8]
+    assert len(registry.hospital_patients) == 8
+
+    # a finished last line that gets more fields was rewritten
+    write(rows[8])
+    assert ids(registry.reload_hospital_patients(filename)) == [9]
+    write(b'x;')
+    assert ids(registry.reload_hospital_patients(filename)) == list(
+        range(10, 18))
+    assert ids(registry.hospital_patients) == list(range(10, 18))
+    write(b'\n')
+    try:
+        registry.reload_hospital_patients(filename)
+    except TypeError as error:
+        print(error)
+    else:
+        raise AssertionError('line with too many fields was loaded')
+
+    # truncated and rewritten files are loaded again with new ids
+    write(b'\n'.join(rows[:1]), 'wb')
+    assert ids(registry.reload_hospital_patients(filename)) == [18]
+    assert ids(registry.hospital_patients) == [18]
+    write(b'\n'.join(rows[1:3]), 'wb')
+    assert ids(registry.reload_hospital_patients(filename)) == [19, 20]
+    assert ids(registry.hospital_patients) == [19, 20]
+    assert [patient.full_name for patient in registry.hospital_patients] == [
+        row.decode('utf8').split(';')[0][:25] for row in rows[1:3]]
+    assert registry.indexes.get('id', 18) is None
+    assert registry.positions[os.path.abspath(filename)]['offset'] == \
+        os.path.getsize(filename)
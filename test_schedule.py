@@ -0,0 +1,26 @@
+from main import Load as Loader
+from schedule import Scheduler, needs_diagnosis
+
+patients = list(Loader.iter_hospital_patients('hospital.txt'))
+doctors = list(Loader.iter_doctors('doctors.txt'))
+nurses = list(Loader.iter_nurses('nurses.txt'))
+
+for capacity in (None, 3):
+    scheduler = Scheduler.for_doctors(doctors, capacity)
+    greedy = scheduler.assign(patients)
+    exact = scheduler.assign(patients, exact=True)
+    print(capacity, {repr(doctor): load for doctor, load in
+                     exact.loads().items()}, len(exact.unassigned))
+    for schedule in (greedy, exact):
+        assert len(schedule.staff) + len(schedule.unassigned) == len(
+            patients)
+        for patient, doctor in schedule.staff.items():
+            assert doctor.treatment_patients or needs_diagnosis(patient)
+        if capacity is not None:
+            assert max(schedule.loads().values()) <= capacity
+    assert len(exact.unassigned) <= len(greedy.unassigned)
+    assert exact.cost() <= greedy.cost()
+
+schedule = Scheduler.for_nurses(nurses).assign(patients, exact=True)
+print({repr(nurse): load for nurse, load in schedule.loads().items()})
+assert all(nurse.patient_care for nurse in schedule.patients)
@@ -0,0 +1,130 @@
+import re
+
+from main import Load as Loader, HospitalPatient, AmbulatoryPatient, Nurse, \
+    Doctor
+
+
+def same(value):
+    return value
+
+
+def is_one_of(allowed):
+    return lambda value: value if value in allowed else None
+
+
+def is_match(pattern):
+    return lambda value: value if re.fullmatch(pattern, value) else None
+
+
+def is_between(low, high):
+    return lambda value: int(value) if low <= value <= high else None
+
+
+def territorial_number(value):
+    try:
+        value = int(value)
+    except ValueError:
+        return None
+    return value if 1 <= value <= 20 else None
+
+
+def work_experience(value):
+    return int(value) if 0 <= int(value) <= 60 else None
+
+
+# checks of fields as the constructors made them before schemas, with their
+# quirks: rhesus is any substring of '+-', ranges of strings compare
+# lexicographically, so '10' is a blood type, and \d matches digits of
+# every script
+OLD = {
+    'full_name': lambda value: value[:25],
+    'gender': is_one_of(['муж.', 'жен.']),
+    'birthday': is_match(r'\d{2}.\d{2}.\d{4}'),
+    'place_birth': same,
+    'married': Loader.is_bool,
+    'passport': is_match(r'\d{4} \d{6} \d{2}.\d{2}.\d{4}'),
+    'residence_address': same,
+    'level_education': is_one_of(Doctor.allowed_level_education),
+    'phone_number': is_match(r'\+\d\(\d{3}\)\d{3}-\d{2}-\d{2}'),
+    'know_foreign_language': Loader.is_bool,
+    'education_document': same,
+    'year_graduation': is_between('1950', '2030'),
+    'qualification': same,
+    'specialty': same,
+    'profession': is_one_of(Doctor.professions_allowed),
+    'work_experience': work_experience,
+    'academic_degree': Loader.is_bool,
+    'academic_rank': Loader.is_bool,
+    'category': is_one_of(Doctor.category_allowed),
+    'trainings': Loader.is_bool,
+    'medical_errors': same,
+    'diagnosis_patients': Loader.is_bool,
+    'treatment_patients': Loader.is_bool,
+    'rehabilitation_patients': Loader.is_bool,
+    'sanitary_service': Loader.is_bool,
+    'patient_care': Loader.is_bool,
+    'medical_procedures': Loader.is_bool,
+    'medical_policy': same,
+    'status': is_one_of(HospitalPatient.status_allowed),
+    'place_work_study': same,
+    'blood_type': is_between('1', '4'),
+    'rhesus_affiliation': lambda value: value if value in '+-' else None,
+    'allergic_reactions': same,
+    'territorial_number': territorial_number,
+    'disability': is_between('0', '3'),
+    'health_group': is_one_of(AmbulatoryPatient.health_group_allowed),
+    'chronic_diagnosis': same,
+    'medical_department': same,
+    'room_number': Loader.is_int,
+    'clinic_diagnosis': same,
+}
+
+VALUES = ['', 'True', 'False', 'true', '0', '1', '3', '4', '5', '10', '20',
+          '21', '25', '-1', ' 7', '2x', '٣', '1949', '1950', '2', '2030',
+          '2031', '1999a', 'муж.', 'жен.', 'м', 'высшее', 'врач', 'высшая',
+          'рабочий', 'I', 'IV', '+', '-', '+-', '-+', 'Ф' * 30,
+          '01.02.1990', '01/02/1990', '1.02.1990', '٠١.٠٢.١٩٩٠',
+          '1234 567890 01.02.2010', '1234 56789 01.02.2010',
+          '+7(912)345-67-89', '+7 912 345-67-89']
+
+
+def result(function):
+    try:
+        return function()
+    except (TypeError, ValueError) as error:
+        return type(error)
+
+
+checked = 0
+for record_class, filename in ((HospitalPatient, 'hospital.txt'),
+                               (AmbulatoryPatient, 'ambulatory.txt'),
+                               (Nurse, 'nurses.txt'),
+                               (Doctor, 'doctors.txt')):
+    with open(filename, 'r', encoding='utf8') as f_records:
+        row = f_records.readline().split(';')[:-1]
+    names = record_class._schema.names[1:]
+    assert len(names) == len(row)
+    for column, name in enumerate(names):
+        for value in VALUES:
+            values = list(row)
+            values[column] = value
+            new = result(lambda: getattr(record_class(1, *values), name))
+            old = result(lambda: OLD[name](value))
+            assert new == old and type(new) is type(old), \
+                (record_class.__name__, name, value, new, old)
+            checked += 1
+print(checked, 'values checked')
+
+# the quirks are kept
+with open('hospital.txt', 'r', encoding='utf8') as f_patients:
+    row = f_patients.readline().split(';')[:-1]
+row[12], row[13] = '10', '+-'
+patient = HospitalPatient(1, *row)
+assert (patient.blood_type, patient.rhesus_affiliation) == (10, '+-')
+row[12] = '2x'
+try:
+    HospitalPatient(1, *row)
+except ValueError as error:
+    print(error)
+else:
+    raise AssertionError('blood type 2x was accepted')
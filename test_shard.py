@@ -0,0 +1,52 @@
+import tempfile
+
+import shard
+from main import Registry, HospitalPatient
+
+whole = Registry()
+whole.load_hospital_patients('hospital.txt')
+whole.load_ambulatory_patients('ambulatory.txt')
+
+# territorial numbers 1 and 2 are served by one region
+shards = shard.Shards({1: 'north', 2: 'north'})
+assert shards.load_hospital_patients('hospital.txt') == 17
+assert shards.load_ambulatory_patients('ambulatory.txt') == 21
+print(shards.query(shard.sizes))
+assert sorted(shards.shards, key=str) == [3, 4, 'north', 'кардиологическое',
+                                         'терапевтическое']
+assert len(shards.shards['north'].ambulatory_patients) == 11
+assert shards.current_id == whole.current_id
+
+state = HospitalPatient._schema.state
+assert [state(patient) for patient in shards.records('hospital_patients')] \
+    == [state(patient) for patient in whole.hospital_patients]
+patient = whole.ambulatory_patients[5]
+assert shards.get('passport', patient.passport).id == patient.id
+assert [record.id for record in shards.find('id', patient.id)] == [
+    patient.id]
+assert [record.id for record in shards.range('birthday')] == [
+    record.id for record in whole.indexes.range('birthday')]
+found = shards.search('full_name', patient.full_name, 3)
+print([(round(score, 2), record.full_name) for score, record in found])
+assert found[0][1].id == patient.id
+
+# one shard loaded alone gets the same ids
+north = shard.Shards({1: 'north', 2: 'north'}, first_id=18)
+assert north.load_ambulatory_patients('ambulatory.txt', ['north']) == 11
+assert list(north.shards) == ['north']
+assert [record.id for record in north.shards['north'].ambulatory_patients] \
+    == [record.id for record in shards.shards['north'].ambulatory_patients]
+
+with tempfile.TemporaryDirectory() as directory:
+    assert shards.save(directory) == 38
+    loaded = shard.load(directory, ['терапевтическое'])
+    assert loaded.placement == {1: 'north', 2: 'north'}
+    therapy = loaded.shards['терапевтическое']
+    assert len(therapy.hospital_patients) == 8
+    assert therapy.wards.occupancy('терапевтическое') == \
+        whole.wards.occupancy('терапевтическое')
+
+    # functions given to worker processes must be importable there
+    counts = shard.map_shards(directory, shard.sizes, workers=2)
+    print(counts)
+    assert counts == shards.query(shard.sizes)
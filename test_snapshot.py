@@ -0,0 +1,116 @@
+import os
+import shutil
+import struct
+import tempfile
+
+import snapshot
+from main import Load as Loader, Registry, HospitalPatient, Nurse
+
+with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'hospital.snap')
+
+    first_id = Loader.current_id
+    patients = snapshot.load(HospitalPatient, 'hospital.txt', path)
+    print(len(patients), patients[0], repr(patients[-1]))
+
+    Loader.current_id = first_id
+    cached = snapshot.load(HospitalPatient, 'hospital.txt', path)
+    print(cached.records[:3])
+    assert [repr(patient) for patient in cached] == [
+        repr(patient) for patient in patients]
+    patients.close()
+    cached.close()
+
+    # records of a snapshot take ids, but are not added to the registry
+    filename = os.path.join(directory, 'hospital.txt')
+    shutil.copyfile('hospital.txt', filename)
+    path = filename + '.snap'
+    registry = Registry(first_id=100)
+    patients = snapshot.load(HospitalPatient, filename, registry=registry)
+    assert os.path.exists(path)
+    assert registry.current_id == 100 + len(patients)
+    assert [patient.id for patient in patients] == list(
+        range(100, registry.current_id))
+    assert len(registry.hospital_patients) == 0
+    assert registry.indexes.get('id', 100) is None
+    patients.close()
+
+    inserted = Registry(first_id=100)
+    patients = snapshot.load(HospitalPatient, filename, registry=inserted,
+                             insert=True)
+    assert inserted.hospital_patients == list(patients)
+    assert inserted.indexes.get('id', 100) is patients[0]
+    assert len(inserted.patient_names) == len(patients)
+    patients.close()
+
+    def reloaded(registry=None):
+        registry = registry or Registry(first_id=100)
+        mtime = os.stat(path).st_mtime_ns
+        patients = snapshot.load(HospitalPatient, filename,
+                                 registry=registry)
+        written = os.stat(path).st_mtime_ns != mtime
+        states = [HospitalPatient._schema.state(patient)
+                  for patient in patients]
+        patients.close()
+        return written, states
+
+    written, expected = reloaded()
+    assert not written
+
+    # a changed source is parsed again
+    with open(filename, 'rb') as f_patients:
+        text = f_patients.read()
+    row = text.splitlines(keepends=True)[0]
+    with open(filename, 'ab') as f_patients:
+        f_patients.write(b'' if text.endswith(b'\n') else b'\n')
+        f_patients.write(row)
+    expected.append(expected[0])
+    written, states = reloaded()
+    assert written and [state[1:] for state in states] == [
+        state[1:] for state in expected]
+
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert reloaded()[0]
+    assert not reloaded()[0]
+
+    # a snapshot of another version or class is not opened
+    with open(path, 'rb') as f_snapshot:
+        data = bytearray(f_snapshot.read())
+    valid = bytes(data)
+    struct.pack_into('<I', data, 8, snapshot.VERSION + 1)
+    with open(path, 'wb') as f_snapshot:
+        f_snapshot.write(data)
+    try:
+        snapshot.Snapshot(path, HospitalPatient)
+    except ValueError as error:
+        print(error)
+    else:
+        raise AssertionError('snapshot of another version was opened')
+    assert reloaded()[0]
+
+    try:
+        snapshot.Snapshot(path, Nurse)
+    except ValueError as error:
+        print(error)
+    else:
+        raise AssertionError('snapshot of another class was opened')
+
+    # truncated and corrupt snapshots are written again
+    for end in (len(valid) - 3, len(valid) // 2, 20, 0):
+        with open(path, 'wb') as f_snapshot:
+            f_snapshot.write(valid[:end])
+        try:
+            snapshot.Snapshot(path, HospitalPatient)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f'snapshot truncated to {end} was opened')
+        assert reloaded() == (True, states)
+    data = bytearray(valid)
+    offsets = snapshot.HEADER.unpack_from(data)[5]
+    struct.pack_into('<Q', data, offsets, len(data))
+    with open(path, 'wb') as f_snapshot:
+        f_snapshot.write(data)
+    assert reloaded() == (True, states)
+    assert not reloaded()[0]
@@ -0,0 +1,60 @@
+from datetime import date
+
+from main import Registry, HospitalPatient, AmbulatoryPatient, Doctor, \
+    Nurse
+from stats import group_by, age_bucket, experience_bucket
+
+registry = Registry()
+registry.load_hospital_patients('hospital.txt')
+registry.load_ambulatory_patients('ambulatory.txt')
+registry.load_nurses('nurses.txt')
+registry.load_doctors('doctors.txt')
+statistics = registry.statistics
+
+print(statistics.counts('category_experience'))
+assert statistics.counts('category_experience') == group_by(
+    registry.doctors, 'category', 'work_experience',
+    work_experience=experience_bucket)
+assert statistics.counts('blood_group') == group_by(
+    registry.hospital_patients + registry.ambulatory_patients,
+    'blood_type', 'rhesus_affiliation')
+assert statistics.counts('health_group', AmbulatoryPatient) == group_by(
+    registry.ambulatory_patients, 'health_group')
+assert statistics.count('disability', 0) == sum(
+    patient.disability == 0 for patient in registry.ambulatory_patients)
+assert statistics.counts('disability', Nurse) == {}
+
+today = date(2026, 10, 18)
+ages = statistics.ages(today=today)
+print(ages)
+assert ages == group_by(registry.hospital_patients
+                        + registry.ambulatory_patients + registry.nurses
+                        + registry.doctors, 'birthday',
+                        birthday=age_bucket(today=today))
+assert list(ages) == [30, 40, 50, None]
+assert sum(statistics.ages(Doctor, 5, today).values()) == 6
+
+# a snapshot keeps its counts while the registry changes
+snapshot = registry.snapshot()
+registry.reload_doctors('doctors.txt')
+assert sum(statistics.counts('category_experience').values()) == 6
+assert sum(registry.statistics.counts('category_experience').values()) == 12
+assert snapshot.statistics is statistics
+registry._remove(registry.doctors[6:], 'doctors')
+assert registry.statistics.counts('category_experience') == \
+    statistics.counts('category_experience')
+
+# lazy records are counted with the records of their schema
+lazy = Registry()
+lazy._insert(lazy.iter_hospital_patients('hospital.txt', lazy=True),
+             'hospital_patients')
+lazy._insert(lazy.iter_ambulatory_patients('ambulatory.txt', lazy=True),
+             'ambulatory_patients')
+assert type(lazy.hospital_patients[0]) is not HospitalPatient
+assert {class_name for class_name, name in lazy.statistics.tables} == {
+    'HospitalPatient', 'AmbulatoryPatient'}
+for name in ('blood_group', 'health_group', 'disability'):
+    for record_class in (HospitalPatient, AmbulatoryPatient,
+                         type(lazy.hospital_patients[0])):
+        assert lazy.statistics.counts(name, record_class) == \
+            registry.statistics.counts(name, record_class), name
@@ -0,0 +1,39 @@
+from main import Load as Loader, HospitalPatient
+from table import ColumnTable
+
+load = Loader()
+
+patients = list(load.iter_hospital_patients('hospital.txt'))
+table = ColumnTable.from_records(patients)
+
+mask = table.where(medical_department='терапевтическое', blood_type=1,
+                   rhesus_affiliation='+')
+print(table.count(mask), table.select(mask))
+assert table.select(mask) == [
+    p for p in patients if p.medical_department == 'терапевтическое'
+    and p.blood_type == 1 and p.rhesus_affiliation == '+']
+print(table.group_count('medical_department'))
+print(table.group_mean('medical_department', 'room_number'))
+
+doctors = list(load.iter_doctors('doctors.txt'))
+table = ColumnTable.from_records(doctors)
+
+mask = table.gt('work_experience', 10) & table.eq('category', 'высшая')
+print(table.count(mask), table.select(mask))
+assert table.select(mask) == [
+    d for d in doctors if d.work_experience is not None
+    and d.work_experience > 10 and d.category == 'высшая']
+print(table.mean('work_experience'), table.group_count('specialty'))
+
+# kinds of columns come from the schema, not from loaded values
+with open('hospital.txt', 'r', encoding='utf8') as f_patients:
+    rows = [ptr.split(';')[:-1] for ptr in f_patients]
+for row in rows:
+    row[8], row[12] = '+7 912', ''
+patients = [HospitalPatient(i, *row) for i, row in enumerate(rows, 1)]
+table = ColumnTable.from_records(patients)
+assert 'phone_number' in table.codes and 'blood_type' in table.numbers
+assert table.column('phone_number') == [None] * len(patients)
+assert table.count(table.eq('phone_number', '+7(912)345-67-89')) == 0
+assert table.count(table.eq('phone_number', None)) == len(patients)
+assert table.count(table.gt('blood_type', 1)) == 0
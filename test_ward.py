@@ -0,0 +1,41 @@
+from main import Load as Loader, HospitalPatient
+from ward import Wards
+
+Loader.wards = Wards({'терапевтическое': {21: 4, 22: 2, 23: 2},
+                      'кардиологическое': {34: 3, 35: 2}})
+first = len(Loader.hospital_patients)
+Loader.load_hospital_patients('hospital.txt')
+print(Loader.wards.departments())
+print(Loader.wards.free_rooms('терапевтическое'))
+assert Loader.wards.room('терапевтическое', 21) == {
+    'beds': 4, 'occupied': 4, 'free': 0}
+assert Loader.wards.occupancy('терапевтическое')['unassigned'] == 1
+assert Loader.wards.free_rooms('терапевтическое') == [(23, 1)]
+assert Loader.wards.find_free_bed('терапевтическое') == 23
+
+with open('hospital.txt', 'r', encoding='utf8') as f_patients:
+    row = f_patients.readline().split(';')[:-1]
+row[16] = ''
+patient = HospitalPatient(Loader.current_id, *row)
+Loader.current_id += 1
+assert Loader.admit_hospital_patient(patient) == 23
+assert Loader.wards.find_free_bed('терапевтическое') is None
+assert Loader.indexes.get('room_number', 23) is not None
+
+newcomer = HospitalPatient(Loader.current_id, *row)
+try:
+    Loader.admit_hospital_patient(newcomer)
+except ValueError as error:
+    print(error)
+else:
+    raise AssertionError('a patient was admitted without free beds')
+
+unassigned = Loader.wards.occupancy('терапевтическое')['unassigned']
+discharged = Loader.discharge_hospital_patient(
+    Loader.hospital_patients[first])
+assert Loader.wards.find_free_bed('терапевтическое') == 21
+assert Loader.wards.occupancy('терапевтическое')['unassigned'] == \
+    unassigned + 1
+assert Loader.wards.patients[id(discharged)] == ('терапевтическое', None)
+assert Loader.admit_hospital_patient(newcomer) == 21
+print(Loader.wards.occupancy('терапевтическое'))
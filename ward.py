@@ -0,0 +1,255 @@
+import heapq
+
+from cow import Buckets
+
+
+class Wards:
+    """
+    Class representing beds of hospital rooms by departments and hospital
+    patients occupying them, counts are kept up to date as patients are
+    added and removed; rooms of a department are shared by copies until one
+    of them changes them
+    """
+
+    def __init__(self, capacities=None, default_capacity=4):
+        """
+        Sets all the necessary attributes for the class Wards
+        :param capacities: dict of departments and dicts of their room
+        numbers and numbers of beds
+        :param default_capacity: number of beds of a room that is not in
+        capacities when its first patient is added
+        """
+
+        self.default_capacity = default_capacity
+        self.beds = {}
+        self.occupied = {}
+        self.free = {}
+        self.total_beds = {}
+        self.in_rooms = {}
+        self.unassigned = {}
+        self.patients = Buckets()
+        self.heaps = {}
+        self.queued = {}
+        # departments whose rooms are not shared with a copy
+        self.owned = set()
+        for department, rooms in (capacities or {}).items():
+            for room, beds in rooms.items():
+                self.set_capacity(department, room, beds)
+
+    def set_capacity(self, department, room, beds):
+        """
+        Method of setting number of beds of room, a new room is added
+        :param department:
+        :param room: room number
+        :param beds:
+        :return:
+        """
+
+        self._own(department)
+        rooms = self.beds[department]
+        occupied = self.occupied[department]
+        taken = occupied.setdefault(room, 0)
+        self.free[department] = self.free.get(department, 0) + (
+            max(0, beds - taken) - max(0, rooms.get(room, 0) - taken))
+        self.total_beds[department] = (self.total_beds.get(department, 0)
+                                       + beds - rooms.get(room, 0))
+        rooms[room] = beds
+        self._queue(department, room)
+
+    def _own(self, department):
+        """
+        Method of getting rooms of department to be changed, rooms shared
+        with a copy are copied first
+        :param department:
+        :return:
+        """
+
+        if department in self.owned:
+            return
+        self.beds[department] = dict(self.beds.get(department, {}))
+        self.occupied[department] = dict(self.occupied.get(department, {}))
+        self.heaps[department] = list(self.heaps.get(department, []))
+        self.queued[department] = set(self.queued.get(department, ()))
+        self.owned.add(department)
+
+    def _queue(self, department, room):
+        """
+        Method of putting room with free beds into the heap of its department
+        :param department:
+        :param room:
+        :return:
+        """
+
+        if room not in self.queued[department] and \
+                self.occupied[department][room] < self.beds[department][room]:
+            heapq.heappush(self.heaps[department], room)
+            self.queued[department].add(room)
+
+    def add(self, patient):
+        """
+        Method of counting patient in its room, a patient without a valid
+        room number is counted as unassigned in its department
+        :param patient:
+        :return:
+        """
+
+        key = id(patient)
+        patients = self.patients.bucket(key)
+        if key in patients:
+            return
+        department = patient.medical_department
+        room = patient.room_number
+        patients[key] = (department, room)
+        if room is None:
+            self.unassigned[department] = \
+                self.unassigned.get(department, 0) + 1
+            return
+
+        if room not in self.beds.get(department, ()):
+            self.set_capacity(department, room, self.default_capacity)
+        if department not in self.owned:
+            self._own(department)
+        occupied = self.occupied[department]
+        if occupied[room] < self.beds[department][room]:
+            self.free[department] -= 1
+        occupied[room] += 1
+        self.in_rooms[department] = self.in_rooms.get(department, 0) + 1
+
+    def remove(self, patient):
+        """
+        Method of freeing bed of patient
+        :param patient:
+        :return:
+        """
+
+        place = self.patients.pop(id(patient), None)
+        if place is None:
+            return
+        department, room = place
+        if room is None:
+            self.unassigned[department] -= 1
+            return
+
+        self._own(department)
+        occupied = self.occupied[department]
+        occupied[room] -= 1
+        self.in_rooms[department] -= 1
+        if occupied[room] < self.beds[department][room]:
+            self.free[department] += 1
+            self._queue(department, room)
+
+    def copy(self):
+        """
+        Method of copying beds and counts, patients are not copied and rooms
+        are shared until one of the copies changes them
+        :return: wards
+        """
+
+        wards = Wards(default_capacity=self.default_capacity)
+        wards.beds = dict(self.beds)
+        wards.occupied = dict(self.occupied)
+        wards.free = dict(self.free)
+        wards.total_beds = dict(self.total_beds)
+        wards.in_rooms = dict(self.in_rooms)
+        wards.unassigned = dict(self.unassigned)
+        wards.patients = self.patients.copy()
+        wards.heaps = dict(self.heaps)
+        wards.queued = dict(self.queued)
+        self.owned = set()
+        return wards
+
+    def prune(self):
+        """
+        Method of dropping full rooms from heaps of all departments, so that
+        finding a free bed does not change them
+        :return:
+        """
+
+        for department in self.heaps:
+            self.find_free_bed(department)
+
+    def find_free_bed(self, department):
+        """
+        Method of finding room of department with a free bed, the room with
+        the least number is given first; rooms found full are dropped from
+        the heap until a bed is freed in them
+        :param department:
+        :return: room number or None if all beds are taken
+        """
+
+        heap = self.heaps.get(department)
+        if not heap:
+            return None
+        occupied = self.occupied[department]
+        beds = self.beds[department]
+        if occupied[heap[0]] >= beds[heap[0]]:
+            self._own(department)
+            heap = self.heaps[department]
+            queued = self.queued[department]
+            while heap and occupied[heap[0]] >= beds[heap[0]]:
+                queued.discard(heapq.heappop(heap))
+        return heap[0] if heap else None
+
+    def assign(self, patient):
+        """
+        Method of giving patient a room with a free bed in its department,
+        the patient is not counted until it is added
+        :param patient:
+        :return: room number
+        """
+
+        room = self.find_free_bed(patient.medical_department)
+        if room is None:
+            raise ValueError(f'no free beds in {patient.medical_department}')
+        patient.room_number = room
+        return room
+
+    def free_rooms(self, department):
+        """
+        Method of getting rooms of department with free beds
+        :param department:
+        :return: list of pairs of room number and number of free beds
+        ordered by room number
+        """
+
+        occupied = self.occupied.get(department, {})
+        rooms = self.beds.get(department, {})
+        return [(room, beds - occupied[room])
+                for room, beds in sorted(rooms.items())
+                if occupied[room] < beds]
+
+    def room(self, department, room):
+        """
+        Method of getting occupancy of room
+        :param department:
+        :param room:
+        :return: dict with numbers of beds, occupied and free beds
+        """
+
+        beds = self.beds[department][room]
+        occupied = self.occupied[department][room]
+        return {'beds': beds, 'occupied': occupied,
+                'free': max(0, beds - occupied)}
+
+    def occupancy(self, department):
+        """
+        Method of getting occupancy of department
+        :param department:
+        :return: dict with numbers of rooms, beds, patients in rooms, free
+        beds and patients without a room
+        """
+
+        return {'rooms': len(self.beds.get(department, {})),
+                'beds': self.total_beds.get(department, 0),
+                'occupied': self.in_rooms.get(department, 0),
+                'free': self.free.get(department, 0),
+                'unassigned': self.unassigned.get(department, 0)}
+
+    def departments(self):
+        """
+        Method of getting occupancy of all departments
+        :return: dict of departments and their occupancy
+        """
+
+        names = set(self.beds) | set(self.unassigned)
+        return {name: self.occupancy(name) for name in names}